@@ -0,0 +1,349 @@
+"""Armazenamento opcional do projeto em SQLite (sondagens, camadas, pilares e resultados).
+
+Alternativa ao ``sondagens.json`` para arquivos com milhares de sondagens,
+possivelmente de varios projetos no mesmo arquivo: as sondagens sao lidas do
+banco apenas quando acessadas (``SondagensBanco``), e as consultas por nome de
+sondagem e por profundidade usam indices.
+
+``BancoProjeto`` oferece a mesma interface de ``persistencia.DiarioSondagens``
+(``carregar``, ``registrar_*``, ``compactar``), de forma que a interface grafica
+use qualquer um dos dois sem alteracoes::
+
+    python gerenciador.py projeto.db
+
+Para migrar um projeto existente::
+
+    python -m banco_projeto projeto.db --importar sondagens.json --projeto "Obra A"
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Sequence
+
+from instrumentacao import instrumentado
+
+PROJETO_PADRAO = "padrao"
+
+# Campos dos pilares (formato de App.dados_pilares) -> colunas da tabela pilares
+CAMPOS_PILAR = ("Nome", "Secao_X", "Secao_Y", "N_max", "N_min", "Mx_max", "My_max", "Fx_max", "Fy_max", "Mz")
+
+# Campos das linhas de calculo_lote.calcular_projeto -> colunas da tabela resultados
+CAMPOS_RESULTADO = ("Tipo_Estaca", "Diametro_cm", "Cota_Arrasamento", "Comprimento", "Cota_Ponta",
+                    "Pp", "Pl", "Pdqm", "Qult_AV", "Qadm_AV")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS sondagens (
+    id INTEGER PRIMARY KEY,
+    projeto TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    na REAL NOT NULL DEFAULT 0,
+    cota_terreno REAL NOT NULL DEFAULT 0,
+    UNIQUE (projeto, nome)
+);
+CREATE TABLE IF NOT EXISTS camadas (
+    sondagem_id INTEGER NOT NULL REFERENCES sondagens(id) ON DELETE CASCADE,
+    prof_inicial REAL NOT NULL,
+    prof_final REAL NOT NULL,
+    tipo_solo TEXT NOT NULL,
+    n_spt INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_camadas_profundidade ON camadas (sondagem_id, prof_inicial, prof_final);
+CREATE TABLE IF NOT EXISTS pilares (
+    projeto TEXT NOT NULL,
+    {colunas_pilar},
+    PRIMARY KEY (projeto, nome)
+);
+CREATE TABLE IF NOT EXISTS resultados (
+    sondagem_id INTEGER NOT NULL REFERENCES sondagens(id) ON DELETE CASCADE,
+    {colunas_resultado}
+);
+CREATE INDEX IF NOT EXISTS idx_resultados ON resultados (sondagem_id, tipo_estaca, diametro_cm, comprimento);
+""".format(
+    colunas_pilar=",\n    ".join(f"{c.lower()} TEXT" + (" NOT NULL" if c == "Nome" else "") for c in CAMPOS_PILAR),
+    colunas_resultado=",\n    ".join(f"{c.lower()} " + ("TEXT" if c == "Tipo_Estaca" else "REAL") for c in CAMPOS_RESULTADO),
+)
+
+
+class BancoProjeto:
+    """Projeto armazenado num arquivo SQLite. Cada alteracao e gravada (commit) ao ser registrada."""
+
+    def __init__(self, caminho: str, projeto: str | None = None):
+        """``projeto``: nome do projeto dentro do banco. Se omitido, e o unico projeto
+        gravado no arquivo ou, se houver nenhum ou varios, ``PROJETO_PADRAO``."""
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.execute("PRAGMA foreign_keys = ON")
+        self.conexao.execute("PRAGMA journal_mode = WAL")
+        self.conexao.executescript(ESQUEMA)
+        if projeto is None:
+            projetos = self.projetos()
+            projeto = projetos[0] if len(projetos) == 1 else PROJETO_PADRAO
+        self.projeto = projeto
+        # Mesma interface de persistencia.DiarioSondagens (nada a compactar: cada registro ja e um commit)
+        self.registros = 0
+        self.registros_invalidos = 0
+
+    def fechar(self):
+        self.conexao.close()
+
+    def projetos(self) -> List[str]:
+        """Nomes dos projetos com sondagens ou pilares gravados no arquivo."""
+        cursor = self.conexao.execute("SELECT projeto FROM sondagens UNION SELECT projeto FROM pilares ORDER BY projeto")
+        return [projeto for (projeto,) in cursor]
+
+    # --- Sondagens ---
+
+    def nomes_sondagens(self) -> List[str]:
+        cursor = self.conexao.execute("SELECT nome FROM sondagens WHERE projeto = ? ORDER BY nome", (self.projeto,))
+        return [nome for (nome,) in cursor]
+
+    def _id_sondagem(self, nome: str) -> int | None:
+        linha = self.conexao.execute("SELECT id FROM sondagens WHERE projeto = ? AND nome = ?",
+                                     (self.projeto, nome)).fetchone()
+        return linha[0] if linha else None
+
+    def existe_sondagem(self, nome: str) -> bool:
+        return self._id_sondagem(nome) is not None
+
+    def ler_sondagem(self, nome: str) -> Dict:
+        """Le uma sondagem no formato de ``App.dados_sondagens``.
+
+        Raises
+        ------
+        KeyError : se a sondagem nao existir no projeto.
+        """
+        linha = self.conexao.execute("SELECT id, na, cota_terreno FROM sondagens WHERE projeto = ? AND nome = ?",
+                                     (self.projeto, nome)).fetchone()
+        if linha is None:
+            raise KeyError(nome)
+        sondagem_id, na, cota_terreno = linha
+        cursor = self.conexao.execute(
+            "SELECT prof_inicial, prof_final, tipo_solo, n_spt FROM camadas WHERE sondagem_id = ? ORDER BY prof_inicial",
+            (sondagem_id,))
+        camadas = [
+            {'prof_inicial': topo, 'prof_final_camada': base, 'tipo_solo': tipo_solo, 'n_spt': n_spt}
+            for topo, base, tipo_solo, n_spt in cursor
+        ]
+        return {'NA': na, 'Cota_Terreno': cota_terreno, 'camadas': camadas}
+
+    def _gravar_camadas(self, sondagem_id: int, camadas: Sequence[Dict]):
+        self.conexao.execute("DELETE FROM camadas WHERE sondagem_id = ?", (sondagem_id,))
+        self.conexao.executemany(
+            "INSERT INTO camadas (sondagem_id, prof_inicial, prof_final, tipo_solo, n_spt) VALUES (?, ?, ?, ?, ?)",
+            [(sondagem_id, c['prof_inicial'], c['prof_final_camada'], c['tipo_solo'], c.get('n_spt', 0))
+             for c in camadas])
+
+    def salvar_sondagem(self, nome: str, dados: Dict):
+        """Cria ou substitui uma sondagem completa."""
+        with self.conexao:
+            self.conexao.execute(
+                "INSERT INTO sondagens (projeto, nome, na, cota_terreno) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (projeto, nome) DO UPDATE SET na = excluded.na, cota_terreno = excluded.cota_terreno",
+                (self.projeto, nome, dados.get('NA', 0.0), dados.get('Cota_Terreno', 0.0)))
+            self._gravar_camadas(self._id_sondagem(nome), dados.get('camadas', []))
+
+    def remover_sondagem(self, nome: str):
+        """Remove a sondagem com as suas camadas e resultados."""
+        with self.conexao:
+            self.conexao.execute("DELETE FROM sondagens WHERE projeto = ? AND nome = ?", (self.projeto, nome))
+
+    # --- Interface de persistencia.DiarioSondagens ---
+
+    @instrumentado()
+    def carregar(self) -> "SondagensBanco":
+        """Retorna as sondagens do projeto; cada uma so e lida do banco quando acessada."""
+        return SondagensBanco(self)
+
+    def registrar_sondagem(self, nome: str, dados: Dict):
+        self.salvar_sondagem(nome, dados)
+
+    def registrar_campo(self, nome: str, campo: str, valor):
+        """Grava a alteracao de um campo da sondagem ("NA", "Cota_Terreno" ou "camadas")."""
+        sondagem_id = self._id_sondagem(nome)
+        if sondagem_id is None:
+            raise KeyError(nome)
+        with self.conexao:
+            if campo == 'NA':
+                self.conexao.execute("UPDATE sondagens SET na = ? WHERE id = ?", (valor, sondagem_id))
+            elif campo == 'Cota_Terreno':
+                self.conexao.execute("UPDATE sondagens SET cota_terreno = ? WHERE id = ?", (valor, sondagem_id))
+            elif campo == 'camadas':
+                self._gravar_camadas(sondagem_id, valor)
+            else:
+                raise ValueError(f"Campo de sondagem desconhecido: {campo}")
+
+    def registrar_remocao(self, nome: str):
+        self.remover_sondagem(nome)
+
+    def precisa_compactar(self) -> bool:
+        return False
+
+    def compactar(self, dados=None):
+        """Nada a compactar: as alteracoes ja foram gravadas. Apenas garante o commit."""
+        self.conexao.commit()
+
+    # --- Pilares ---
+
+    def carregar_pilares(self) -> Dict[str, Dict]:
+        """Le todos os pilares do projeto no formato de ``App.dados_pilares``."""
+        colunas = ", ".join(c.lower() for c in CAMPOS_PILAR)
+        cursor = self.conexao.execute(f"SELECT {colunas} FROM pilares WHERE projeto = ? ORDER BY rowid", (self.projeto,))
+        return {linha[0]: dict(zip(CAMPOS_PILAR, linha)) for linha in cursor}
+
+    def salvar_pilares(self, dados_pilares: Dict[str, Dict]):
+        """Substitui os pilares do projeto."""
+        colunas = ", ".join(c.lower() for c in CAMPOS_PILAR)
+        marcadores = ", ".join("?" for _ in CAMPOS_PILAR)
+        with self.conexao:
+            self.conexao.execute("DELETE FROM pilares WHERE projeto = ?", (self.projeto,))
+            self.conexao.executemany(
+                f"INSERT INTO pilares (projeto, {colunas}) VALUES (?, {marcadores})",
+                [(self.projeto, nome, *(pilar.get(c, "0") for c in CAMPOS_PILAR[1:]))
+                 for nome, pilar in dados_pilares.items()])
+
+    # --- Resultados ---
+
+    def salvar_resultados(self, linhas: Sequence[Dict]):
+        """Grava linhas de ``calculo_lote.calcular_projeto``, substituindo os resultados anteriores das sondagens."""
+        ids = {}
+        for nome in {linha["Sondagem"] for linha in linhas}:
+            sondagem_id = self._id_sondagem(nome)
+            if sondagem_id is None:
+                raise KeyError(nome)
+            ids[nome] = sondagem_id
+        colunas = ", ".join(c.lower() for c in CAMPOS_RESULTADO)
+        marcadores = ", ".join("?" for _ in CAMPOS_RESULTADO)
+        with self.conexao:
+            self.conexao.executemany("DELETE FROM resultados WHERE sondagem_id = ?", [(i,) for i in ids.values()])
+            self.conexao.executemany(
+                f"INSERT INTO resultados (sondagem_id, {colunas}) VALUES (?, {marcadores})",
+                [(ids[linha["Sondagem"]], *(linha[c] for c in CAMPOS_RESULTADO)) for linha in linhas])
+
+    def consultar_resultados(self, nome: str, tipo_estaca: str | None = None,
+                             diametro_cm: float | None = None) -> List[Dict]:
+        """Resultados gravados de uma sondagem, opcionalmente filtrados por tipo e diametro."""
+        sondagem_id = self._id_sondagem(nome)
+        if sondagem_id is None:
+            raise KeyError(nome)
+        condicoes, valores = ["sondagem_id = ?"], [sondagem_id]
+        if tipo_estaca is not None:
+            condicoes.append("tipo_estaca = ?")
+            valores.append(tipo_estaca)
+        if diametro_cm is not None:
+            condicoes.append("diametro_cm = ?")
+            valores.append(float(diametro_cm))
+        colunas = ", ".join(c.lower() for c in CAMPOS_RESULTADO)
+        cursor = self.conexao.execute(
+            f"SELECT {colunas} FROM resultados WHERE {' AND '.join(condicoes)} "
+            "ORDER BY tipo_estaca, diametro_cm, cota_arrasamento, comprimento", valores)
+        return [{"Sondagem": nome, **dict(zip(CAMPOS_RESULTADO, linha))} for linha in cursor]
+
+    # --- Migracao ---
+
+    def importar_sondagens(self, dados_sondagens: Dict[str, Dict]):
+        """Grava todas as sondagens de um dicionario (ex: lido do sondagens.json)."""
+        for nome, dados in dados_sondagens.items():
+            self.salvar_sondagem(nome, dados)
+
+    def exportar_sondagens(self) -> Dict[str, Dict]:
+        """Le todas as sondagens do projeto para um dicionario comum."""
+        return {nome: self.ler_sondagem(nome) for nome in self.nomes_sondagens()}
+
+
+class SondagensBanco(MutableMapping):
+    """Dicionario de sondagens (formato de ``App.dados_sondagens``) com leitura sob demanda.
+
+    Os nomes vem do banco; os dados de cada sondagem so sao lidos no primeiro
+    acesso e mantidos em memoria ate ``descarregar``. Como no dicionario comum
+    usado com ``persistencia.DiarioSondagens``, atribuicoes e remocoes alteram
+    apenas a memoria: a gravacao e feita pelos metodos ``registrar_*`` de
+    ``BancoProjeto``, o unico caminho de escrita no banco.
+    """
+
+    def __init__(self, banco: BancoProjeto):
+        self.banco = banco
+        self._carregadas: Dict[str, Dict] = {}
+        self._removidas = set() # Removidas da memoria e ainda nao do banco
+
+    def __getitem__(self, nome: str) -> Dict:
+        if nome in self._removidas:
+            raise KeyError(nome)
+        dados = self._carregadas.get(nome)
+        if dados is None:
+            dados = self.banco.ler_sondagem(nome)
+            self._carregadas[nome] = dados
+        return dados
+
+    def __setitem__(self, nome: str, dados: Dict):
+        self._carregadas[nome] = dados
+        self._removidas.discard(nome)
+
+    def __delitem__(self, nome: str):
+        if nome not in self:
+            raise KeyError(nome)
+        self._carregadas.pop(nome, None)
+        self._removidas.add(nome)
+
+    def __contains__(self, nome) -> bool:
+        if nome in self._removidas:
+            return False
+        return nome in self._carregadas or self.banco.existe_sondagem(nome)
+
+    def _nomes(self) -> List[str]:
+        return sorted((set(self.banco.nomes_sondagens()) | set(self._carregadas)) - self._removidas)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._nomes())
+
+    def __len__(self) -> int:
+        return len(self._nomes())
+
+    def descarregar(self, nome: str | None = None):
+        """Libera da memoria uma sondagem ja lida (ou todas); ela sera relida do banco se acessada.
+
+        As alteracoes devem ter sido gravadas antes (``registrar_*``).
+        """
+        if nome is None:
+            self._carregadas.clear()
+        else:
+            self._carregadas.pop(nome, None)
+
+
+def e_banco_projeto(caminho: str) -> bool:
+    """True se o caminho aponta para um banco SQLite de projeto (pela extensao)."""
+    return caminho.lower().endswith((".db", ".sqlite", ".sqlite3"))
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Importa/exporta sondagens entre o sondagens.json e o banco (``python -m banco_projeto``)."""
+    parser = argparse.ArgumentParser(prog="python -m banco_projeto",
+                                     description="Migra sondagens entre arquivos JSON e o banco SQLite do projeto.")
+    parser.add_argument("banco", help="arquivo SQLite do projeto (criado se não existir)")
+    parser.add_argument("--projeto", default=PROJETO_PADRAO, help="nome do projeto dentro do banco")
+    grupo = parser.add_mutually_exclusive_group(required=True)
+    grupo.add_argument("--importar", metavar="JSON", help="grava no banco as sondagens do arquivo JSON")
+    grupo.add_argument("--exportar", metavar="JSON", help="grava as sondagens do banco num arquivo JSON")
+    args = parser.parse_args(argv)
+
+    banco = BancoProjeto(args.banco, args.projeto)
+    try:
+        if args.importar:
+            with open(args.importar, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+            banco.importar_sondagens(dados)
+            print(f"{len(dados)} sondagens importadas para {args.banco} (projeto '{args.projeto}')")
+        else:
+            dados = banco.exportar_sondagens()
+            with open(args.exportar, "w", encoding="utf-8") as f:
+                json.dump(dados, f, indent=4)
+            print(f"{len(dados)} sondagens exportadas para {args.exportar}")
+    finally:
+        banco.fechar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+"""Benchmark dos motores de capacidade de carga e das atualizacoes da interface.
+
+Gera sondagens sinteticas (10 a 100 m de profundidade, camadas de 0,1 a 1 m)
+e conjuntos de pilares (10 a 50 mil) e mede, para cada tamanho:
+
+* ``aoki_velloso`` e ``decourt_quaresma`` (funcoes escalares, uma chamada por
+  profundidade de ponta) e as versoes em lote (``*_lote``);
+* ``perfil_capacidade_decourt`` (segmentos de 1 m, camadas e passo de 0,1 m),
+  ``perfil_capacidade_aoki_velloso`` e ``perfil_capacidade_metodos`` (os dois
+  metodos numa passada, como nas abas da interface);
+* ``varrer_grade`` + ``otimizar_pilares`` para os conjuntos de pilares;
+* ``calcular_projeto`` (calculo em lote, um processo);
+* com um display disponivel, ``BoreholeCalculationFrame._execute_calculation``
+  (ate a tabela ser preenchida) e ``App.update_sondagem_display``.
+
+Para cada caso sao relatados a mediana do tempo, a vazao (itens/s) e o pico
+de memoria alocada (``tracemalloc``, medido numa execucao separada para nao
+distorcer o tempo). Os resultados podem ser gravados num arquivo JSON de
+referencia (``--gravar-base``) e comparados com ele nas execucoes seguintes:
+casos mais lentos que a referencia alem da tolerancia sao marcados como
+regressao e o script termina com codigo 1.
+
+Uso:
+    python benchmarks/bench_calculo.py [--repeticoes 5] [--profundidades 10 30 100]
+        [--resolucoes 1 0.5 0.1] [--pilares 10 1000 50000]
+        [--base benchmarks/base_calculo.json] [--gravar-base] [--tolerancia 0.2]
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from calculo_estacas import (  # noqa: E402
+    DISCRETIZACAO_CAMADAS, aoki_velloso, aoki_velloso_lote, camadas_ao_longo_do_fuste, camadas_para_colunas,
+    coeficientes_para_array, decourt_quaresma, decourt_quaresma_lote, perfil_capacidade_aoki_velloso,
+    perfil_capacidade_decourt, perfil_capacidade_metodos, profundidades_do_perfil,
+)
+from calculo_lote import calcular_projeto  # noqa: E402
+from coeficientes import TabelaCoeficientesDecourt, TabelaFatoresAokiVelloso  # noqa: E402
+from otimizador_estacas import (  # noqa: E402
+    comprimentos_da_sondagem, diametros_da_tabela_secao, otimizar_pilares, varrer_grade,
+)
+from parametros import ALFA_AOKI_VELLOSO, k_aoki_velloso, parametros_padrao  # noqa: E402
+from perfil_sondagem import IndiceProfundidade  # noqa: E402
+
+BASE_PADRAO = os.path.join(RAIZ, "benchmarks", "base_calculo.json")
+SOLOS = ["Argila", "Argila Arenosa", "Silte Argiloso", "Areia Siltosa", "Areia"]
+TIPO_ESTACA = "Hélice Contínua"
+DIAMETRO_M = 0.4
+
+
+def gerar_sondagem(profundidade: float, resolucao: float, semente: int = 0) -> dict:
+    """Sondagem sintetica no formato de sondagens.json, com camadas de ``resolucao`` m."""
+    rng = np.random.default_rng(semente)
+    n_camadas = int(round(profundidade / resolucao))
+    bordas = np.round(np.arange(n_camadas + 1) * resolucao, 6)
+    # NSPT crescente com a profundidade, com ruido, e solos em faixas de alguns metros
+    nspt = np.clip(3 + bordas[:-1] * 0.6 + rng.normal(0, 4, n_camadas), 1, 60).round()
+    faixa = (bordas[:-1] // 3).astype(int)
+    camadas = [
+        {"prof_inicial": float(bordas[i]), "prof_final_camada": float(bordas[i + 1]),
+         "tipo_solo": SOLOS[(faixa[i] + semente) % len(SOLOS)], "n_spt": int(nspt[i])}
+        for i in range(n_camadas)
+    ]
+    return {"NA": 2.0, "Cota_Terreno": 100.0, "camadas": camadas}
+
+
+def gerar_pilares(n_pilares: int, semente: int = 0) -> dict:
+    """Pilares sinteticos no formato de ``App.dados_pilares``."""
+    rng = np.random.default_rng(semente)
+    cargas = rng.uniform(100, 4000, n_pilares)
+    return {f"P{i + 1}": {"N_max": f"{carga:.2f}"} for i, carga in enumerate(cargas.tolist())}
+
+
+def medir(funcao, repeticoes: int) -> dict:
+    """Mediana e minimo do tempo (s) em ``repeticoes`` execucoes, e o pico de memoria (bytes)."""
+    funcao() # Aquecimento (importacoes, compilacao das tabelas, caches do NumPy)
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        t0 = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - t0)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"mediana_s": statistics.median(tempos), "min_s": min(tempos), "pico_memoria_bytes": pico}
+
+
+def casos_motores(profundidade: float, resolucao: float, coeficientes, params):
+    """Casos (nome, funcao, itens, unidade) dos motores de calculo para uma sondagem."""
+    sondagem = gerar_sondagem(profundidade, resolucao)
+    indice = IndiceProfundidade.da_sondagem(sondagem)
+    cota_arrasamento = indice.cota_terreno
+    prof_pontas = profundidades_do_perfil(indice, cota_arrasamento)
+    n_pontas = prof_pontas.size
+    area_ponta = np.pi * DIAMETRO_M ** 2 / 4
+    perimetro = np.pi * DIAMETRO_M
+    k = k_aoki_velloso(params)
+    alpha = ALFA_AOKI_VELLOSO
+    C = {solo: 1.0 for solo in SOLOS}
+    alpha_l = {solo: 10.0 for solo in SOLOS}
+
+    def escalar(funcao, **coefs):
+        def executar():
+            for prof_ponta in prof_pontas.tolist():
+                camadas = camadas_ao_longo_do_fuste(indice, 0.0, prof_ponta)
+                funcao(camadas, n_ponta=20, area_ponta=area_ponta, perimetro_fuste=perimetro, **coefs)
+        return executar
+
+    prof_topo, prof_base, nspt, codigo_solo, categorias = camadas_para_colunas(
+        camadas_ao_longo_do_fuste(indice, 0.0, indice.profundidade_maxima))
+    n_ponta = np.full(n_pontas, 20.0)
+    k_array = coeficientes_para_array(k, categorias)
+    alpha_array = coeficientes_para_array(alpha, categorias)
+    C_array = coeficientes_para_array(C, categorias)
+    alpha_l_array = coeficientes_para_array(alpha_l, categorias)
+
+    def aoki_lote():
+        aoki_velloso_lote(prof_topo, prof_base, nspt, codigo_solo, prof_pontas, n_ponta, area_ponta, perimetro,
+                          k_array, alpha_array)
+
+    def decourt_lote():
+        decourt_quaresma_lote(prof_topo, prof_base, nspt, codigo_solo, prof_pontas, n_ponta, area_ponta,
+                              perimetro, C_array, alpha_l_array)
+
+    def perfil_decourt(discretizacao):
+        return lambda: perfil_capacidade_decourt(indice, coeficientes, TIPO_ESTACA, DIAMETRO_M, cota_arrasamento,
+                                                 discretizacao=discretizacao)
+
+    def perfil_aoki():
+        perfil_capacidade_aoki_velloso(indice, k, alpha, TIPO_ESTACA, DIAMETRO_M, cota_arrasamento, prof_pontas)
+
+    fatores = TabelaFatoresAokiVelloso(params)
+
+    def perfil_metodos():
+        perfil_capacidade_metodos(indice, coeficientes, k, alpha, fatores, TIPO_ESTACA, DIAMETRO_M, cota_arrasamento)
+
+    return [
+        ("aoki_velloso (escalar)", escalar(aoki_velloso, k=k, alpha=alpha), n_pontas, "pontas"),
+        ("decourt_quaresma (escalar)", escalar(decourt_quaresma, C=C, alpha_l=alpha_l), n_pontas, "pontas"),
+        ("aoki_velloso_lote", aoki_lote, n_pontas, "pontas"),
+        ("decourt_quaresma_lote", decourt_lote, n_pontas, "pontas"),
+        ("perfil_capacidade_decourt (1 m)", perfil_decourt(None), n_pontas, "pontas"),
+        ("perfil_capacidade_decourt (camadas)", perfil_decourt(DISCRETIZACAO_CAMADAS), len(indice), "camadas"),
+        ("perfil_capacidade_decourt (passo 0.1 m)", perfil_decourt(0.1), int(profundidade / 0.1), "segmentos"),
+        ("perfil_capacidade_aoki_velloso", perfil_aoki, n_pontas, "pontas"),
+        ("perfil_capacidade_metodos (1 m)", perfil_metodos, n_pontas, "pontas"),
+    ]
+
+
+def casos_otimizador(n_pilares: int, coeficientes, params):
+    """Varredura da grade e escolha da estaca de ``n_pilares`` pilares numa sondagem de 30 m."""
+    indice = IndiceProfundidade.da_sondagem(gerar_sondagem(30, 0.5))
+    cota_arrasamento = indice.cota_terreno
+    diametros = diametros_da_tabela_secao(params, params["decourt_quaresma_alpha"]["headers"][1:])
+    comprimentos = comprimentos_da_sondagem(indice, cota_arrasamento)
+    pilares = gerar_pilares(n_pilares)
+
+    def otimizar():
+        grade = varrer_grade(indice, coeficientes, diametros, comprimentos, cota_arrasamento)
+        otimizar_pilares(grade, pilares)
+
+    return [("varrer_grade + otimizar_pilares", otimizar, n_pilares, "pilares")]
+
+
+def casos_projeto(n_sondagens: int, params):
+    """Calculo em lote de um projeto (um processo, sem cache)."""
+    dados = {f"SP-{s + 1:02d}": gerar_sondagem(30, 0.5, semente=s) for s in range(n_sondagens)}
+    configuracoes = [{"tipo_estaca": TIPO_ESTACA, "diametro_cm": d, "cota_arrasamento": 100.0} for d in (30, 40, 50, 60)]
+    n_tarefas = n_sondagens * len(configuracoes)
+    return [("calcular_projeto (1 processo)",
+             lambda: calcular_projeto(dados, params, configuracoes, max_workers=1), n_tarefas, "tarefas")]
+
+
+def casos_interface(profundidade: float, resolucao: float, params, pasta: str):
+    """Atualizacoes da interface (apenas com display): calculo de uma aba e reconstrucao das abas de sondagem."""
+    import tkinter.messagebox as messagebox
+    messagebox.showinfo = messagebox.showwarning = messagebox.showerror = lambda *a, **k: None
+
+    import gerenciador
+    from cache_resultados import CacheResultados
+    from geotechnical_tab import BoreholeCalculationFrame
+
+    sondagem = gerar_sondagem(profundidade, resolucao)
+    with open(os.path.join(pasta, "sondagens.json"), "w", encoding="utf-8") as f:
+        json.dump({"SP-01": sondagem}, f)
+    diretorio = os.getcwd()
+    os.chdir(pasta)
+    try:
+        app = gerenciador.App()
+    finally:
+        os.chdir(diretorio)
+    app.withdraw()
+
+    # Cache de tamanho zero: cada clique recalcula a curva
+    frame = BoreholeCalculationFrame(app, app, "SP-01", sondagem, params, cache_resultados=CacheResultados(0))
+    frame.pack(fill="both", expand=True)
+    frame.top_level_entry.delete(0, "end")
+    frame.top_level_entry.insert(0, "100.0")
+    frame.pile_length_entry.delete(0, "end")
+    frame.pile_length_entry.insert(0, str(profundidade / 2))
+    app.update()
+
+    def calcular():
+        frame._displayed_result_key = None
+        frame._execute_calculation()
+        while frame._job is not None:
+            app.update()
+            time.sleep(0.001)
+        app.update_idletasks()
+
+    n_sondagens = 30
+    dados = {f"SP-{s + 1:02d}": gerar_sondagem(profundidade, resolucao, semente=s) for s in range(n_sondagens)}
+
+    def atualizar_abas():
+        app.dados_sondagens = dict(dados)
+        app.update_sondagem_display()
+        app.update_idletasks()
+
+    n_linhas = len(sondagem["camadas"])
+    return app, [
+        ("_execute_calculation", calcular, n_linhas, "camadas"),
+        ("update_sondagem_display", atualizar_abas, n_sondagens, "sondagens"),
+    ]
+
+
+def relatar(caso_id: str, resultado: dict, base: dict | None, tolerancia: float) -> bool:
+    """Imprime uma linha do relatorio; retorna True se houve regressao em relacao a base."""
+    vazao = resultado["itens"] / resultado["mediana_s"] if resultado["mediana_s"] > 0 else float("inf")
+    linha = (f"{caso_id:<64} {resultado['mediana_s'] * 1000:10.2f} ms {vazao:14,.0f} {resultado['unidade']}/s "
+             f"{resultado['pico_memoria_bytes'] / 1024 / 1024:9.2f} MB")
+    regressao = False
+    if base and caso_id in base:
+        razao = resultado["mediana_s"] / base[caso_id]["mediana_s"]
+        regressao = razao > 1.0 + tolerancia
+        linha += f"   {razao:5.2f}x base" + ("  REGRESSÃO" if regressao else "")
+    print(linha)
+    return regressao
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mede os motores de capacidade de carga e as atualizações da interface.")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--profundidades", nargs="+", type=float, default=[10, 30, 100],
+                        help="profundidades das sondagens sintéticas (m)")
+    parser.add_argument("--resolucoes", nargs="+", type=float, default=[1.0, 0.5, 0.1],
+                        help="espessura das camadas das sondagens sintéticas (m)")
+    parser.add_argument("--pilares", nargs="+", type=int, default=[10, 1000, 50000],
+                        help="tamanhos dos conjuntos de pilares do otimizador")
+    parser.add_argument("--sondagens-projeto", type=int, default=20,
+                        help="número de sondagens do cálculo em lote")
+    parser.add_argument("--base", default=BASE_PADRAO, help="arquivo JSON de referência")
+    parser.add_argument("--gravar-base", action="store_true",
+                        help="grava os resultados desta execução como nova referência")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="aumento relativo da mediana aceito antes de indicar regressão (padrão: 0.2)")
+    args = parser.parse_args(argv)
+
+    base = None
+    if os.path.exists(args.base):
+        with open(args.base, "r", encoding="utf-8") as f:
+            base = json.load(f)["casos"]
+
+    params = parametros_padrao()
+    coeficientes = TabelaCoeficientesDecourt(params)
+
+    casos = []
+    for profundidade in args.profundidades:
+        for resolucao in args.resolucoes:
+            sufixo = f"[{profundidade:g} m, camadas de {resolucao:g} m]"
+            casos.extend((f"{nome} {sufixo}", funcao, itens, unidade)
+                         for nome, funcao, itens, unidade in casos_motores(profundidade, resolucao, coeficientes, params))
+    for n_pilares in args.pilares:
+        casos.extend((f"{nome} [{n_pilares} pilares]", funcao, itens, unidade)
+                     for nome, funcao, itens, unidade in casos_otimizador(n_pilares, coeficientes, params))
+    casos.extend((f"{nome} [{args.sondagens_projeto} sondagens]", funcao, itens, unidade)
+                 for nome, funcao, itens, unidade in casos_projeto(args.sondagens_projeto, params))
+
+    resultados = {}
+    regressoes = []
+
+    def executar(caso_id, funcao, itens, unidade):
+        resultados[caso_id] = {**medir(funcao, args.repeticoes), "itens": itens, "unidade": unidade}
+        if relatar(caso_id, resultados[caso_id], base, args.tolerancia):
+            regressoes.append(caso_id)
+
+    for caso in casos:
+        executar(*caso)
+
+    if sys.platform != "win32" and not os.environ.get("DISPLAY"):
+        print("Sem display: atualizações da interface não medidas.")
+    else:
+        with tempfile.TemporaryDirectory() as pasta:
+            for profundidade in args.profundidades:
+                for resolucao in args.resolucoes:
+                    app, casos_ui = casos_interface(profundidade, resolucao, params, pasta)
+                    try:
+                        for nome, funcao, itens, unidade in casos_ui:
+                            executar(f"{nome} [{profundidade:g} m, camadas de {resolucao:g} m]", funcao, itens, unidade)
+                    finally:
+                        app.destroy()
+
+    if args.gravar_base:
+        with open(args.base, "w", encoding="utf-8") as f:
+            json.dump({
+                "data": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "maquina": platform.platform(),
+                "repeticoes": args.repeticoes,
+                "casos": resultados,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"Referência gravada em {args.base}")
+
+    if regressoes:
+        print(f"{len(regressoes)} caso(s) mais lento(s) que a referência (tolerância {args.tolerancia:.0%}).")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Benchmark da importacao de planilhas de pilares.
+
+Gera uma exportacao sintetica do software estrutural (nomes de colunas com
+acentos e unidades, virgula decimal, celulas vazias) e mede ``ler_pilares``
+para cada formato disponivel (CSV sempre; Excel e Parquet se openpyxl/pyarrow
+estiverem instalados).
+
+Uso:
+    python benchmarks/bench_importacao_pilares.py [--pilares 10000] [--repeticoes 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from importacao_pilares import converter_pilares, ler_pilares  # noqa: E402
+
+
+def gerar_planilha(n_pilares: int, semente: int = 0) -> pd.DataFrame:
+    """Planilha de pilares sintetica no formato exportado pelo software estrutural."""
+    rng = np.random.default_rng(semente)
+    forcas = lambda escala: [f"{v:.3f}".replace('.', ',') for v in rng.normal(0, escala, n_pilares)]
+    return pd.DataFrame({
+        "Pilar": [f"P{i + 1}" for i in range(n_pilares)],
+        "Seção X (cm)": rng.choice([20, 25, 30, 40], n_pilares),
+        "Seção Y (cm)": rng.choice([40, 50, 60, 80], n_pilares),
+        "N max (kN)": [f"{v:.3f}".replace('.', ',') for v in rng.uniform(200, 5000, n_pilares)],
+        "N min (kN)": np.where(rng.random(n_pilares) < 0.05, np.nan, rng.uniform(50, 200, n_pilares)),
+        "Mx max (kN.m)": forcas(50), "My max (kN.m)": forcas(50),
+        "Fx max (kN)": forcas(10), "Fy max (kN)": forcas(10), "Mz (kN.m)": forcas(2),
+    })
+
+
+def medir(funcao, repeticoes: int) -> list:
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - t0)
+    return tempos
+
+
+def relatar(nome: str, tempos: list, n_pilares: int):
+    mediana = statistics.median(tempos)
+    print(f"{nome:<28} mediana {mediana * 1000:8.1f} ms   {n_pilares / mediana:12,.0f} pilares/s")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mede a importacao de planilhas de pilares.")
+    parser.add_argument("--pilares", type=int, default=10000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    df = gerar_planilha(args.pilares)
+    relatar("converter_pilares (memória)", medir(lambda: converter_pilares(df), args.repeticoes), args.pilares)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        formatos = {
+            "csv": lambda caminho: df.to_csv(caminho, sep=';', index=False),
+            "xlsx": lambda caminho: df.to_excel(caminho, index=False),
+            "parquet": lambda caminho: df.to_parquet(caminho, index=False),
+        }
+        for extensao, gravar in formatos.items():
+            caminho = os.path.join(pasta, f"pilares.{extensao}")
+            try:
+                gravar(caminho)
+            except ImportError as e:
+                print(f"{'ler_pilares (' + extensao + ')':<28} não medido: {str(e).splitlines()[0]}")
+                continue
+            relatar(f"ler_pilares ({extensao})", medir(lambda: ler_pilares(caminho), args.repeticoes), args.pilares)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Benchmark do tempo de abertura do aplicativo.
+
+Cada medicao roda num processo Python novo (importacoes "a frio"):
+
+* ``import gerenciador`` - o que a abertura paga hoje;
+* ``import gerenciador`` + pandas + ``geotechnical_tab`` - o que a abertura
+  pagava quando esses modulos eram importados no carregamento;
+* com um display disponivel, a criacao da ``App`` com um sondagens.json
+  sintetico, comparando a abertura preguiçosa com a construcao imediata de
+  todas as abas (Treeviews de sondagem e ``BoreholeCalculationFrame``).
+
+Uso:
+    python benchmarks/bench_startup.py [--repeticoes 5] [--sondagens 30]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT_IMPORTACAO = """
+import time
+t0 = time.perf_counter()
+{importacoes}
+print(time.perf_counter() - t0)
+"""
+
+SCRIPT_APP = """
+import time
+from tkinter import messagebox
+messagebox.showinfo = lambda *a, **k: None  # load_sondagem_data avisa ao abrir
+t0 = time.perf_counter()
+import gerenciador
+app = gerenciador.App()
+{construcao}
+app.update()
+print(time.perf_counter() - t0)
+app.destroy()
+"""
+
+
+def gerar_sondagens(n_sondagens: int, n_camadas: int = 20) -> dict:
+    """Sondagens sinteticas no formato de sondagens.json."""
+    solos = ["Argila", "Argila Arenosa", "Silte Argiloso", "Areia Siltosa", "Areia"]
+    dados = {}
+    for s in range(n_sondagens):
+        camadas = [
+            {"prof_inicial": float(i), "prof_final_camada": float(i + 1),
+             "tipo_solo": solos[(i + s) % len(solos)], "n_spt": 3 + (i * 7 + s) % 40}
+            for i in range(n_camadas)
+        ]
+        dados[f"SP-{s + 1:02d}"] = {"NA": 2.0, "Cota_Terreno": 100.0, "camadas": camadas}
+    return dados
+
+
+def medir(script: str, repeticoes: int, cwd: str) -> list:
+    """Executa o script em processos novos e retorna os tempos (s) impressos."""
+    ambiente = dict(os.environ, PYTHONPATH=RAIZ + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    tempos = []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, "-c", script], cwd=cwd, env=ambiente,
+                               capture_output=True, text=True, check=True)
+        tempos.append(float(saida.stdout.strip().splitlines()[-1]))
+    return tempos
+
+
+def relatar(nome: str, tempos: list):
+    print(f"{nome:<48} mediana {statistics.median(tempos) * 1000:8.1f} ms   "
+          f"min {min(tempos) * 1000:8.1f} ms")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mede o tempo de abertura do aplicativo.")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--sondagens", type=int, default=30,
+                        help="numero de sondagens sinteticas para o teste da App")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        with open(os.path.join(pasta, "sondagens.json"), "w", encoding="utf-8") as f:
+            json.dump(gerar_sondagens(args.sondagens), f)
+
+        relatar("import gerenciador (preguiçoso)",
+                medir(SCRIPT_IMPORTACAO.format(importacoes="import gerenciador"), args.repeticoes, pasta))
+        relatar("import gerenciador + pandas + geotechnical_tab",
+                medir(SCRIPT_IMPORTACAO.format(importacoes="import gerenciador, pandas, geotechnical_tab"),
+                      args.repeticoes, pasta))
+
+        if sys.platform != "win32" and not os.environ.get("DISPLAY"):
+            print("Sem display: criacao da App nao medida.")
+            return 0
+
+        relatar(f"App() com {args.sondagens} sondagens (preguiçoso)",
+                medir(SCRIPT_APP.format(construcao=""), args.repeticoes, pasta))
+        construcao_imediata = (
+            "import pandas\n"
+            "app.notebook.select(app.geo_design_container)\n"
+            "app.on_main_tab_change(None)\n"
+            "geo = app.geo_design_frame\n"
+            "geo.sub_notebook.select(1)\n"
+            "geo._on_sub_tab_changed()\n"
+            "for abas in (app.sondagem_tabs, *geo.calculation_tabs.values()):\n"
+            "    for nome in list(abas.containers):\n"
+            "        abas.materialize(nome)"
+        )
+        relatar(f"App() com {args.sondagens} sondagens (construção imediata)",
+                medir(SCRIPT_APP.format(construcao=construcao_imediata), args.repeticoes, pasta))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
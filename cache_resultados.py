@@ -0,0 +1,216 @@
+"""Cache LRU dos resultados de calculo da interface.
+
+Recalcular a curva de Décourt-Quaresma a cada clique em "Calcular Carga
+Admissível" e desnecessario quando nem a sondagem nem os dados da estaca
+mudaram. Os resultados sao guardados sob uma chave com o nome da sondagem,
+o hash do conteudo da sondagem, os dados da estaca e a versao das tabelas de
+coeficientes; qualquer alteracao nesses dados gera uma chave nova. As
+entradas menos usadas sao descartadas ao atingir o limite de tamanho.
+
+``CacheDisco`` guarda resultados em disco entre sessoes (pasta
+``.cache_calculos`` ao lado do sondagens.json). E enderecado pelo conteudo: a
+chave e o hash dos dados de entrada (sondagem, estaca e tabelas de
+parametros), de forma que um novo calculo do projeto so refaz o que mudou.
+O tamanho total da pasta e limitado; os arquivos usados ha mais tempo sao
+removidos primeiro.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Tuple
+
+import numpy as np
+
+TAMANHO_MAXIMO_PADRAO = 128
+
+# Pasta do cache em disco, criada ao lado do arquivo de sondagens
+PASTA_CACHE_DISCO = ".cache_calculos"
+TAMANHO_MAXIMO_DISCO_PADRAO = 256 * 1024 * 1024 # bytes
+
+
+def hash_sondagem(sondagem_data: Dict) -> str:
+    """Hash do conteudo de uma sondagem (formato de ``App.dados_sondagens``)."""
+    texto = json.dumps(sondagem_data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(texto.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CacheResultados:
+    """Cache LRU com limite de entradas.
+
+    As chaves sao tuplas cujo primeiro elemento e o nome da sondagem, o que
+    permite descartar de uma vez os resultados de uma sondagem alterada.
+    """
+
+    def __init__(self, tamanho_maximo: int = TAMANHO_MAXIMO_PADRAO):
+        self.tamanho_maximo = tamanho_maximo
+        self._entradas: "OrderedDict[Tuple, object]" = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __contains__(self, chave: Tuple) -> bool:
+        return chave in self._entradas
+
+    def obter(self, chave: Tuple):
+        """Retorna o resultado guardado para a chave, ou None."""
+        valor = self._entradas.get(chave)
+        if valor is None:
+            self.falhas += 1
+            return None
+        self._entradas.move_to_end(chave) # Mais recentemente usado
+        self.acertos += 1
+        return valor
+
+    def guardar(self, chave: Tuple, valor):
+        """Guarda o resultado, descartando os menos usados se o limite for ultrapassado."""
+        self._entradas[chave] = valor
+        self._entradas.move_to_end(chave)
+        while len(self._entradas) > self.tamanho_maximo:
+            self._entradas.popitem(last=False)
+
+    def invalidar_sondagem(self, nome_sondagem: Hashable):
+        """Descarta os resultados de uma sondagem."""
+        for chave in [c for c in self._entradas if c[0] == nome_sondagem]:
+            del self._entradas[chave]
+
+    def limpar(self):
+        """Descarta todos os resultados (ex: quando as tabelas de coeficientes mudam)."""
+        self._entradas.clear()
+
+
+def pasta_cache_ao_lado(caminho_sondagens: str) -> str:
+    """Pasta do cache em disco ao lado do arquivo de sondagens (JSON ou banco)."""
+    return os.path.join(os.path.dirname(os.path.abspath(caminho_sondagens)), PASTA_CACHE_DISCO)
+
+
+class CacheDisco:
+    """Cache em disco enderecado pelo conteudo, com limite de tamanho total.
+
+    Cada entrada e um arquivo ``<pasta>/<2 primeiros caracteres>/<chave>.json``
+    (valores JSON) ou ``.npz`` (dicionarios de arrays NumPy). A gravacao e
+    atomica (arquivo temporario + rename), entao varios processos podem usar
+    a mesma pasta. Um acerto atualiza a data de modificacao do arquivo, usada
+    para descartar primeiro as entradas usadas ha mais tempo.
+    """
+
+    def __init__(self, pasta: str, tamanho_maximo: int = TAMANHO_MAXIMO_DISCO_PADRAO):
+        self.pasta = pasta
+        self.tamanho_maximo = tamanho_maximo
+        self._tamanho_total = None # Calculado na primeira gravacao
+        self.acertos = 0
+        self.falhas = 0
+
+    @staticmethod
+    def chave(*partes) -> str:
+        """Chave de conteudo: hash da representacao JSON canonica das partes."""
+        texto = json.dumps(partes, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.blake2b(texto.encode("utf-8"), digest_size=20).hexdigest()
+
+    def _caminho(self, chave: str, extensao: str) -> str:
+        return os.path.join(self.pasta, chave[:2], chave + extensao)
+
+    def _ler(self, chave: str, extensao: str, ler):
+        caminho = self._caminho(chave, extensao)
+        try:
+            valor = ler(caminho)
+        except FileNotFoundError:
+            self.falhas += 1
+            return None
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            # Entrada corrompida (ex: gravacao interrompida por outro processo): descarta
+            self.falhas += 1
+            self._remover(caminho)
+            return None
+        try:
+            os.utime(caminho) # Mais recentemente usado
+        except OSError:
+            pass
+        self.acertos += 1
+        return valor
+
+    def _gravar(self, chave: str, extensao: str, gravar):
+        caminho = self._caminho(chave, extensao)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix=".tmp")
+        try:
+            with os.fdopen(descritor, "wb") as f:
+                gravar(f)
+            anterior = os.path.getsize(caminho) if os.path.exists(caminho) else 0
+            os.replace(temporario, caminho)
+        except BaseException:
+            self._remover(temporario)
+            raise
+        self._registrar_gravacao(os.path.getsize(caminho) - anterior)
+
+    def obter_json(self, chave: str):
+        """Valor JSON guardado na chave, ou None."""
+        def ler(caminho):
+            with open(caminho, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return self._ler(chave, ".json", ler)
+
+    def guardar_json(self, chave: str, valor):
+        self._gravar(chave, ".json", lambda f: f.write(json.dumps(valor, separators=(",", ":")).encode("utf-8")))
+
+    def obter_arrays(self, chave: str) -> Dict[str, np.ndarray] | None:
+        """Dicionario de arrays guardado na chave, ou None."""
+        def ler(caminho):
+            with np.load(caminho, allow_pickle=False) as arquivo:
+                return {nome: arquivo[nome] for nome in arquivo.files}
+        return self._ler(chave, ".npz", ler)
+
+    def guardar_arrays(self, chave: str, arrays: Dict[str, np.ndarray]):
+        self._gravar(chave, ".npz", lambda f: np.savez(f, **arrays))
+
+    def _arquivos(self) -> List[os.DirEntry]:
+        arquivos = []
+        if not os.path.isdir(self.pasta):
+            return arquivos
+        for subpasta in os.scandir(self.pasta):
+            if subpasta.is_dir():
+                arquivos.extend(e for e in os.scandir(subpasta.path)
+                                if e.is_file() and not e.name.endswith(".tmp"))
+        return arquivos
+
+    def tamanho_total(self) -> int:
+        """Tamanho total (bytes) das entradas em disco."""
+        if self._tamanho_total is None:
+            self._tamanho_total = sum(e.stat().st_size for e in self._arquivos())
+        return self._tamanho_total
+
+    def _registrar_gravacao(self, variacao: int):
+        self._tamanho_total = self.tamanho_total() + variacao
+        if self._tamanho_total > self.tamanho_maximo:
+            self.descartar_antigos()
+
+    def descartar_antigos(self, fracao: float = 0.9):
+        """Remove as entradas usadas ha mais tempo ate o cache ocupar ``fracao`` do limite."""
+        arquivos = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in self._arquivos()))
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        limite = self.tamanho_maximo * fracao
+        for _, tamanho, caminho in arquivos:
+            if total <= limite:
+                break
+            if self._remover(caminho):
+                total -= tamanho
+        self._tamanho_total = total
+
+    def limpar(self):
+        """Remove todas as entradas."""
+        for entrada in self._arquivos():
+            self._remover(entrada.path)
+        self._tamanho_total = 0
+
+    @staticmethod
+    def _remover(caminho: str) -> bool:
+        try:
+            os.remove(caminho)
+            return True
+        except OSError:
+            return False
@@ -13,9 +13,44 @@ Cada camada de solo e representada por um dicionario contendo:
 
 As funcoes retornam a carga de ruptura (qult) e, no caso de Decourt &
 Quaresma, tambem a carga admissivel (qadm).
+
+Para avaliar muitas estacas de uma vez (varios pilares, diametros,
+comprimentos e tipos de estaca) existem as versoes em lote
+``aoki_velloso_lote`` e ``decourt_quaresma_lote``. Elas recebem as camadas em
+formato colunar (arrays de topo, base, NSPT e codigo do solo, ver
+``camadas_para_colunas``) e arrays com a geometria das estacas, e devolvem
+arrays de resultados calculados numa unica passada vetorizada com NumPy. Os
+resultados coincidem exatamente com os das funcoes escalares.
+
+``perfil_capacidade_decourt`` implementa a formulacao usada na aba
+"Décourt-Quaresma (1996)" da interface (tabelas α/β por tipo de estaca) e
+devolve Pp, Pl e Pdqm para todas as profundidades de ponta numa unica
+passada de somas acumuladas, em vez de repetir o laco metro a metro para
+cada comprimento. A discretizacao da resistencia lateral e configuravel
+(``discretizacao``): segmentos de 1 m (padrao da interface), as proprias
+camadas (integracao exata) ou um passo qualquer, como 0.1 m.
+``perfil_capacidade_aoki_velloso`` faz o mesmo para Aoki & Velloso, e
+``perfil_capacidade_metodos`` calcula as duas curvas numa unica passada
+pelo perfil (abas "Décourt-Quaresma" e "Aoki-Velloso" e calculo em lote).
+
+As funcoes que recebem um ``IndiceProfundidade`` (e ``camadas_para_colunas``)
+tambem aceitam diretamente um ``perfil_sondagem.PerfilSondagem``.
 """
 
-from typing import List, Dict
+import math
+from typing import List, Dict, Sequence, Tuple
+
+import numpy as np
+
+from coeficientes import TabelaCoeficientesDecourt, TabelaFatoresAokiVelloso, coeficiente_ponta_decourt
+from instrumentacao import instrumentado
+from parametros import fatores_aoki_velloso
+from perfil_sondagem import IndiceProfundidade, PerfilSondagem
+
+# Versao das formulas das curvas de capacidade. Faz parte das chaves do cache em disco
+# (interface e calculo em lote): incrementar ao mudar o calculo para que resultados
+# antigos nao sejam reaproveitados.
+VERSAO_CALCULO = 4
 
 
 def aoki_velloso(
@@ -129,6 +164,668 @@ def decourt_quaresma(
     return {"qult": qult_total, "qadm": qadm}
 
 
+def camadas_para_colunas(
+    camadas: List[Dict] | PerfilSondagem,
+    categorias: Sequence[str] | None = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[str]]:
+    """Converte a lista de camadas (dicionarios) para o formato colunar.
+
+    Parameters
+    ----------
+    camadas : lista de camadas no mesmo formato das funcoes escalares, ou um
+        ``PerfilSondagem`` (cujos arrays ja estao no formato colunar).
+    categorias : opcional, lista inicial de tipos de solo. A posicao de cada
+        tipo na lista e o seu codigo. Tipos novos sao acrescentados ao final.
+
+    Returns
+    -------
+    (prof_topo, prof_base, nspt, codigo_solo, categorias), com as camadas
+    ordenadas pela profundidade inicial.
+    """
+    if isinstance(camadas, PerfilSondagem):
+        prof_topo, prof_base, nspt, codigo_solo, categorias_perfil = camadas.colunas()
+        if categorias is None:
+            return prof_topo, prof_base, nspt, codigo_solo, categorias_perfil
+        # Recodifica os solos do perfil segundo a lista de categorias informada
+        categorias = list(categorias)
+        indice = {nome: i for i, nome in enumerate(categorias)}
+        for solo in categorias_perfil:
+            if solo not in indice:
+                indice[solo] = len(categorias)
+                categorias.append(solo)
+        recodificar = np.array([indice[solo] for solo in categorias_perfil], dtype=np.intp)
+        return prof_topo, prof_base, nspt, recodificar[codigo_solo], categorias
+
+    ordenadas = sorted(camadas, key=lambda c: float(c["Prof_Inicial"]))
+    categorias = list(categorias) if categorias is not None else []
+    indice = {nome: i for i, nome in enumerate(categorias)}
+    codigos = []
+    for camada in ordenadas:
+        solo = camada["Tipo_Solo"]
+        if solo not in indice:
+            indice[solo] = len(categorias)
+            categorias.append(solo)
+        codigos.append(indice[solo])
+
+    prof_topo = np.array([float(c["Prof_Inicial"]) for c in ordenadas], dtype=np.float64)
+    prof_base = np.array([float(c["Prof_Final"]) for c in ordenadas], dtype=np.float64)
+    nspt = np.array([float(c.get("NSPT", 0)) for c in ordenadas], dtype=np.float64)
+    codigo_solo = np.array(codigos, dtype=np.intp)
+    return prof_topo, prof_base, nspt, codigo_solo, categorias
+
+
+def _como_indice(perfil: IndiceProfundidade | PerfilSondagem) -> IndiceProfundidade:
+    """Aceita tanto um ``IndiceProfundidade`` quanto um ``PerfilSondagem``."""
+    return perfil.indice() if isinstance(perfil, PerfilSondagem) else perfil
+
+
+def camadas_ao_longo_do_fuste(
+    indice: IndiceProfundidade | PerfilSondagem, prof_topo: float, prof_ponta: float
+) -> List[Dict]:
+    """Recorta as camadas atravessadas pelo fuste, entre ``prof_topo`` e
+    ``prof_ponta``, no formato esperado pelas funcoes escalares.
+
+    A busca das camadas usa o ``IndiceProfundidade`` (O(log n)), em vez de
+    percorrer todas as camadas da sondagem.
+    """
+    indice = _como_indice(indice)
+    inicio, fim = indice.camadas_no_intervalo(prof_topo, prof_ponta)
+    return [
+        {
+            "Prof_Inicial": max(float(indice.topos[i]), prof_topo),
+            "Prof_Final": min(float(indice.bases[i]), prof_ponta),
+            "Tipo_Solo": indice.tipos_solo[i],
+            "NSPT": float(indice.nspt[i]),
+        }
+        for i in range(inicio, fim)
+    ]
+
+
+def coeficientes_para_array(
+    coeficientes: Dict[str, float], categorias: Sequence[str]
+) -> np.ndarray:
+    """Converte um dicionario de coeficientes por solo num array indexado
+    pelo codigo do solo. Solos sem coeficiente recebem NaN."""
+    return np.array(
+        [float(coeficientes[s]) if s in coeficientes else np.nan for s in categorias],
+        dtype=np.float64,
+    )
+
+
+def _preparar_lote(prof_topo, prof_base, nspt, codigo_solo, prof_ponta, prof_topo_estaca, codigo_solo_ponta):
+    """Calcula o comprimento de cada camada ao longo do fuste de cada estaca.
+
+    Retorna (comp, n_camada, codigo_solo, codigo_ponta, usada), onde ``comp``
+    e ``usada`` tem forma (estacas, camadas).
+    """
+    prof_topo = np.asarray(prof_topo, dtype=np.float64)
+    prof_base = np.asarray(prof_base, dtype=np.float64)
+    codigo_solo = np.asarray(codigo_solo, dtype=np.intp)
+    n_camada = np.minimum(np.asarray(nspt, dtype=np.float64), 50)
+    if prof_topo.size == 0:
+        raise ValueError("Lista de camadas vazia")
+
+    ponta = np.atleast_1d(np.asarray(prof_ponta, dtype=np.float64))
+    topo_estaca = np.broadcast_to(np.asarray(prof_topo_estaca, dtype=np.float64), ponta.shape)
+
+    inicio = np.maximum(prof_topo[None, :], topo_estaca[:, None])
+    fim = np.minimum(prof_base[None, :], ponta[:, None])
+    comp = np.clip(fim - inicio, 0.0, None)
+    usada = fim > inicio
+
+    if codigo_solo_ponta is None:
+        # Camada que contem a ponta: a ultima cujo topo esta acima da ponta,
+        # equivalente a camadas[-1] nas funcoes escalares.
+        idx = np.clip(np.searchsorted(prof_topo, ponta, side="left") - 1, 0, prof_topo.size - 1)
+        codigo_ponta = codigo_solo[idx]
+    else:
+        codigo_ponta = np.broadcast_to(np.asarray(codigo_solo_ponta, dtype=np.intp), ponta.shape)
+    return comp, n_camada, codigo_solo, codigo_ponta, usada
+
+
+def _coeficiente_camadas(coef, codigo_solo):
+    """Seleciona o coeficiente de cada camada. ``coef`` pode ter forma
+    (solos,) ou (estacas, solos), util quando cada estaca tem um tipo
+    diferente; o resultado tem forma (camadas,) ou (estacas, camadas)."""
+    coef = np.asarray(coef, dtype=np.float64)
+    return coef[..., codigo_solo]
+
+
+def _coeficiente_ponta(coef, codigo_ponta):
+    """Seleciona o coeficiente do solo na ponta de cada estaca."""
+    coef = np.asarray(coef, dtype=np.float64)
+    if coef.ndim == 1:
+        return coef[codigo_ponta]
+    return coef[np.arange(codigo_ponta.size), codigo_ponta]
+
+
+def _soma_sequencial(parcelas: np.ndarray) -> np.ndarray:
+    """Soma ao longo das camadas na mesma ordem do laco das funcoes escalares,
+    para que os resultados sejam identicos bit a bit."""
+    if parcelas.shape[-1] == 0:
+        return np.zeros(parcelas.shape[:-1])
+    return np.cumsum(parcelas, axis=-1)[..., -1]
+
+
+def aoki_velloso_lote(
+    prof_topo: np.ndarray,
+    prof_base: np.ndarray,
+    nspt: np.ndarray,
+    codigo_solo: np.ndarray,
+    prof_ponta: np.ndarray,
+    n_ponta: np.ndarray,
+    area_ponta: np.ndarray,
+    perimetro_fuste: np.ndarray,
+    k: np.ndarray,
+    alpha: np.ndarray,
+    f1: np.ndarray | float = 1.0,
+    f2: np.ndarray | float = 2.0,
+    prof_topo_estaca: np.ndarray | float = 0.0,
+    codigo_solo_ponta: np.ndarray | None = None,
+) -> np.ndarray:
+    """Versao vetorizada de ``aoki_velloso`` para varias estacas.
+
+    Parameters
+    ----------
+    prof_topo, prof_base, nspt, codigo_solo : camadas em formato colunar,
+        ordenadas pela profundidade (ver ``camadas_para_colunas``).
+    prof_ponta : profundidade da ponta de cada estaca (m).
+    n_ponta, area_ponta, perimetro_fuste : arrays (ou escalares) por estaca.
+    k, alpha : coeficientes indexados pelo codigo do solo. Podem ter forma
+        (solos,) ou (estacas, solos).
+    f1, f2 : coeficientes de correcao, escalares ou por estaca.
+    prof_topo_estaca : profundidade do topo do fuste de cada estaca (m).
+    codigo_solo_ponta : opcional, codigo do solo na ponta de cada estaca. Se
+        None, usa o da camada que contem a ponta.
+
+    Returns
+    -------
+    Array com a carga de ruptura (qult) de cada estaca.
+    """
+    comp, n_camada, codigos, codigo_ponta, usada = _preparar_lote(
+        prof_topo, prof_base, nspt, codigo_solo, prof_ponta, prof_topo_estaca, codigo_solo_ponta
+    )
+    n_estacas = comp.shape[0]
+    n_ponta, area_ponta, perimetro_fuste, f1, f2 = np.broadcast_arrays(
+        np.minimum(np.asarray(n_ponta, dtype=np.float64), 50),
+        np.asarray(area_ponta, dtype=np.float64),
+        np.asarray(perimetro_fuste, dtype=np.float64),
+        np.asarray(f1, dtype=np.float64),
+        np.asarray(f2, dtype=np.float64),
+        np.empty(n_estacas),
+    )[:5]
+
+    k_ponta = _coeficiente_ponta(k, codigo_ponta)
+    if np.isnan(k_ponta).any():
+        solo = codigo_ponta[np.isnan(k_ponta)][0]
+        raise KeyError(f"Coeficiente k nao definido para o solo de codigo {solo}")
+    qult_ponta = f1 * area_ponta * k_ponta * n_ponta
+
+    k_c = _coeficiente_camadas(k, codigos)
+    a_c = _coeficiente_camadas(alpha, codigos)
+    faltando = usada & (np.isnan(k_c) | np.isnan(a_c))
+    if faltando.any():
+        solo = np.broadcast_to(codigos, faltando.shape)[faltando][0]
+        raise KeyError(f"Coeficientes k/alpha nao definidos para o solo de codigo {solo}")
+    tau = np.where(usada, a_c * k_c * n_camada, 0.0)
+
+    qult_lateral = _soma_sequencial(tau * comp)
+    qult_lateral = qult_lateral * (perimetro_fuste * f2)
+    return qult_ponta + qult_lateral
+
+
+def decourt_quaresma_lote(
+    prof_topo: np.ndarray,
+    prof_base: np.ndarray,
+    nspt: np.ndarray,
+    codigo_solo: np.ndarray,
+    prof_ponta: np.ndarray,
+    n_ponta: np.ndarray,
+    area_ponta: np.ndarray,
+    perimetro_fuste: np.ndarray,
+    C: np.ndarray,
+    alpha_l: np.ndarray,
+    FSP: np.ndarray | float = 2.0,
+    FSL: np.ndarray | float = 2.0,
+    alpha_p: np.ndarray | float = 1.0,
+    prof_topo_estaca: np.ndarray | float = 0.0,
+    codigo_solo_ponta: np.ndarray | None = None,
+) -> Dict[str, np.ndarray]:
+    """Versao vetorizada de ``decourt_quaresma`` para varias estacas.
+
+    Os parametros seguem ``aoki_velloso_lote``; ``C`` e ``alpha_l`` sao
+    indexados pelo codigo do solo e ``FSP``, ``FSL`` e ``alpha_p`` podem ser
+    escalares ou arrays por estaca.
+
+    Returns
+    -------
+    Dicionario com os arrays "qult" e "qadm" de cada estaca.
+    """
+    comp, n_camada, codigos, codigo_ponta, usada = _preparar_lote(
+        prof_topo, prof_base, nspt, codigo_solo, prof_ponta, prof_topo_estaca, codigo_solo_ponta
+    )
+    n_estacas = comp.shape[0]
+    n_ponta, area_ponta, perimetro_fuste, FSP, FSL, alpha_p = np.broadcast_arrays(
+        np.minimum(np.asarray(n_ponta, dtype=np.float64), 50),
+        np.asarray(area_ponta, dtype=np.float64),
+        np.asarray(perimetro_fuste, dtype=np.float64),
+        np.asarray(FSP, dtype=np.float64),
+        np.asarray(FSL, dtype=np.float64),
+        np.asarray(alpha_p, dtype=np.float64),
+        np.empty(n_estacas),
+    )[:6]
+
+    C_ponta = _coeficiente_ponta(C, codigo_ponta)
+    if np.isnan(C_ponta).any():
+        solo = codigo_ponta[np.isnan(C_ponta)][0]
+        raise KeyError(f"Coeficiente C nao definido para o solo de codigo {solo}")
+    qp_ult = alpha_p * C_ponta * n_ponta
+    qult_ponta = area_ponta * qp_ult
+
+    a_l = _coeficiente_camadas(alpha_l, codigos)
+    faltando = usada & np.isnan(a_l)
+    if faltando.any():
+        solo = np.broadcast_to(codigos, faltando.shape)[faltando][0]
+        raise KeyError(f"Coeficiente alpha_l nao definido para o solo de codigo {solo}")
+    tau = np.where(usada, a_l * n_camada, 0.0)
+
+    qult_lateral = _soma_sequencial(tau * comp)
+    qult_lateral = qult_lateral * perimetro_fuste
+
+    qult_total = qult_ponta + qult_lateral
+    qadm = qult_ponta / FSP + qult_lateral / FSL
+    return {"qult": qult_total, "qadm": qadm}
+
+
+# Discretizacao da resistencia lateral: segmentos nas fronteiras das camadas
+DISCRETIZACAO_CAMADAS = "camadas"
+
+
+def bordas_segmentos(
+    indice: IndiceProfundidade,
+    cota_arrasamento: float,
+    prof_limite: float,
+    discretizacao: float | str | None = None,
+) -> np.ndarray:
+    """Bordas (profundidades) dos segmentos de integracao da resistencia lateral.
+
+    Parameters
+    ----------
+    indice : indice de profundidade da sondagem.
+    cota_arrasamento : cota de arrasamento (m).
+    prof_limite : profundidade ate onde os segmentos devem ir.
+    discretizacao :
+        - None (padrão): segmentos de 1 m a partir de ``floor(prof_arrasamento)``,
+          como na formulacao original da interface;
+        - ``DISCRETIZACAO_CAMADAS``: do arrasamento ate ``prof_limite``,
+          quebrando nas fronteiras das camadas (NSPT constante em cada segmento);
+        - um numero: passo (m) a partir do arrasamento, com o ultimo segmento
+          encurtado para terminar em ``prof_limite``.
+
+    Returns
+    -------
+    Array crescente com n+1 bordas para n segmentos (apenas o topo se n = 0).
+    """
+    prof_arrasamento = indice.cota_terreno - cota_arrasamento
+    if discretizacao is None:
+        inicio = math.floor(prof_arrasamento)
+        if prof_limite <= inicio:
+            return np.array([inicio], dtype=np.float64)
+        return inicio + np.arange(math.ceil(prof_limite - inicio) + 1, dtype=np.float64)
+
+    if prof_limite <= prof_arrasamento:
+        return np.array([prof_arrasamento], dtype=np.float64)
+    if discretizacao == DISCRETIZACAO_CAMADAS:
+        fronteiras = np.concatenate((indice.topos, indice.bases))
+        internas = fronteiras[(fronteiras > prof_arrasamento) & (fronteiras < prof_limite)]
+        return np.unique(np.concatenate(([prof_arrasamento], internas, [prof_limite])))
+
+    passo = float(discretizacao)
+    if not passo > 0:
+        raise ValueError(f"Passo de integração inválido: {discretizacao}")
+    n_segmentos = max(math.ceil((prof_limite - prof_arrasamento) / passo - 1e-9), 1)
+    bordas = prof_arrasamento + passo * np.arange(n_segmentos + 1, dtype=np.float64)
+    bordas[-1] = prof_limite
+    return bordas
+
+
+def profundidades_do_perfil(
+    indice: IndiceProfundidade | PerfilSondagem,
+    cota_arrasamento: float,
+    discretizacao: float | str | None = None,
+) -> np.ndarray:
+    """Profundidades de ponta da curva de capacidade: o final de cada segmento
+    abaixo do arrasamento (1 m por padrão, ver ``bordas_segmentos``), ate o
+    fim da sondagem."""
+    indice = _como_indice(indice)
+    bordas = bordas_segmentos(indice, cota_arrasamento, indice.profundidade_maxima, discretizacao)
+    return np.minimum(bordas[1:], indice.profundidade_maxima)
+
+
+def _segmentos_integracao(
+    indice: IndiceProfundidade,
+    cota_arrasamento: float,
+    prof_pontas: np.ndarray,
+    discretizacao: float | str | None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bordas dos segmentos ate a ponta mais profunda e (NSPT, codigo do solo) no meio de cada um."""
+    prof_limite = float(prof_pontas.max()) if prof_pontas.size else -math.inf
+    bordas = bordas_segmentos(indice, cota_arrasamento, prof_limite, discretizacao)
+    nspt_segmento, codigos_segmento = indice.consultar_lote(bordas[:-1] + np.diff(bordas) / 2.0)
+    return bordas, nspt_segmento, codigos_segmento
+
+
+@instrumentado()
+def perfil_capacidade_decourt(
+    indice: IndiceProfundidade | PerfilSondagem,
+    coeficientes: TabelaCoeficientesDecourt,
+    tipo_estaca: str,
+    diametro_m,
+    cota_arrasamento: float,
+    prof_pontas=None,
+    discretizacao: float | str | None = None,
+    nspt_ponta_media: bool = False,
+) -> Dict[str, np.ndarray]:
+    """Curva de capacidade de Décourt-Quaresma para todas as profundidades de ponta.
+
+    A resistencia lateral e integrada em segmentos com o NSPT no meio de cada
+    segmento e ql = α·N + β. Por padrão os segmentos tem 1 m a partir de
+    ``floor(prof_arrasamento)`` e cada um soma ql (inclusive o trecho final
+    parcial acima da ponta), como na formulacao original. Com outra
+    ``discretizacao`` (ver ``bordas_segmentos``) a integracao comeca no
+    arrasamento e cada segmento soma ql·espessura. Os segmentos sao gerados
+    de forma vetorizada e as somas acumuladas fazem com que cada
+    profundidade de ponta adicional custe O(1), qualquer que seja o passo.
+
+    Parameters
+    ----------
+    indice : indice de profundidade da sondagem.
+    coeficientes : matrizes α/β compiladas.
+    tipo_estaca : tipo de estaca (coluna das tabelas α/β).
+    diametro_m : diametro (m), escalar ou array 1D de diametros.
+    cota_arrasamento : cota de arrasamento (m).
+    prof_pontas : profundidades da ponta a avaliar. Padrão:
+        ``profundidades_do_perfil``.
+    discretizacao : segmentos de integracao da resistencia lateral (None,
+        ``DISCRETIZACAO_CAMADAS`` ou passo em m).
+    nspt_ponta_media : se True, o NSPT de ponta e a media de Décourt (1 m
+        acima, na ponta e 1 m abaixo), lida do perfil pre-calculado de
+        ``IndiceProfundidade.nspt_ponta_medio``; padrão: NSPT da camada da ponta.
+
+    Returns
+    -------
+    Dicionario com:
+        - por segmento: "prof_segmento" (topo), "prof_base_segmento",
+          "nspt_segmento", "alfa_segmento", "beta_segmento" e "ql_segmento" (kPa);
+        - por profundidade de ponta: "prof_ponta", "nspt_ponta" e "qp" (kPa),
+          "Pp", "Pl" e "Pdqm" (kN). Com varios diametros essas chaves tem
+          forma (diametros, pontas). Pontas sem dados de SPT valem NaN.
+    """
+    indice = _como_indice(indice)
+    if prof_pontas is None:
+        prof_pontas = profundidades_do_perfil(indice, cota_arrasamento, discretizacao)
+    prof_pontas = np.asarray(prof_pontas, dtype=np.float64)
+    segmentos = _segmentos_integracao(indice, cota_arrasamento, prof_pontas, discretizacao)
+    return _perfil_decourt(indice, segmentos, coeficientes, tipo_estaca, diametro_m, prof_pontas,
+                           discretizacao, nspt_ponta_media)
+
+
+def _perfil_decourt(indice, segmentos, coeficientes, tipo_estaca, diametro_m, prof_pontas, discretizacao,
+                    nspt_ponta_media):
+    """Corpo de ``perfil_capacidade_decourt`` sobre segmentos ja consultados (ver ``_segmentos_integracao``)."""
+    diametro_m = np.asarray(diametro_m, dtype=np.float64)
+    bordas, nspt_segmento, codigos_segmento = segmentos
+    prof_segmento = bordas[:-1]
+    espessura = np.diff(bordas)
+    n_segmentos = prof_segmento.size
+
+    col = coeficientes.indice_estaca(tipo_estaca)
+    linhas_solo = coeficientes.indices_solo(indice.categorias)
+
+    def _ql(nspt, codigos):
+        linha = linhas_solo[codigos]  # codigo -1 cai na linha de zeros
+        alfa = coeficientes.alpha[linha, col]
+        beta = coeficientes.beta[linha, col]
+        # Segmentos sem dados de SPT contribuem com zero
+        ql = np.where(np.isnan(nspt), 0.0, alfa * np.nan_to_num(nspt) + beta)
+        return alfa, beta, ql
+
+    alfa_segmento, beta_segmento, ql_segmento = _ql(nspt_segmento, codigos_segmento)
+    # Com segmentos de 1 m a espessura vale 1.0 e a soma e exatamente a da formulacao original
+    soma_ql = np.concatenate(([0.0], np.cumsum(ql_segmento * espessura)))
+
+    # Segmentos completos acima de cada ponta mais o trecho final parcial
+    n_completos = np.clip(np.searchsorted(bordas[1:], prof_pontas, side="right"), 0, n_segmentos)
+    topo_parcial = bordas[n_completos]
+    tem_parcial = prof_pontas > topo_parcial
+    ql_parcial = _ql(*indice.consultar_lote((topo_parcial + prof_pontas) / 2.0))[2]
+    if discretizacao is not None:
+        ql_parcial = ql_parcial * (prof_pontas - topo_parcial)
+    soma_ql_fuste = soma_ql[n_completos] + np.where(tem_parcial, ql_parcial, 0.0)
+
+    # Resistencia de ponta; "Pré-moldada" e "Metálica" penetram 5% do diametro a mais
+    forma = diametro_m.shape + prof_pontas.shape
+    prof_ponta_calculo = np.broadcast_to(prof_pontas, forma)
+    if "Pré-moldada" in tipo_estaca or tipo_estaca == "Metálica":
+        prof_ponta_calculo = prof_ponta_calculo + 0.05 * diametro_m[..., None]
+    nspt_ponta, codigo_ponta = indice.consultar_lote(prof_ponta_calculo)
+    if nspt_ponta_media:
+        nspt_ponta = indice.nspt_ponta_medio(prof_ponta_calculo)
+    c_ponta = np.array([coeficiente_ponta_decourt(s) for s in indice.categorias] + [np.nan])[codigo_ponta]
+    qp = c_ponta * nspt_ponta
+
+    area_ponta = (math.pi * (diametro_m / 2) ** 2)[..., None]
+    Pp = qp * area_ponta
+    Pl = soma_ql_fuste * area_ponta
+    Pdqm = (Pp + Pl) / 2.0
+
+    return {
+        "prof_segmento": prof_segmento,
+        "prof_base_segmento": bordas[1:],
+        "nspt_segmento": nspt_segmento,
+        "alfa_segmento": alfa_segmento,
+        "beta_segmento": beta_segmento,
+        "ql_segmento": ql_segmento,
+        "prof_ponta": prof_pontas,
+        "nspt_ponta": nspt_ponta,
+        "qp": qp,
+        "Pp": Pp,
+        "Pl": Pl,
+        "Pdqm": Pdqm,
+    }
+
+
+def _primitiva_camadas(indice: IndiceProfundidade, valores: np.ndarray, profundidades: np.ndarray) -> np.ndarray:
+    """Integral, de 0 ate cada profundidade, de valores constantes em cada camada.
+
+    ``valores`` tem forma (camadas,) ou (grandezas, camadas); o resultado tem
+    forma (..., profundidades). Usa as somas acumuladas de valor x espessura
+    das camadas: cada profundidade custa uma unica busca binaria, comum a
+    todas as grandezas. Trechos sem camada valem zero.
+    """
+    acumulado = np.cumsum(valores * (indice.bases - indice.topos), axis=-1)
+    acumulado = np.concatenate((np.zeros(acumulado.shape[:-1] + (1,)), acumulado), axis=-1)
+    completas = np.searchsorted(indice.bases, profundidades, side="right")
+    atual = np.minimum(completas, indice.bases.size - 1)
+    dentro = np.where(completas < indice.bases.size, np.clip(profundidades - indice.topos[atual], 0.0, None), 0.0)
+    return acumulado[..., completas] + valores[..., atual] * dentro
+
+
+def _perfil_aoki_velloso(indice, k, alpha, f1, f2, diametro_m, cota_arrasamento, prof_pontas, segmentos=None,
+                         discretizacao=None):
+    """Curva de Aoki-Velloso; retorna (perfil, pontas que usam solo sem K/α).
+
+    A resistencia lateral e a integral exata, camada a camada, de α·K·N/F2
+    entre o arrasamento e a ponta, obtida por somas acumuladas. Com
+    ``segmentos`` (ver ``_segmentos_integracao``) tambem devolve K, α e rl
+    de cada segmento, para a tabela da interface; se alem disso
+    ``discretizacao`` nao for None, a resistencia lateral e a soma de
+    rl x espessura nesses mesmos segmentos (com ``DISCRETIZACAO_CAMADAS``,
+    igual a integral exata).
+    """
+    if not len(indice):
+        raise ValueError("Lista de camadas vazia")
+    k = coeficientes_para_array(k, indice.categorias)
+    alpha = coeficientes_para_array(alpha, indice.categorias)
+    f1 = np.asarray(f1, dtype=np.float64)[..., None]
+    f2 = np.asarray(f2, dtype=np.float64)[..., None]
+    diametro_m = np.asarray(diametro_m, dtype=np.float64)[..., None]
+
+    # Ponta: NSPT na profundidade da ponta e K do solo da camada que a contem
+    camada_ponta = np.clip(np.searchsorted(indice.topos, prof_pontas, side="left") - 1, 0, len(indice) - 1)
+    k_ponta = k[indice.codigos[camada_ponta]]
+    nspt_ponta, _ = indice.consultar_lote(prof_pontas)
+    rp = k_ponta * np.minimum(nspt_ponta, 50) / f1
+    perfil = {"prof_ponta": prof_pontas, "nspt_ponta": nspt_ponta, "rp": rp}
+
+    if segmentos is not None:
+        bordas, nspt_segmento, codigos_segmento = segmentos
+        k_segmento = np.append(k, np.nan)[codigos_segmento] # codigo -1 (sem camada): NaN
+        alfa_segmento = np.append(alpha, np.nan)[codigos_segmento]
+        tau_segmento = alfa_segmento * k_segmento * np.minimum(nspt_segmento, 50)
+        perfil.update({"k_segmento": k_segmento, "alfa_segmento": alfa_segmento, "rl_segmento": tau_segmento / f2})
+
+    prof_topo = indice.cota_terreno - cota_arrasamento
+    if segmentos is not None and discretizacao is not None:
+        # Mesmos segmentos da tabela: completos acima de cada ponta mais o trecho final parcial.
+        # Um segmento sem K/α ou sem NSPT (NaN) invalida as pontas abaixo dele
+        n_segmentos = bordas.size - 1
+        soma_tau = np.concatenate(([0.0], np.cumsum(tau_segmento * np.diff(bordas))))
+        n_completos = np.clip(np.searchsorted(bordas[1:], prof_pontas, side="right"), 0, n_segmentos)
+        topo_parcial = bordas[n_completos]
+        tem_parcial = prof_pontas > topo_parcial
+        nspt_parcial, codigos_parcial = indice.consultar_lote((topo_parcial + prof_pontas) / 2.0)
+        tau_parcial = (np.append(alpha, np.nan)[codigos_parcial] * np.append(k, np.nan)[codigos_parcial]
+                       * np.minimum(nspt_parcial, 50))
+        lateral = soma_tau[n_completos] + np.where(tem_parcial, tau_parcial * (prof_pontas - topo_parcial), 0.0)
+        faltando = np.isnan(lateral)
+    else:
+        # α·K·N de cada camada (N limitado a 50). Camadas sem coeficiente (ou sem NSPT) entram nas
+        # somas como zero e sao contadas a parte: as pontas cujo fuste passa por elas valem NaN
+        coeficiente_camada = alpha[indice.codigos] * k[indice.codigos]
+        tau = coeficiente_camada * np.minimum(indice.nspt, 50)
+        # Primitivas no fundo do fuste de cada ponta e no arrasamento (ultima coluna)
+        limites = np.append(np.maximum(prof_pontas, prof_topo), prof_topo)
+        if np.isnan(tau).any():
+            primitivas = _primitiva_camadas(indice, np.stack((np.nan_to_num(tau), np.isnan(coeficiente_camada),
+                                                              np.isnan(tau))), limites)
+            no_fuste = primitivas[:, :-1] - primitivas[:, -1:]
+            lateral = np.where(no_fuste[2] > 0, np.nan, no_fuste[0])
+            faltando = no_fuste[1] > 0
+        else:
+            primitiva = _primitiva_camadas(indice, tau, limites)
+            lateral = primitiva[:-1] - primitiva[-1]
+            faltando = np.zeros(prof_pontas.shape, dtype=bool)
+    faltando = faltando | np.isnan(k_ponta)
+
+    Pp = rp * (math.pi * (diametro_m / 2) ** 2)
+    Pl = lateral / f2 * (math.pi * diametro_m)
+    qult = Pp + Pl
+    perfil.update({"Pp": Pp, "Pl": Pl, "qult": qult, "qadm": qult / 2.0, "f1": f1[..., 0], "f2": f2[..., 0]})
+    return perfil, faltando
+
+
+@instrumentado()
+def perfil_capacidade_aoki_velloso(
+    indice: IndiceProfundidade | PerfilSondagem,
+    k: Dict[str, float],
+    alpha: Dict[str, float],
+    tipo_estaca: str,
+    diametro_m,
+    cota_arrasamento: float,
+    prof_pontas=None,
+    fatores: TabelaFatoresAokiVelloso | None = None,
+) -> Dict[str, np.ndarray]:
+    """Carga de ruptura de Aoki & Velloso para varias profundidades de ponta.
+
+    Usa o NSPT da camada que contem a ponta, a integral exata de α·K·N ao
+    longo das camadas do fuste (somas acumuladas, sem repetir a soma para
+    cada ponta) e os fatores F1/F2 das tabelas editaveis (``fatores``) ou,
+    se None, de ``parametros.fatores_aoki_velloso``. Os resultados coincidem
+    com os de ``aoki_velloso_lote`` (F1 e F2 como 1/F1 e 1/F2). A carga
+    admissivel usa fator de seguranca global 2.
+
+    ``diametro_m`` pode ser um array de diametros: todas as combinacoes
+    diametro x ponta sao calculadas de uma vez.
+
+    Returns
+    -------
+    Dicionario com "prof_ponta", "nspt_ponta", "rp" (kPa), "Pp", "Pl",
+    "qult" e "qadm" (kN), estes com forma (pontas,) ou (diametros, pontas),
+    e "f1"/"f2" usados. Pontas sem dados de SPT valem NaN.
+
+    Raises
+    ------
+    KeyError : se o fuste ou a ponta de alguma estaca estiver num solo sem K/α.
+    """
+    indice = _como_indice(indice)
+    if prof_pontas is None:
+        prof_pontas = profundidades_do_perfil(indice, cota_arrasamento)
+    prof_pontas = np.asarray(prof_pontas, dtype=np.float64)
+    f1, f2 = _fatores_av(fatores, tipo_estaca, diametro_m)
+    perfil, faltando = _perfil_aoki_velloso(indice, k, alpha, f1, f2, diametro_m, cota_arrasamento, prof_pontas)
+    if faltando.any():
+        solos = sorted({s for s in indice.categorias if s not in k or s not in alpha})
+        raise KeyError(f"Coeficientes k/alpha nao definidos para {', '.join(solos)}")
+    return perfil
+
+
+def _fatores_av(fatores, tipo_estaca, diametro_m):
+    """(F1, F2) das tabelas compiladas ou, sem elas, de ``parametros.fatores_aoki_velloso``."""
+    diametro_m = np.asarray(diametro_m, dtype=np.float64)
+    if fatores is not None:
+        return fatores.fatores(tipo_estaca, diametro_m)
+    return tuple(np.broadcast_to(np.asarray(f, dtype=np.float64), diametro_m.shape)
+                 for f in fatores_aoki_velloso(tipo_estaca, diametro_m))
+
+
+@instrumentado()
+def perfil_capacidade_metodos(
+    indice: IndiceProfundidade | PerfilSondagem,
+    coeficientes: TabelaCoeficientesDecourt,
+    k: Dict[str, float],
+    alpha: Dict[str, float],
+    fatores: TabelaFatoresAokiVelloso | None,
+    tipo_estaca: str,
+    diametro_m,
+    cota_arrasamento: float,
+    prof_pontas=None,
+    discretizacao: float | str | None = None,
+    nspt_ponta_media: bool = False,
+) -> Dict[str, np.ndarray]:
+    """Curvas de Décourt-Quaresma e Aoki-Velloso numa unica passada pelo perfil.
+
+    Os segmentos de integracao e a consulta do NSPT e do solo no meio de cada
+    um sao feitos uma vez e usados pelos dois metodos; os parametros sao os
+    de ``perfil_capacidade_decourt`` e ``perfil_capacidade_aoki_velloso``.
+    Com ``discretizacao`` ``DISCRETIZACAO_CAMADAS`` ou um passo, a resistencia
+    lateral de Aoki-Velloso tambem e somada nesses segmentos (rl x espessura);
+    com None (segmentos de 1 m de Décourt-Quaresma), e a integral exata.
+
+    Returns
+    -------
+    As chaves de ``perfil_capacidade_decourt`` mais as de Aoki-Velloso com
+    prefixo "av_" ("av_nspt_ponta", "av_rp", "av_Pp", "av_Pl", "av_qult",
+    "av_qadm", "av_f1", "av_f2") e, por segmento, "av_k_segmento",
+    "av_alfa_segmento" e "av_rl_segmento" (kPa). Em vez de levantar KeyError,
+    as pontas cujo fuste ou ponta esta num solo sem K/α valem NaN no
+    Aoki-Velloso, sem afetar o Décourt-Quaresma.
+    """
+    indice = _como_indice(indice)
+    if prof_pontas is None:
+        prof_pontas = profundidades_do_perfil(indice, cota_arrasamento, discretizacao)
+    prof_pontas = np.asarray(prof_pontas, dtype=np.float64)
+    segmentos = _segmentos_integracao(indice, cota_arrasamento, prof_pontas, discretizacao)
+
+    perfil = _perfil_decourt(indice, segmentos, coeficientes, tipo_estaca, diametro_m, prof_pontas,
+                             discretizacao, nspt_ponta_media)
+    f1, f2 = _fatores_av(fatores, tipo_estaca, diametro_m)
+    perfil_av, _ = _perfil_aoki_velloso(indice, k, alpha, f1, f2, diametro_m, cota_arrasamento,
+                                        prof_pontas, segmentos, discretizacao)
+    perfil.update({"av_" + chave: valor for chave, valor in perfil_av.items() if chave != "prof_ponta"})
+    return perfil
+
+
 if __name__ == "__main__":
     # Exemplo simples de uso
     camadas_exemplo = [
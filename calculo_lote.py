@@ -0,0 +1,403 @@
+"""Calculo de capacidade em lote para todo o projeto, sem interface grafica.
+
+Na interface cada sondagem tem a sua aba e o calculo e feito a mao, uma
+estaca de cada vez. Aqui cada par (sondagem, configuracao de estaca) vira uma
+tarefa; as tarefas sao agrupadas em blocos e distribuidas entre processos com
+``ProcessPoolExecutor``, e os resultados sao reunidos numa unica tabela (lista
+de dicionarios, uma linha por profundidade de ponta) com as cargas de
+Décourt-Quaresma e de Aoki-Velloso.
+
+O modulo tambem e a linha de comando do calculo em lote e nunca importa o
+tkinter, podendo rodar em servidores sem interface grafica::
+
+    python -m calculo_lote sondagens.json --pilares pilares.xlsx
+
+Exemplo::
+
+    configuracoes = [
+        {"tipo_estaca": "Hélice Contínua", "diametro_cm": 40, "cota_arrasamento": 0.0},
+        {"tipo_estaca": "Raiz", "diametro_cm": 25, "cota_arrasamento": 0.0, "comprimentos": [10, 12]},
+        {"tipo_estaca": "Raiz", "diametro_cm": 25, "cota_arrasamento": 0.0, "discretizacao": 0.1,
+         "nspt_ponta_media": True},
+    ]
+    tabela = calcular_projeto(dados_sondagens, params, configuracoes,
+                              progresso=lambda feitas, total: print(f"{feitas}/{total}"))
+
+Com um ``CacheDisco`` (``cache=``), o resultado de cada tarefa fica guardado
+em disco sob o hash da sondagem, da configuracao e dos parametros; ao
+recalcular o projeto, apenas as tarefas cujas entradas mudaram sao
+executadas. A linha de comando usa a pasta ``.cache_calculos`` ao lado do
+arquivo de sondagens (``--sem-cache`` desativa).
+
+Sem "cota_arrasamento" na configuracao (ou sem ``--cota-arrasamento`` na linha
+de comando), o arrasamento fica na cota do terreno de cada sondagem.
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from banco_projeto import BancoProjeto, SondagensBanco, e_banco_projeto
+from cache_resultados import CacheDisco, pasta_cache_ao_lado
+from calculo_estacas import DISCRETIZACAO_CAMADAS, VERSAO_CALCULO, perfil_capacidade_metodos
+from coeficientes import TabelaCoeficientesDecourt, TabelaFatoresAokiVelloso
+from otimizador_estacas import comprimentos_da_sondagem, diametros_da_tabela_secao, otimizar_pilares, varrer_grade
+from parametros import ALFA_AOKI_VELLOSO, k_aoki_velloso, parametros_padrao
+from perfil_sondagem import IndiceProfundidade, PerfilSondagem
+
+# Tabelas compiladas do processo atual (preenchidas por _inicializar_processo)
+_coeficientes_processo: TabelaCoeficientesDecourt | None = None
+_fatores_processo: TabelaFatoresAokiVelloso | None = None
+
+
+def _inicializar_processo(params: Dict):
+    """Compila as tabelas de coeficientes uma vez por processo de trabalho."""
+    global _coeficientes_processo, _fatores_processo
+    _coeficientes_processo = TabelaCoeficientesDecourt(params)
+    _fatores_processo = TabelaFatoresAokiVelloso(params)
+
+
+def calcular_tarefa(nome_sondagem: str, indice: IndiceProfundidade, coeficientes: TabelaCoeficientesDecourt,
+                    configuracao: Dict, fatores: TabelaFatoresAokiVelloso | None = None) -> List[Dict]:
+    """Calcula a curva de capacidade de uma configuracao de estaca numa sondagem.
+
+    Se a configuracao tiver "comprimentos", apenas esses comprimentos sao
+    avaliados; caso contrario, toda a curva ate o fim da sondagem. Sem
+    "cota_arrasamento" (ou com None), o arrasamento fica na cota do terreno
+    da sondagem. A chave
+    opcional "discretizacao" define os segmentos de integracao da resistencia
+    lateral (``"camadas"`` ou passo em m; padrão: segmentos de 1 m) e, com
+    "nspt_ponta_media" verdadeiro, o NSPT de ponta e a media de Décourt
+    (1 m acima, na ponta e 1 m abaixo). Os fatores F1/F2 de Aoki-Velloso vem
+    de ``fatores`` (padrão: tabelas de ``coeficientes.params``).
+    """
+    tipo_estaca = configuracao["tipo_estaca"]
+    diametro_cm = float(configuracao["diametro_cm"])
+    cota_arrasamento = configuracao.get("cota_arrasamento")
+    cota_arrasamento = indice.cota_terreno if cota_arrasamento is None else float(cota_arrasamento)
+    discretizacao = configuracao.get("discretizacao")
+    nspt_ponta_media = bool(configuracao.get("nspt_ponta_media", False))
+    prof_arrasamento = indice.cota_terreno - cota_arrasamento
+
+    prof_pontas = None
+    if configuracao.get("comprimentos") is not None:
+        prof_pontas = prof_arrasamento + np.asarray(configuracao["comprimentos"], dtype=np.float64)
+    # Décourt-Quaresma e Aoki-Velloso numa unica passada pelo perfil
+    perfil = perfil_capacidade_metodos(indice, coeficientes, k_aoki_velloso(coeficientes.params), ALFA_AOKI_VELLOSO,
+                                       fatores or TabelaFatoresAokiVelloso(coeficientes.params), tipo_estaca,
+                                       diametro_cm / 100.0, cota_arrasamento, prof_pontas, discretizacao,
+                                       nspt_ponta_media)
+
+    linhas = []
+    for i, prof_ponta in enumerate(perfil["prof_ponta"].tolist()):
+        linhas.append({
+            "Sondagem": nome_sondagem,
+            "Tipo_Estaca": tipo_estaca,
+            "Diametro_cm": diametro_cm,
+            "Cota_Arrasamento": cota_arrasamento,
+            "Comprimento": round(prof_ponta - prof_arrasamento, 4),
+            "Cota_Ponta": round(indice.cota_terreno - prof_ponta, 4),
+            "Pp": float(perfil["Pp"][i]),
+            "Pl": float(perfil["Pl"][i]),
+            "Pdqm": float(perfil["Pdqm"][i]),
+            "Qult_AV": float(perfil["av_qult"][i]),
+            "Qadm_AV": float(perfil["av_qadm"][i]),
+        })
+    return linhas
+
+
+def _processar_bloco(bloco: Sequence[Tuple[str, PerfilSondagem, Dict]], params: Dict | None = None) -> List[List[Dict]]:
+    """Executa um bloco de tarefas e retorna as linhas de cada tarefa, na ordem do bloco.
+
+    O indice de cada sondagem e construido uma unica vez por bloco.
+    """
+    if params is None:
+        coeficientes, fatores = _coeficientes_processo, _fatores_processo
+    else:
+        coeficientes, fatores = TabelaCoeficientesDecourt(params), TabelaFatoresAokiVelloso(params)
+    resultados = []
+    for nome_sondagem, perfil, configuracao in bloco:
+        if not len(perfil):
+            resultados.append([])  # sondagem sem camadas
+            continue
+        # O perfil e compartilhado pelas tarefas da mesma sondagem no bloco, e o indice fica em cache nele
+        resultados.append(calcular_tarefa(nome_sondagem, perfil.indice(), coeficientes, configuracao, fatores))
+    return resultados
+
+
+def chave_tarefa(assinatura_sondagem: str, configuracao: Dict, assinatura_params: str) -> str:
+    """Chave de conteudo de uma tarefa no cache em disco (nao depende do nome da sondagem)."""
+    return CacheDisco.chave("calculo_lote", VERSAO_CALCULO, assinatura_sondagem, configuracao, assinatura_params)
+
+
+def _ler_sondagem(dados_sondagens: Dict[str, Dict], nome: str) -> Dict:
+    """Dados de uma sondagem; se vierem do banco, nao ficam em memoria depois de lidos."""
+    dados = dados_sondagens[nome]
+    if isinstance(dados_sondagens, SondagensBanco):
+        dados_sondagens.descarregar(nome)
+    return dados
+
+
+def montar_tarefas(dados_sondagens: Dict[str, Dict], configuracoes: Sequence[Dict]) -> List[Tuple[str, PerfilSondagem, Dict]]:
+    """Gera as tarefas (sondagem, perfil, configuracao), agrupadas por sondagem.
+
+    Cada sondagem e convertida uma unica vez para ``PerfilSondagem``, que e
+    compacto para enviar aos processos de trabalho; sondagens lidas do banco
+    do projeto sao liberadas da memoria em seguida.
+    """
+    tarefas = []
+    for nome in sorted(dados_sondagens):
+        perfil = PerfilSondagem.da_sondagem(_ler_sondagem(dados_sondagens, nome))
+        tarefas.extend((nome, perfil, configuracao) for configuracao in configuracoes)
+    return tarefas
+
+
+def calcular_projeto(
+    dados_sondagens: Dict[str, Dict],
+    params: Dict,
+    configuracoes: Sequence[Dict],
+    max_workers: int | None = None,
+    tamanho_bloco: int | None = None,
+    progresso: Callable[[int, int], None] | None = None,
+    cache: CacheDisco | None = None,
+) -> List[Dict]:
+    """Calcula todas as combinacoes (sondagem, configuracao) do projeto.
+
+    Parameters
+    ----------
+    dados_sondagens : dicionario no formato de ``App.dados_sondagens``.
+    params : tabelas de parametros (formato de ``GeotechnicalDesignTab.params``).
+    configuracoes : lista de configuracoes de estaca, cada uma com
+        "tipo_estaca", "diametro_cm" e, opcionalmente, "cota_arrasamento"
+        (padrão: cota do terreno de cada sondagem) e "comprimentos".
+    max_workers : numero de processos (padrão: numero de nucleos). Com 1 o
+        calculo e feito no proprio processo, sem pool.
+    tamanho_bloco : tarefas por bloco enviado a cada processo (padrão: cerca
+        de 4 blocos por processo).
+    progresso : opcional, chamada como ``progresso(tarefas_concluidas, total)``
+        a cada bloco concluido.
+    cache : opcional, cache em disco; as tarefas ja calculadas com as mesmas
+        entradas sao lidas dele e as demais sao gravadas nele.
+
+    Returns
+    -------
+    Lista de linhas (dicionarios), ordenada por sondagem, tipo, diametro e
+    comprimento.
+    """
+    tarefas = montar_tarefas(dados_sondagens, configuracoes)
+    total = len(tarefas)
+
+    linhas: List[Dict] = []
+    pendentes = list(range(total))
+    chaves: Dict[int, str] = {}
+    if cache is not None:
+        assinatura_params = CacheDisco.chave(params)
+        assinaturas_sondagens: Dict[str, str] = {}
+        pendentes = []
+        for i, (nome_sondagem, perfil, configuracao) in enumerate(tarefas):
+            if nome_sondagem not in assinaturas_sondagens:
+                assinaturas_sondagens[nome_sondagem] = CacheDisco.chave(perfil.para_sondagem())
+            chaves[i] = chave_tarefa(assinaturas_sondagens[nome_sondagem], configuracao, assinatura_params)
+            guardadas = cache.obter_json(chaves[i])
+            if guardadas is None:
+                pendentes.append(i)
+            else:
+                colunas = ["Sondagem"] + guardadas["colunas"]
+                linhas.extend(dict(zip(colunas, [nome_sondagem] + valores)) for valores in guardadas["valores"])
+    concluidas = total - len(pendentes)
+    if progresso and concluidas:
+        progresso(concluidas, total)
+
+    def _concluir(indices: Sequence[int], resultados: List[List[Dict]]):
+        nonlocal concluidas
+        for i, linhas_tarefa in zip(indices, resultados):
+            linhas.extend(linhas_tarefa)
+            if cache is not None:
+                # Gravado por colunas e sem o nome: sondagens com o mesmo conteudo compartilham a entrada
+                colunas = [c for c in linhas_tarefa[0] if c != "Sondagem"] if linhas_tarefa else []
+                cache.guardar_json(chaves[i], {"colunas": colunas,
+                                               "valores": [[linha[c] for c in colunas] for linha in linhas_tarefa]})
+        concluidas += len(indices)
+        if progresso:
+            progresso(concluidas, total)
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if tamanho_bloco is None:
+        tamanho_bloco = max(1, math.ceil(len(pendentes) / (max_workers * 4)))
+    blocos = [pendentes[i:i + tamanho_bloco] for i in range(0, len(pendentes), tamanho_bloco)]
+
+    if max_workers <= 1 or len(blocos) <= 1:
+        for bloco in blocos:
+            _concluir(bloco, _processar_bloco([tarefas[i] for i in bloco], params))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_inicializar_processo,
+                                 initargs=(params,)) as executor:
+            futuros = {executor.submit(_processar_bloco, [tarefas[i] for i in bloco]): bloco for bloco in blocos}
+            for futuro in as_completed(futuros):
+                _concluir(futuros[futuro], futuro.result())
+
+    linhas.sort(key=lambda l: (l["Sondagem"], l["Tipo_Estaca"], l["Diametro_cm"], l["Cota_Arrasamento"], l["Comprimento"]))
+    return linhas
+
+
+def calcular_solucoes_pilares(
+    dados_sondagens: Dict[str, Dict],
+    params: Dict,
+    dados_pilares: Dict[str, Dict],
+    diametros_por_tipo: Dict[str, Sequence[float]],
+    cota_arrasamento: float | None = None,
+    discretizacao: float | str | None = None,
+    nspt_ponta_media: bool = False,
+) -> List[Dict]:
+    """Executa o otimizador de estacas em todas as sondagens para todos os pilares.
+
+    Sem ``cota_arrasamento``, o arrasamento fica na cota do terreno de cada sondagem.
+    """
+    coeficientes = TabelaCoeficientesDecourt(params)
+    linhas = []
+    for nome_sondagem in sorted(dados_sondagens):
+        indice = IndiceProfundidade.da_sondagem(_ler_sondagem(dados_sondagens, nome_sondagem))
+        cota = indice.cota_terreno if cota_arrasamento is None else cota_arrasamento
+        comprimentos = comprimentos_da_sondagem(indice, cota) if len(indice) else range(0)
+        grade = varrer_grade(indice, coeficientes, diametros_por_tipo, comprimentos, cota,
+                             discretizacao=discretizacao, nspt_ponta_media=nspt_ponta_media)
+        for nome_pilar, solucao in otimizar_pilares(grade, dados_pilares).items():
+            if solucao is None:
+                solucao = {"Pilar": nome_pilar, "N_max": dados_pilares[nome_pilar].get("N_max", ""),
+                           "Tipo_Estaca": "", "Diametro_cm": "", "Comprimento": "", "Pdqm": "", "Custo": ""}
+            linhas.append({"Sondagem": nome_sondagem, **solucao})
+    return linhas
+
+
+def escrever_csv(caminho: str, linhas: Sequence[Dict]):
+    """Grava a tabela de resultados em CSV (UTF-8)."""
+    with open(caminho, "w", newline="", encoding="utf-8") as f:
+        if not linhas:
+            return
+        writer = csv.DictWriter(f, fieldnames=list(linhas[0].keys()))
+        writer.writeheader()
+        writer.writerows(linhas)
+
+
+def _discretizacao(texto: str) -> float | str:
+    """Valor de ``--discretizacao``: "camadas" ou um passo positivo em m."""
+    if texto.strip().lower() == DISCRETIZACAO_CAMADAS:
+        return DISCRETIZACAO_CAMADAS
+    try:
+        passo = float(texto.replace(',', '.'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"use '{DISCRETIZACAO_CAMADAS}' ou um passo em m: {texto}")
+    if passo <= 0:
+        raise argparse.ArgumentTypeError(f"o passo deve ser positivo: {texto}")
+    return passo
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Ponto de entrada da linha de comando (``python -m calculo_lote``)."""
+    parser = argparse.ArgumentParser(
+        prog="python -m calculo_lote",
+        description="Calcula a capacidade de carga de estacas (Décourt-Quaresma e Aoki-Velloso) "
+                    "para todas as sondagens de um projeto, sem interface gráfica.",
+    )
+    parser.add_argument("sondagens", nargs="?", default="sondagens.json",
+                        help="arquivo JSON de sondagens ou banco SQLite do projeto (.db, .sqlite; "
+                             "os resultados também são gravados no banco) (padrão: sondagens.json)")
+    parser.add_argument("--projeto", default=None, help="nome do projeto dentro do banco SQLite "
+                                                         "(padrão: o único projeto gravado no banco)")
+    parser.add_argument("--pilares", help="planilha de pilares (.xlsx, .xls, .csv ou .parquet) para escolher a estaca de cada pilar")
+    parser.add_argument("--tipos", nargs="+", help="tipos de estaca (padrão: todos com diâmetros na Tabela de SEÇÃO)")
+    parser.add_argument("--diametros", nargs="+", type=float, help="diâmetros em cm (padrão: os da Tabela de SEÇÃO)")
+    parser.add_argument("--cota-arrasamento", type=float, default=None,
+                        help="cota de arrasamento em m, a mesma para todas as sondagens "
+                             "(padrão: a cota do terreno de cada sondagem)")
+    parser.add_argument("--discretizacao", type=_discretizacao, default=None,
+                        help="integração do atrito lateral: 'camadas' (exata, nas fronteiras das camadas) "
+                             "ou passo em m, ex: 0.1 (padrão: segmentos de 1 m)")
+    parser.add_argument("--nspt-ponta-media", action="store_true",
+                        help="NSPT de ponta como a média de Décourt (1 m acima, na ponta e 1 m abaixo) "
+                             "em vez do NSPT da camada da ponta")
+    parser.add_argument("--processos", type=int, default=None, help="número de processos (padrão: número de núcleos)")
+    parser.add_argument("--sem-cache", action="store_true",
+                        help="recalcula tudo, sem ler nem gravar o cache em disco (.cache_calculos ao lado das sondagens)")
+    parser.add_argument("--saida", default="resultados_capacidade.csv", help="CSV com as curvas de capacidade")
+    parser.add_argument("--saida-pilares", default="solucoes_pilares.csv", help="CSV com a estaca escolhida para cada pilar")
+    args = parser.parse_args(argv)
+
+    banco = None
+    if e_banco_projeto(args.sondagens):
+        banco = BancoProjeto(args.sondagens, args.projeto)
+        dados_sondagens = banco.carregar()
+    else:
+        with open(args.sondagens, "r", encoding="utf-8") as f:
+            dados_sondagens = json.load(f)
+    params = parametros_padrao()
+
+    tipos = args.tipos or list(params["decourt_quaresma_alpha"]["headers"][1:])
+    if args.diametros:
+        diametros_por_tipo = {tipo: args.diametros for tipo in tipos}
+    else:
+        diametros_por_tipo = diametros_da_tabela_secao(params, tipos)
+    if not diametros_por_tipo:
+        parser.error("nenhum diâmetro disponível para os tipos de estaca informados; use --diametros")
+
+    configuracoes = [
+        {"tipo_estaca": tipo, "diametro_cm": diametro}
+        for tipo, diametros in diametros_por_tipo.items()
+        for diametro in diametros
+    ]
+    if args.cota_arrasamento is not None:
+        for configuracao in configuracoes:
+            configuracao["cota_arrasamento"] = args.cota_arrasamento
+    if args.discretizacao is not None:
+        # So entra na configuracao (e na chave do cache) quando difere do padrão
+        for configuracao in configuracoes:
+            configuracao["discretizacao"] = args.discretizacao
+    if args.nspt_ponta_media:
+        for configuracao in configuracoes:
+            configuracao["nspt_ponta_media"] = True
+
+    def _progresso(feitas, total):
+        print(f"\rCalculando: {feitas}/{total} tarefas", end="", file=sys.stderr, flush=True)
+
+    cache = None if args.sem_cache else CacheDisco(pasta_cache_ao_lado(args.sondagens))
+    linhas = calcular_projeto(dados_sondagens, params, configuracoes, max_workers=args.processos,
+                              progresso=_progresso, cache=cache)
+    print(file=sys.stderr)
+    if cache is not None and cache.acertos:
+        print(f"{cache.acertos} de {cache.acertos + cache.falhas} tarefas lidas do cache em disco", file=sys.stderr)
+    escrever_csv(args.saida, linhas)
+    print(f"{len(linhas)} linhas gravadas em {args.saida}")
+    com_resultados = {linha["Sondagem"] for linha in linhas}
+    sem_resultados = [nome for nome in sorted(dados_sondagens) if nome not in com_resultados]
+    for nome in sem_resultados:
+        print(f"Aviso: a sondagem {nome} não gerou resultados (sem camadas abaixo da cota de arrasamento)",
+              file=sys.stderr)
+    if banco:
+        banco.salvar_resultados(linhas)
+        print(f"{len(linhas)} linhas gravadas no banco {args.sondagens}")
+
+    dados_pilares = None
+    if args.pilares:
+        # A leitura de planilhas depende do pandas; só é importada quando necessária
+        from importacao_pilares import ler_pilares
+        dados_pilares = ler_pilares(args.pilares)
+    elif banco:
+        dados_pilares = banco.carregar_pilares()
+    if dados_pilares:
+        solucoes = calcular_solucoes_pilares(dados_sondagens, params, dados_pilares, diametros_por_tipo,
+                                             args.cota_arrasamento, args.discretizacao, args.nspt_ponta_media)
+        escrever_csv(args.saida_pilares, solucoes)
+        print(f"{len(solucoes)} soluções gravadas em {args.saida_pilares}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""Tabelas de coeficientes compiladas para os calculos geotecnicos.
+
+As tabelas de ``GeotechnicalDesignTab.params`` guardam os coeficientes como
+strings editaveis (ex: "0,85"). Converter essas strings e resolver o tipo de
+solo a cada segmento do calculo e caro e repetitivo; aqui elas sao compiladas
+uma unica vez em matrizes numericas indexadas por (classe de solo, tipo de
+estaca). A compilacao so e refeita depois de ``invalidar()``, chamado quando
+uma celula da tabela de configuracao e alterada.
+
+As celulas F1/F2 de Aoki-Velloso podem conter formulas que dependem do
+diametro da estaca (ex: "1+D/0.8", "2*F1"). ``compilar_expressao`` as valida
+contra uma gramatica restrita (numeros, D, F1, + - * / ^ e parenteses; nada de
+chamadas, atributos ou outros nomes) e as compila uma unica vez em funcoes
+que aceitam arrays de diametros. ``TabelaFatoresAokiVelloso`` usa essas
+funcoes para obter F1 e F2 de qualquer tipo de estaca em lote.
+"""
+
+import ast
+import hashlib
+import json
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from parametros import fatores_aoki_velloso
+
+# Tipos de estaca que nao possuem coluna propria nas tabelas de Décourt-Quaresma
+# e a coluna equivalente usada no calculo.
+EQUIVALENCIA_TIPO_ESTACA_DQ = {
+    "Pré-moldada Redonda": "Cravada a céu aberto",
+    "Pré-moldada Quadrada": "Cravada a céu aberto",
+}
+
+
+# Coeficiente C_p (kN/m²/golpe) da resistência de ponta de Décourt-Quaresma - simplificação didática
+C_PONTA_AREIA = 250
+C_PONTA_ARGILA = 120
+
+
+def coeficiente_ponta_decourt(tipo_solo: str) -> float:
+    """Coeficiente C_p para qp = C_p * Nspt conforme o tipo de solo na ponta."""
+    if "Areia" in tipo_solo:
+        return C_PONTA_AREIA
+    if "Argila" in tipo_solo:
+        return C_PONTA_ARGILA
+    if "Silte" in tipo_solo:  # Para silte, assumir comportamento similar a argila
+        return C_PONTA_ARGILA
+    return C_PONTA_AREIA  # Default para tipo de solo não especificado
+
+
+@lru_cache(maxsize=None)
+def classe_solo_decourt(tipo_solo: str) -> str | None:
+    """Mapeia o tipo de solo da sondagem para a linha das tabelas α/β.
+
+    Ex: "Argila Arenosa" -> "Argilas", "Silte Argiloso" -> "Argilas Intermediárias".
+    """
+    if not tipo_solo:
+        return None
+    if "Areia" in tipo_solo:
+        return "Areias"
+    if "Argila" in tipo_solo:
+        return "Argilas"
+    if "Silte" in tipo_solo:  # Silte pode ser intermediário
+        return "Argilas Intermediárias"
+    return None
+
+
+def _para_float(valor: str) -> float:
+    """Converte o texto de uma celula; celulas vazias ou invalidas valem 0."""
+    try:
+        return float(str(valor).replace(',', '.'))
+    except ValueError:
+        return 0.0
+
+
+class TabelaCoeficientesDecourt:
+    """Matrizes α e β de Décourt-Quaresma compiladas a partir de ``params``.
+
+    As matrizes tem uma linha extra de zeros no final, usada para solos sem
+    classe correspondente, de forma que a consulta por segmento seja sempre um
+    simples acesso por indice.
+    """
+
+    def __init__(self, params: Dict):
+        self.params = params
+        self.versao = 0
+        self._assinatura = None
+        self._alpha = None
+        self._beta = None
+        self._classes: List[str] = []
+        self._indice_classe: Dict[str, int] = {}
+        self._indice_estaca: Dict[str, int] = {}
+        self._indice_solo: Dict[str, int] = {}
+
+    def invalidar(self):
+        """Descarta as matrizes compiladas; a proxima consulta recompila."""
+        self._alpha = None
+        self._beta = None
+        self._indice_solo.clear()
+        self._assinatura = None
+        self.versao += 1
+
+    def assinatura(self) -> str:
+        """Hash do conteudo de ``params``.
+
+        Ao contrario de ``versao`` (contador da sessao), e estavel entre sessoes
+        e serve de chave para o cache em disco.
+        """
+        if self._assinatura is None:
+            texto = json.dumps(self.params, sort_keys=True, separators=(",", ":"), default=str)
+            self._assinatura = hashlib.blake2b(texto.encode("utf-8"), digest_size=16).hexdigest()
+        return self._assinatura
+
+    def _compilar(self):
+        tabela_alpha = self.params["decourt_quaresma_alpha"]
+        tabela_beta = self.params["decourt_quaresma_beta"]
+        tipos_estaca = tabela_alpha["headers"][1:]
+        classes = [c for c in tabela_alpha["data"] if c in tabela_beta["data"]]
+
+        alpha = np.zeros((len(classes) + 1, len(tipos_estaca)), dtype=np.float64)
+        beta = np.zeros_like(alpha)
+        for i, classe in enumerate(classes):
+            linha_alpha = tabela_alpha["data"][classe]
+            linha_beta = tabela_beta["data"][classe]
+            for j in range(len(tipos_estaca)):
+                if j < len(linha_alpha) and j < len(linha_beta):
+                    alpha[i, j] = _para_float(linha_alpha[j])
+                    beta[i, j] = _para_float(linha_beta[j])
+
+        self._classes = classes
+        self._indice_classe = {c: i for i, c in enumerate(classes)}
+        self._indice_estaca = {t: j for j, t in enumerate(tipos_estaca)}
+        for tipo, equivalente in EQUIVALENCIA_TIPO_ESTACA_DQ.items():
+            if equivalente in self._indice_estaca:
+                self._indice_estaca.setdefault(tipo, self._indice_estaca[equivalente])
+        self._alpha = alpha
+        self._beta = beta
+
+    @property
+    def alpha(self) -> np.ndarray:
+        if self._alpha is None:
+            self._compilar()
+        return self._alpha
+
+    @property
+    def beta(self) -> np.ndarray:
+        if self._beta is None:
+            self._compilar()
+        return self._beta
+
+    def indice_estaca(self, tipo_estaca: str) -> int:
+        """Coluna das matrizes para o tipo de estaca (padrão: Cravada a céu aberto)."""
+        if self._alpha is None:
+            self._compilar()
+        return self._indice_estaca.get(tipo_estaca, 0)
+
+    def indice_solo(self, tipo_solo: str) -> int:
+        """Linha das matrizes para o tipo de solo da sondagem."""
+        if self._alpha is None:
+            self._compilar()
+        indice = self._indice_solo.get(tipo_solo)
+        if indice is None:
+            classe = classe_solo_decourt(tipo_solo)
+            indice = self._indice_classe.get(classe, len(self._classes))
+            self._indice_solo[tipo_solo] = indice
+        return indice
+
+    def indices_solo(self, tipos_solo) -> np.ndarray:
+        """Linhas das matrizes para uma lista de tipos de solo (ex: ``IndiceProfundidade.categorias``).
+
+        O array tem um elemento extra no final apontando para a linha de zeros,
+        de forma que o codigo -1 (profundidade sem dados) tambem possa ser indexado.
+        """
+        return np.array([self.indice_solo(s) for s in tipos_solo] + [len(self.alpha) - 1], dtype=np.intp)
+
+
+# Tipos de estaca sem coluna propria nas tabelas F1/F2 de Aoki-Velloso
+EQUIVALENCIA_TIPO_ESTACA_AV = {
+    "Pré-moldada Redonda": "Pré-moldada",
+    "Pré-moldada Quadrada": "Pré-moldada",
+    "Cravada a céu aberto": "Pré-moldada",
+}
+
+# Nos permitidos nas formulas das celulas (alem de Name, verificado a parte)
+_NOS_EXPRESSAO = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load,
+                  ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.UAdd, ast.USub)
+# Numero com virgula decimal (ex: "0,8"), convertido para ponto antes da analise
+_VIRGULA_DECIMAL = re.compile(r"(?<=\d),(?=\d)")
+
+
+@lru_cache(maxsize=None)
+def compilar_expressao(texto: str, variaveis: Tuple[str, ...] = ("D",)) -> Callable:
+    """Compila a formula de uma celula numa funcao ``f(**variaveis)``.
+
+    A formula pode usar numeros (com ponto ou virgula decimal), as
+    ``variaveis`` (ex: D = diametro em m), + - * / ^ (ou **) e parenteses.
+    A funcao resultante aceita escalares ou arrays NumPy e devolve um array
+    float64. As formulas ja compiladas ficam em cache.
+
+    Raises
+    ------
+    ValueError : se a formula for vazia, invalida ou usar algo fora da gramatica.
+    """
+    codigo_fonte = _VIRGULA_DECIMAL.sub(".", str(texto).strip()).replace("^", "**")
+    if not codigo_fonte:
+        raise ValueError("Fórmula vazia")
+    try:
+        arvore = ast.parse(codigo_fonte, mode="eval")
+    except SyntaxError:
+        raise ValueError(f"Fórmula inválida: {texto}")
+    for no in ast.walk(arvore):
+        if not isinstance(no, _NOS_EXPRESSAO):
+            raise ValueError(f"Fórmula inválida: {texto}")
+        if isinstance(no, ast.Constant) and (isinstance(no.value, bool) or not isinstance(no.value, (int, float))):
+            raise ValueError(f"Fórmula inválida: {texto}")
+        if isinstance(no, ast.Name) and no.id not in variaveis:
+            raise ValueError(f"Variável desconhecida '{no.id}' em: {texto} (use {', '.join(variaveis)})")
+    # A arvore so contem aritmetica sobre numeros e as variaveis permitidas. Os numeros viram
+    # float64 do NumPy para que 1/0 ou 9^9^9 resultem em inf/NaN em vez de excecao ou de um inteiro gigante
+    constantes = {}
+    for no in ast.walk(arvore):
+        for campo, filho in ast.iter_fields(no):
+            if isinstance(filho, ast.Constant):
+                nome = f"_c{len(constantes)}"
+                constantes[nome] = np.float64(filho.value)
+                setattr(no, campo, ast.copy_location(ast.Name(id=nome, ctx=ast.Load()), filho))
+    codigo = compile(arvore, "<celula>", "eval")
+
+    def avaliar(**valores):
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            return np.asarray(eval(codigo, {"__builtins__": {}}, {**constantes, **valores}), dtype=np.float64)
+    return avaliar
+
+
+def validar_expressao(texto: str, variaveis: Tuple[str, ...] = ("D",)) -> str | None:
+    """Mensagem de erro da formula, ou None se ela for valida."""
+    try:
+        compilar_expressao(texto, variaveis)
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+class TabelaFatoresAokiVelloso:
+    """Fatores F1 e F2 de Aoki-Velloso compilados das tabelas editaveis de ``params``.
+
+    As celulas de F1 podem usar D (diametro em m) e as de F2 tambem F1. Celulas
+    vazias, invalidas (ex: "#VALOR!") ou que resultem em fator nao positivo
+    usam os fatores padrão de ``parametros.fatores_aoki_velloso``; as
+    mensagens ficam em ``erros``.
+    """
+
+    def __init__(self, params: Dict):
+        self.params = params
+        self._celulas = None # tipo de estaca -> (funcao F1 ou None, funcao F2 ou None)
+        self.erros: Dict[str, str] = {}
+
+    def invalidar(self):
+        """Descarta as formulas compiladas; a proxima consulta relê as tabelas."""
+        self._celulas = None
+
+    def _compilar(self):
+        celulas = {}
+        erros = {}
+        for chave, nome, variaveis in (("aoki_velloso_alpha_f1", "F1", ("D",)),
+                                       ("aoki_velloso_alpha_f2", "F2", ("D", "F1"))):
+            tabela = self.params[chave]
+            valores = tabela["data"].get(nome, [])
+            for j, tipo in enumerate(tabela["headers"][1:]):
+                funcao = None
+                texto = valores[j] if j < len(valores) else ""
+                if str(texto).strip():
+                    try:
+                        funcao = compilar_expressao(texto, variaveis)
+                    except ValueError as e:
+                        erros[f"{nome} - {tipo}"] = str(e)
+                celulas.setdefault(tipo, [None, None])[0 if nome == "F1" else 1] = funcao
+        self._celulas = celulas
+        self.erros = erros
+
+    def fatores(self, tipo_estaca: str, diametro_m) -> Tuple[np.ndarray, np.ndarray]:
+        """(F1, F2) do tipo de estaca para um diametro (m) ou array de diametros."""
+        if self._celulas is None:
+            self._compilar()
+        diametro_m = np.asarray(diametro_m, dtype=np.float64)
+        f1_padrao, f2_padrao = (np.broadcast_to(np.asarray(f, dtype=np.float64), diametro_m.shape)
+                                for f in fatores_aoki_velloso(tipo_estaca, diametro_m))
+        funcao_f1, funcao_f2 = self._celulas.get(EQUIVALENCIA_TIPO_ESTACA_AV.get(tipo_estaca, tipo_estaca),
+                                                 (None, None))
+
+        f1 = f1_padrao
+        if funcao_f1 is not None:
+            f1 = np.broadcast_to(funcao_f1(D=diametro_m), diametro_m.shape)
+            f1 = np.where(np.isfinite(f1) & (f1 > 0), f1, f1_padrao)
+        f2 = f2_padrao
+        if funcao_f2 is not None:
+            f2 = np.broadcast_to(funcao_f2(D=diametro_m, F1=f1), diametro_m.shape)
+            f2 = np.where(np.isfinite(f2) & (f2 > 0), f2, f2_padrao)
+        return f1, f2
@@ -1,7 +1,40 @@
 import tkinter as tk
 from tkinter import ttk
 import tkinter.messagebox as messagebox
+import copy
+import functools
 import math
+from collections.abc import Sequence
+
+import numpy as np
+
+from calculo_estacas import DISCRETIZACAO_CAMADAS, VERSAO_CALCULO, perfil_capacidade_metodos, profundidades_do_perfil
+from cache_resultados import CacheDisco, CacheResultados, hash_sondagem, pasta_cache_ao_lado
+from coeficientes import TabelaCoeficientesDecourt, TabelaFatoresAokiVelloso, validar_expressao
+from parametros import ALFA_AOKI_VELLOSO, k_aoki_velloso, parametros_padrao
+from perfil_sondagem import IndiceProfundidade
+from lazy_notebook import LazyNotebook
+from tabela_virtual import TabelaVirtual
+from tarefa_segundo_plano import TarefaSegundoPlano
+from instrumentacao import instrumentado
+from otimizador_estacas import varrer_grade, otimizar_pilares, comprimentos_da_sondagem, diametros_da_tabela_secao
+
+# Espera (ms) após o último evento <Configure> antes de redesenhar o canvas
+REDRAW_DELAY_MS = 50
+# Nível de detalhe do perfil: faixas mais finas que isto (px) são unidas à seguinte,
+# o nome do solo só aparece em faixas com altura suficiente e os rótulos de cota
+# guardam uma distância mínima entre si
+MIN_BAND_PX = 4
+LABEL_MIN_PX = 12
+COTA_LABEL_SPACING_PX = 10
+# Opções de integração do atrito lateral (ver calculo_estacas.bordas_segmentos);
+# None mantém os segmentos de 1 m da formulação original
+SIDE_FRICTION_STEPS = {
+    "Segmentos de 1 m": None,
+    "Camadas (exata)": DISCRETIZACAO_CAMADAS,
+    "Passo de 0,5 m": 0.5,
+    "Passo de 0,1 m": 0.1,
+}
 
 class GeotechnicalDesignTab(ttk.Frame):
     """Aba para configuracoes e calculos geotecnicos."""
@@ -9,84 +42,49 @@ class GeotechnicalDesignTab(ttk.Frame):
     def __init__(self, parent, main_app=None):
         super().__init__(parent)
         self.main_app = main_app
-        # Inicializa a estrutura de dados para os parametros de calculo
-        self.params = {
-            "decourt_quaresma_alpha": {
-                "headers": ["Tipo de Solo", "Cravada a céu aberto", "Escavada a fluido", "Hélice Contínua", "Raiz", "Injetada sob pressão", "Franki"],
-                "data": {
-                    "Argilas": ["1.0", "0.6", "0.6", "0.85", "1.0", "0.0"],
-                    "Argilas Intermediárias": ["1.0", "0.65", "0.75", "1.0", "1.0", "0.0"],
-                    "Areias": ["1.0", "0.5", "0.5", "0.3", "0.5", "1.0"]
-                }
-            },
-            "decourt_quaresma_beta": {
-                "headers": ["Tipo de Solo", "Cravada a céu aberto", "Escavada a fluido", "Hélice Contínua", "Raiz", "Injetada sob pressão", "Franki"],
-                "data": {
-                    "Argilas": ["1.0", "0.8", "0.9", "1.0", "1.5", "0.0"],
-                    "Argilas Intermediárias": ["1.0", "0.65", "0.75", "1.0", "1.5", "0.0"],
-                    "Areias": ["1.0", "0.5", "0.5", "0.3", "0.5", "0.0"]
-                }
-            },
-            "aoki_velloso_k": {
-                "headers": ["Tipo de Solo", "K (KPa)"],
-                "data": {
-                    "Argila": ["200.0"],
-                    "Argila Arenosa": ["350.0"],
-                    "Argila Siltosa": ["220.0"],
-                    "Silte Argiloso": ["400.0"],
-                    "Silte Arenoso": ["550.0"],
-                    "Areia Siltosa": ["800.0"],
-                    "Areia Argilosa": ["600.0"],
-                    "Areia": ["1000.0"]
-                }
-            },
-            "aoki_velloso_alpha_f1": {
-                "headers": ["Pré-moldada", "Metálica", "Escavada a céu aberto", "Escavada a fluido", "Hélice Contínua", "Raiz", "Injetada sob pressão", "Franki"],
-                "data": {
-                    "F1": ["1+3/D.8", "3.5", "3.0", "2.0", "2.0", "0.0", "2.5"]
-                }
-            },
-            "aoki_velloso_alpha_f2": {
-                "headers": ["Pré-moldada", "Metálica", "Escavada a céu aberto", "Escavada a fluido", "Hélice Contínua", "Raiz", "Injetada sob pressão", "Franki"],
-                "data": {
-                    "F2": ["#VALOR!", "6.0", "4.0", "4.0", "0.0", "5.0"]
-                }
-            },
-            "normative_parameters": {
-                 "headers": ["", "5", "6", "8", "9", "10"], # Assumindo que sao cabeçalhos de coluna, talvez Ncpu
-                 "data": {
-                     "ξ": ["1.42", "1.35", "1.33", "1.31", "1.29", "1.27"],
-                     "ζ": ["1.42", "1.27", "1.23", "1.20", "1.15", "1.12"]
-                 }
-            },
-            "section_parameters": {
-                "headers": ["", "", "", "", "", "", ""],
-                "data": {
-                    "Pré-moldada Redonda": ["", "", "", "", "", "", ""],
-                    "Pré-moldada Quadrada": ["", "", "", "", "", "", ""],
-                    "Escavada a céu aberto": ["20", "25", "30", "35", "40", "50", "60"],
-                    "Escavada a fluido": ["20", "25", "30", "40", "50", "60", "70"],
-                    "Hélice Contínua": ["30", "40", "50", "60", "70", "80", "100"],
-                    "Raiz": ["12", "18", "20", "25", "30", "40", ""],
-                    "Injetada sob pressão": ["20", "30", "40", "50", "60", "70", "80"],
-                    "Franki": ["60", "80", "100", "120", "150", "180", "200"]
-                }
-            }
-        }
+        # Inicializa a estrutura de dados para os parametros de calculo (cópia dos valores padrão)
+        self.params = parametros_padrao()
+        # Matrizes α/β compiladas a partir de self.params (recompiladas apenas quando uma celula muda)
+        self.coeficientes_dq = TabelaCoeficientesDecourt(self.params)
+        # Fórmulas F1/F2 de Aoki-Velloso compiladas a partir de self.params
+        self.fatores_av = TabelaFatoresAokiVelloso(self.params)
+        # Resultados de cálculo já feitos (compartilhado entre as abas de sondagem)
+        self.cache_resultados = CacheResultados()
+        # Resultados guardados em disco entre sessões (pasta ao lado do arquivo de sondagens)
+        caminho_sondagens = getattr(getattr(main_app, "diario_sondagens", None), "caminho", "sondagens.json")
+        self.cache_disco = CacheDisco(pasta_cache_ao_lado(caminho_sondagens))
+        # Notebooks de sondagens de cada método, criados em setup_method_tab na primeira seleção da sub-aba
+        self.calculation_notebooks = {}
+        self.calculation_tabs = {} # método -> LazyNotebook
         self.setup_ui()
 
     def setup_ui(self):
-        """Cria sub-abas basicas de configuracao e metodos de calculo."""
+        """Cria sub-abas basicas de configuracao e metodos de calculo.
+        O conteúdo de cada sub-aba é construído apenas na primeira vez que ela é selecionada.
+        """
         notebook = ttk.Notebook(self)
         notebook.pack(expand=True, fill="both", padx=5, pady=5)
+        self.sub_notebook = notebook
 
         config_frame = ttk.Frame(notebook)
-        self.setup_config_tab(config_frame)
         notebook.add(config_frame, text="Configurações")
 
-        dq_frame = ttk.Frame(notebook)
-        self.setup_de_court_tab(dq_frame)
-        notebook.add(dq_frame, text="Décourt-Quaresma (1996)")
+        # Funções de construção pendentes, por aba
+        self._pending_sub_tabs = {str(config_frame): lambda: self.setup_config_tab(config_frame)}
+
+        # Uma sub-aba por método de cálculo (Décourt-Quaresma e Aoki-Velloso)
+        for metodo, descricao in CALCULATION_METHODS.items():
+            method_frame = ttk.Frame(notebook)
+            notebook.add(method_frame, text=descricao["titulo"])
+            self._pending_sub_tabs[str(method_frame)] = lambda f=method_frame, m=metodo: self.setup_method_tab(f, m)
+        notebook.bind("<<NotebookTabChanged>>", self._on_sub_tab_changed)
+        self._on_sub_tab_changed() # Constrói a aba visível inicialmente
+
+    def _on_sub_tab_changed(self, event=None):
+        """Constrói o conteúdo da sub-aba selecionada, se ainda não foi construído."""
+        build = self._pending_sub_tabs.pop(self.sub_notebook.select(), None)
+        if build:
+            build()
 
     def setup_config_tab(self, parent_frame):
         """Configura os campos editáveis para os parametros de calculo com rolagem."""
@@ -131,12 +129,12 @@ class GeotechnicalDesignTab(ttk.Frame):
         # Frame para Aoki e Velloso F1
         aoki_f1_frame = ttk.LabelFrame(scrollable_frame, text="Aoki e Velloso (1975) - F1")
         aoki_f1_frame.pack(padx=10, pady=5, fill="x", expand=True)
-        self._create_editable_table(aoki_f1_frame, self.params["aoki_velloso_alpha_f1"])
+        self._create_editable_table(aoki_f1_frame, self.params["aoki_velloso_alpha_f1"], ("D",))
         
         # Frame para Aoki e Velloso F2
         aoki_f2_frame = ttk.LabelFrame(scrollable_frame, text="Aoki e Velloso (1975) - F2")
         aoki_f2_frame.pack(padx=10, pady=5, fill="x", expand=True)
-        self._create_editable_table(aoki_f2_frame, self.params["aoki_velloso_alpha_f2"])
+        self._create_editable_table(aoki_f2_frame, self.params["aoki_velloso_alpha_f2"], ("D", "F1"))
 
         # Frame para Parâmetros Normativos (Tabela 2)
         norm_params_frame = ttk.LabelFrame(scrollable_frame, text="Tabela 2 - Fatores L e fc (Normativa)")
@@ -149,9 +147,10 @@ class GeotechnicalDesignTab(ttk.Frame):
         self._create_editable_table(section_params_frame, self.params["section_parameters"])
 
 
-    def _create_editable_table(self, parent_frame, table_data_dict):
+    def _create_editable_table(self, parent_frame, table_data_dict, variaveis_formula=None):
         """Cria uma tabela de campos editáveis (Entry) e exibe o valor padrão se for alterado.
         A primeira coluna é para o nome da linha, as demais são campos de entrada.
+        Com ``variaveis_formula`` (ex: ("D",)), as células são fórmulas e as inválidas são indicadas.
         """
         headers = table_data_dict["headers"]
         data_rows = table_data_dict["data"]
@@ -192,12 +191,22 @@ class GeotechnicalDesignTab(ttk.Frame):
                 default_label = ttk.Label(parent_frame, text="", foreground="red")
                 default_label.grid(row=row_idx + 1, column=label_col, padx=(0, 5), pady=2, sticky="w") # padx=(left, right)
 
-                def check_change(event, current_var=entry_var, default_val=original_value, label_widget=default_label):
-                    if current_var.get() != default_val:
+                def check_change(event, current_var=entry_var, default_val=original_value, label_widget=default_label,
+                                 row_values=values, col=col_idx_data):
+                    new_value = current_var.get()
+                    erro = validar_expressao(new_value, variaveis_formula) if variaveis_formula and new_value.strip() else None
+                    if erro:
+                        label_widget.config(text=f"(Inválido: {erro}; usando padrão)")
+                    elif new_value != default_val:
                         label_widget.config(text=f"(Padrão: {default_val})")
                     else:
                         label_widget.config(text="")
 
+                    # Grava o valor em self.params e invalida as tabelas compiladas somente se mudou
+                    if row_values[col].replace(',', '.') != new_value:
+                        row_values[col] = new_value
+                        self._on_param_change()
+
                 entry.bind("<FocusOut>", check_change)
                 entry.bind("<Return>", check_change)
 
@@ -212,42 +221,209 @@ class GeotechnicalDesignTab(ttk.Frame):
             parent_frame.grid_columnconfigure(entry_physical_col, weight=3) # Entry takes more space
             parent_frame.grid_columnconfigure(label_physical_col, weight=1) # Label takes less space
 
-    def setup_de_court_tab(self, parent_frame):
-        """Configura a interface para o metodo Décourt-Quaresma (1996) com sub-abas por sondagem."""
-        self.de_court_notebook = ttk.Notebook(parent_frame)
-        self.de_court_notebook.pack(padx=10, pady=10, fill="both", expand=True)
-
-        self._populate_de_court_tabs()
-
-    def _populate_de_court_tabs(self):
-        # Limpa abas existentes
-        for tab in self.de_court_notebook.tabs():
-            self.de_court_notebook.forget(tab)
-
-        if self.main_app and self.main_app.dados_sondagens:
-            for sondagem_name, sondagem_data in self.main_app.dados_sondagens.items():
-                # Passa o nome da sondagem e os dados para a nova classe de frame
-                sondagem_frame = BoreholeCalculationFrame(
-                    self.de_court_notebook,
-                    self.main_app,
-                    sondagem_name,
-                    sondagem_data,
-                    self.params
-                )
-                self.de_court_notebook.add(sondagem_frame, text=sondagem_name)
+    def _on_param_change(self):
+        """Chamado quando uma celula das tabelas de configuracao e alterada."""
+        self.coeficientes_dq.invalidar()
+        self.fatores_av.invalidar()
+        self.cache_resultados.limpar() # Todos os resultados dependem das tabelas
+
+    def invalidar_sondagem(self, sondagem_name):
+        """Descarta os resultados em cache de uma sondagem alterada (chamado pelo App)."""
+        self.cache_resultados.invalidar_sondagem(sondagem_name)
+
+    def setup_method_tab(self, parent_frame, metodo):
+        """Configura a sub-aba de um método de cálculo (ver CALCULATION_METHODS) com sub-abas por sondagem."""
+        notebook = ttk.Notebook(parent_frame)
+        notebook.pack(padx=10, pady=10, fill="both", expand=True)
+        self.calculation_notebooks[metodo] = notebook
+        # Cada BoreholeCalculationFrame só é criado quando a aba da sondagem é selecionada
+        self.calculation_tabs[metodo] = LazyNotebook(
+            notebook,
+            lambda container, sondagem_name: self._build_method_tab(container, sondagem_name, metodo),
+            "Nenhuma sondagem cadastrada. Vá para a aba 'Sondagens' para adicionar dados.",
+            wraplength=400
+        )
+
+        # Sem limpar o cache: os resultados já calculados na outra sub-aba servem a esta
+        self._sync_method_tabs(metodo)
+
+    def _build_method_tab(self, container, sondagem_name, metodo):
+        """Cria o frame de cálculo de uma sondagem (chamado na primeira seleção da aba)."""
+        # Passa o nome da sondagem e os dados para a nova classe de frame
+        sondagem_frame = BoreholeCalculationFrame(
+            container,
+            self.main_app,
+            sondagem_name,
+            self.main_app.dados_sondagens[sondagem_name],
+            self.params,
+            self.coeficientes_dq,
+            self.cache_resultados,
+            self.cache_disco,
+            metodo=metodo,
+            fatores_av=self.fatores_av
+        )
+        sondagem_frame.pack(fill="both", expand=True)
+        return sondagem_frame
+
+    @instrumentado()
+    def _populate_calculation_tabs(self, alteradas=None):
+        """
+        Sincroniza as abas de sondagem dos métodos com App.dados_sondagens, tocando apenas as
+        sondagens adicionadas, removidas ou alteradas (`alteradas`; None = todas).
+        """
+        if alteradas is None:
+            self.cache_resultados.limpar()
         else:
-            empty_frame = ttk.Frame(self.de_court_notebook)
-            self.de_court_notebook.add(empty_frame, text="Nenhuma Sondagem")
-            ttk.Label(empty_frame, text="Nenhuma sondagem cadastrada. Vá para a aba 'Sondagens' para adicionar dados.", wraplength=400).pack(pady=20)
+            for sondagem_name in alteradas:
+                self.cache_resultados.invalidar_sondagem(sondagem_name)
+        # Sub-abas ainda não construídas serão populadas ao serem selecionadas
+        for metodo in self.calculation_tabs:
+            self._sync_method_tabs(metodo, alteradas)
+
+    def _sync_method_tabs(self, metodo, alteradas=None):
+        """Sincroniza as abas de sondagem de um método e constrói a aba visível."""
+        tabs = self.calculation_tabs[metodo]
+        dados_sondagens = self.main_app.dados_sondagens if self.main_app else {}
+        tabs.sync(dados_sondagens.keys())
+
+        # Frames já construídos passam a apontar para os dados atuais e redesenham o perfil
+        nomes_alterados = list(tabs.contents) if alteradas is None else alteradas
+        for sondagem_name in nomes_alterados:
+            sondagem_frame = tabs.contents.get(sondagem_name)
+            if sondagem_frame is not None:
+                sondagem_frame.sondagem_data = dados_sondagens[sondagem_name]
+                sondagem_frame._draw_soil_profile_only()
+
+        # Constrói a aba visível
+        selected = tabs.selected_name()
+        if selected is not None:
+            tabs.materialize(selected)
+
+
+class LinhasCurvaCapacidade(Sequence):
+    """Linhas da tabela de resultados, formatadas a partir dos arrays da curva apenas quando exibidas.
+
+    A última linha é o total (carga admissível da estaca informada).
+    """
+
+    def __init__(self, perfil, prof_curva, carga_total):
+        self.perfil = perfil
+        self.prof_curva = prof_curva
+        self.carga_total = carga_total
+
+    def __len__(self):
+        return self.prof_curva.size + 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        if i == self.prof_curva.size:
+            return ("", "", "", "", "", "Pdqm Total (kN)", f"{self.carga_total:.2f}")
+        perfil = self.perfil
+        pdqm_i = perfil["Pdqm"][i]
+        return (
+            f"{perfil['prof_segmento'][i]:.2f} a {self.prof_curva[i]:.2f}",
+            f"{perfil['nspt_segmento'][i]:.0f}" if not np.isnan(perfil['nspt_segmento'][i]) else "-",
+            f"{perfil['alfa_segmento'][i]:.2f}",
+            f"{perfil['beta_segmento'][i]:.2f}",
+            f"{perfil['qp'][i]:.2f}" if not np.isnan(perfil['qp'][i]) else "-",
+            f"{perfil['ql_segmento'][i]:.2f}",
+            f"{pdqm_i:.2f}" if not np.isnan(pdqm_i) else "-"
+        )
+
+
+class LinhasCurvaAokiVelloso(LinhasCurvaCapacidade):
+    """Linhas da tabela de resultados de Aoki-Velloso (mesmo resultado de perfil_capacidade_metodos)."""
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        if i == self.prof_curva.size:
+            return ("", "", "", "", "", "Qadm Total (kN)", f"{self.carga_total:.2f}")
+        perfil = self.perfil
+
+        def formatar(valor, formato):
+            return "-" if np.isnan(valor) else format(valor, formato)
+
+        return (
+            f"{perfil['prof_segmento'][i]:.2f} a {self.prof_curva[i]:.2f}",
+            formatar(perfil['nspt_segmento'][i], ".0f"),
+            formatar(perfil['av_k_segmento'][i], ".0f"),
+            formatar(perfil['av_alfa_segmento'][i], ".3f"),
+            formatar(perfil['av_rp'][i], ".2f"),
+            formatar(perfil['av_rl_segmento'][i], ".2f"),
+            formatar(perfil['av_qadm'][i], ".2f")
+        )
+
+
+# Métodos das sub-abas de cálculo. As duas curvas vêm do mesmo resultado (perfil_capacidade_metodos):
+# "carga" e "nspt_ponta" são as chaves da carga admissível (de nome "rotulo") e do NSPT de ponta, e
+# "colunas" lista (id, cabeçalho, largura) das colunas da tabela. Décourt-Quaresma calcula a
+# ponta de estacas "Pré-moldada" e "Metálica" 5% do diâmetro mais abaixo ("ponta_deslocada").
+CALCULATION_METHODS = {
+    "decourt_quaresma": {
+        "titulo": "Décourt-Quaresma (1996)",
+        "colunas": (("Profundidade", "Prof. (m)", 70), ("N_SPT_Med", "N_SPT Médio", 90), ("Alfa", "α", 50),
+                    ("Beta", "β", 50), ("qp", "qp (kPa)", 70), ("ql", "ql (kPa)", 70), ("Pdqm", "Pdqm (kN)", 80)),
+        "linhas": LinhasCurvaCapacidade,
+        "carga": "Pdqm",
+        "rotulo": "Pdqm",
+        "nspt_ponta": "nspt_ponta",
+        "ponta_deslocada": True,
+        "integracoes": tuple(SIDE_FRICTION_STEPS),
+    },
+    "aoki_velloso": {
+        "titulo": "Aoki-Velloso (1975)",
+        "colunas": (("Profundidade", "Prof. (m)", 70), ("N_SPT", "N_SPT", 60), ("K", "K (kPa)", 60),
+                    ("Alfa", "α", 50), ("rp", "rp (kPa)", 70), ("rl", "rl (kPa)", 70), ("Qadm", "Qadm (kN)", 80)),
+        "linhas": LinhasCurvaAokiVelloso,
+        "carga": "av_qadm",
+        "rotulo": "Qadm",
+        "nspt_ponta": "av_nspt_ponta",
+        "ponta_deslocada": False,
+        # Sem os segmentos de 1 m de Décourt-Quaresma: a tabela usa os mesmos segmentos da
+        # integração do atrito lateral, e rl x espessura soma a carga lateral exibida
+        "integracoes": tuple(nome for nome, passo in SIDE_FRICTION_STEPS.items() if passo is not None),
+    },
+}
 
 
 class BoreholeCalculationFrame(ttk.Frame):
-    def __init__(self, parent, main_app, sondagem_name, sondagem_data, params):
+    def __init__(self, parent, main_app, sondagem_name, sondagem_data, params, coeficientes_dq=None, cache_resultados=None,
+                 cache_disco=None, metodo="decourt_quaresma", fatores_av=None):
         super().__init__(parent)
         self.main_app = main_app
         self.sondagem_name = sondagem_name
         self.sondagem_data = sondagem_data
         self.params = params # Parâmetros de cálculo (alpha, beta, K, etc.)
+        # Método exibido nesta aba (chave de CALCULATION_METHODS); o cálculo sempre produz os dois
+        self.metodo = metodo
+        self.metodo_info = CALCULATION_METHODS[metodo]
+        # Matrizes α/β e fórmulas F1/F2 compiladas (compartilhadas entre as abas de sondagem)
+        self.coeficientes_dq = coeficientes_dq if coeficientes_dq is not None else TabelaCoeficientesDecourt(params)
+        self.fatores_av = fatores_av if fatores_av is not None else TabelaFatoresAokiVelloso(params)
+        # Cache LRU das curvas de capacidade (ver _execute_calculation)
+        self.cache_resultados = cache_resultados if cache_resultados is not None else CacheResultados()
+        self.cache_disco = cache_disco # Opcional: segundo nível, persistente entre sessões
+        self._displayed_result_key = None # Chave do resultado exibido no Treeview
+        self._depth_index = None # Índice de profundidade das camadas (ver _get_depth_index)
+        self._depth_index_camadas = None
+        # Desenho do canvas: itens reaproveitados entre redesenhos (ver _canvas_item)
+        self._canvas_items = {} # chave -> (id do item, tipo, coords, opções)
+        self._canvas_used = []
+        self._canvas_created = False
+        self._canvas_reused = False
+        self._drawn_size = None # Tamanho do canvas no último desenho
+        self._last_drawing = (self._draw_soil_profile_only, {}) # Refeito ao redimensionar
+        self._redraw_after_id = None
+        self._empty_label = None
+        self._geometry_index = None # Índice de profundidade de self._geometry
+        self._geometry = None
+        self._job = None # Cálculo em andamento na thread de trabalho (ver _start_job)
         self._setup_ui()
 
     def _setup_ui(self):
@@ -293,46 +469,77 @@ class BoreholeCalculationFrame(ttk.Frame):
         self.pile_type_combobox.set("Hélice Contínua") # Valor padrão
         self.pile_type_combobox.bind("<<ComboboxSelected>>", lambda e: self._update_pile_length_display())
 
+        # Integração do atrito lateral: segmentos de 1 m, camadas (exata) ou passo fino
+        ttk.Label(form_frame, text="Integração do Atrito Lateral:").grid(row=5, column=0, padx=5, pady=2, sticky="w")
+        integracoes = self.metodo_info["integracoes"]
+        self.side_friction_combobox = ttk.Combobox(form_frame, values=list(integracoes), state="readonly")
+        self.side_friction_combobox.grid(row=5, column=1, padx=5, pady=2, sticky="ew")
+        self.side_friction_combobox.set(integracoes[0]) # Valor padrão
+
+        # NSPT de ponta: o da camada da ponta (padrão) ou a média de Décourt (ponta - 1 m, ponta, ponta + 1 m)
+        # (só Décourt-Quaresma; Aoki-Velloso usa o NSPT da camada da ponta)
+        self.tip_average_var = tk.BooleanVar(value=False)
+        if self.metodo == "decourt_quaresma":
+            ttk.Checkbutton(form_frame, text="NSPT da ponta pela média (ponta - 1 m, ponta, ponta + 1 m)",
+                            variable=self.tip_average_var).grid(row=6, column=0, columnspan=2, padx=5, pady=2, sticky="w")
+
 
         # Botão de Cálculo
-        calculate_button = ttk.Button(input_frame, text="Calcular Carga Admissível", command=self._execute_de_court_calculation)
-        calculate_button.pack(pady=10)
+        buttons_frame = ttk.Frame(input_frame)
+        buttons_frame.pack(pady=10)
+        self.calculate_button = ttk.Button(buttons_frame, text="Calcular Carga Admissível", command=self._execute_calculation)
+        self.calculate_button.pack(side="left", padx=5)
+        self.job_buttons = [self.calculate_button] # Desabilitados durante os cálculos em segundo plano
+
+        # Modo otimizador (Décourt-Quaresma): varre comprimento x diâmetro x tipo de estaca para todos os pilares
+        self.optimize_button = None
+        if self.metodo == "decourt_quaresma":
+            self.optimize_button = ttk.Button(buttons_frame, text="Otimizar Estacas dos Pilares", command=self._execute_optimization)
+            self.optimize_button.pack(side="left", padx=5)
+            self.job_buttons.append(self.optimize_button)
+
+        # Progresso e cancelamento dos cálculos em segundo plano (exibidos só durante o cálculo)
+        self.progress_bar = ttk.Progressbar(buttons_frame, mode="indeterminate", length=120)
+        self.cancel_button = ttk.Button(buttons_frame, text="Cancelar", command=self._cancel_job)
 
         # Frame para o Treeview de resultados e o Canvas do gráfico
         results_and_plot_frame = ttk.Frame(self)
         results_and_plot_frame.pack(padx=10, pady=10, fill="both", expand=True)
 
-        # Treeview para exibir os resultados detalhados por metro
-        self.results_tree = ttk.Treeview(results_and_plot_frame, columns=("Profundidade", "N_SPT_Med", "Alfa", "Beta", "qp", "ql", "Pdqm"), show="headings")
-        self.results_tree.heading("Profundidade", text="Prof. (m)")
-        self.results_tree.heading("N_SPT_Med", text="N_SPT Médio")
-        self.results_tree.heading("Alfa", text="α")
-        self.results_tree.heading("Beta", text="β")
-        self.results_tree.heading("qp", text="qp (kPa)")
-        self.results_tree.heading("ql", text="ql (kPa)")
-        self.results_tree.heading("Pdqm", text="Pdqm (kN)")
-        
-        # Define as larguras das colunas
-        self.results_tree.column("Profundidade", width=70, anchor="center")
-        self.results_tree.column("N_SPT_Med", width=90, anchor="center")
-        self.results_tree.column("Alfa", width=50, anchor="center")
-        self.results_tree.column("Beta", width=50, anchor="center")
-        self.results_tree.column("qp", width=70, anchor="center")
-        self.results_tree.column("ql", width=70, anchor="center")
-        self.results_tree.column("Pdqm", width=80, anchor="center")
+        # Tabela para exibir os resultados detalhados por segmento (apenas as linhas visíveis viram itens do Treeview)
+        colunas = self.metodo_info["colunas"]
+        self.results_table = TabelaVirtual(results_and_plot_frame, columns=tuple(coluna for coluna, _, _ in colunas))
+        self.results_tree = self.results_table.tree
+        # Define os cabeçalhos e as larguras das colunas
+        for coluna, cabecalho, largura in colunas:
+            self.results_tree.heading(coluna, text=cabecalho)
+            self.results_tree.column(coluna, width=largura, anchor="center")
 
         # Configura as tags para as cores das linhas
         self.results_tree.tag_configure('oddrow', background='#E0E0E0')
         self.results_tree.tag_configure('evenrow', background='#FFFFFF')
+        # Linhas abaixo da ponta da estaca informada aparecem em cinza
+        self.results_tree.tag_configure('below_tip', foreground='#808080')
+        self.results_tree.tag_configure('total_row', background='#D3EDF8', font=('Arial', 10, 'bold'))
 
-        self.results_tree.pack(side="left", fill="both", expand=True, padx=(0, 10))
+        self.results_table.pack(side="left", fill="both", expand=True, padx=(0, 10))
 
         # Canvas para a representação gráfica
         self.canvas = tk.Canvas(results_and_plot_frame, bg="white", bd=2, relief="sunken")
         self.canvas.pack(side="right", fill="both", expand=True)
-        self.canvas.bind("<Configure>", self._draw_soil_profile_only) # Redesenha ao redimensionar
+        self.canvas.bind("<Configure>", self._on_canvas_configure) # Redesenha ao redimensionar
         self._draw_soil_profile_only() # Desenha o perfil do solo inicialmente
 
+    def _get_depth_index(self):
+        """Retorna o índice de profundidade da sondagem, reconstruindo-o apenas quando as camadas mudam."""
+        camadas = self.sondagem_data.get('camadas', [])
+        cota_terreno = float(self.sondagem_data.get('Cota_Terreno', 0.0))
+        if (self._depth_index is None or self._depth_index_camadas is not camadas
+                or self._depth_index.cota_terreno != cota_terreno):
+            self._depth_index = IndiceProfundidade.da_sondagem(self.sondagem_data)
+            self._depth_index_camadas = camadas
+        return self._depth_index
+
     def _update_pile_length_display(self, event=None):
         try:
             cota_arrasamento = float(self.top_level_entry.get().replace(',', '.'))
@@ -347,28 +554,28 @@ class BoreholeCalculationFrame(ttk.Frame):
         except ValueError:
             self.pile_tip_level_display.config(text="Erro de valor")
 
-    def _execute_de_court_calculation(self):
+    @instrumentado()
+    def _execute_calculation(self):
         # --- PASSO 1: COLETAR DADOS ---
         try:
             diametro_cm = float(self.diameter_entry.get().replace(',', '.'))
             cota_arrasamento = float(self.top_level_entry.get().replace(',', '.'))
             comprimento_estaca = float(self.pile_length_entry.get().replace(',', '.'))
             tipo_estaca = self.pile_type_combobox.get()
+            discretizacao = self._get_side_friction_step()
+            nspt_ponta_media = self.tip_average_var.get()
             diametro_m = diametro_cm / 100.0 # Converter diâmetro para metros
             cota_ponta = cota_arrasamento - comprimento_estaca
 
-            # Cota do terreno natural (assumimos a primeira cota de sondagem como o nível do terreno)
-            # ou um valor padrão se não houver dados de sondagem
-            cota_terreno = 0.0
-            if self.sondagem_data and self.sondagem_data.get('camadas'):
-                # Encontra a menor profundidade inicial para estimar a cota do terreno
-                # Profundidade inicial 0m corresponde à cota do terreno
-                cota_terreno = max([layer['cota_inicial'] for layer in self.sondagem_data['camadas']]) # Invertendo para ter a cota mais "alta" (menor profundidade)
-
             if not self.sondagem_data or not self.sondagem_data.get('camadas'):
                 messagebox.showwarning("Dados Ausentes", "Nenhum dado de sondagem disponível para esta sub-aba. Por favor, adicione dados na aba 'Sondagens'.")
                 return
 
+            # Índice ordenado das camadas (busca binária por profundidade)
+            indice = self._get_depth_index()
+            # Cota do terreno natural: profundidade 0m da sondagem
+            cota_terreno = indice.cota_terreno
+
         except ValueError:
             messagebox.showerror("Erro de Entrada", "Por favor, insira valores numéricos válidos para diâmetro, cota de arrasamento e comprimento.")
             return
@@ -376,244 +583,430 @@ class BoreholeCalculationFrame(ttk.Frame):
             messagebox.showerror("Erro", f"Ocorreu um erro ao coletar dados: {e}")
             return
 
-        # Limpar resultados anteriores
-        for item in self.results_tree.get_children():
-            self.results_tree.delete(item)
-
-        # --- PASSO 2: CÁLCULO DE RESISTÊNCIA DE PONTA (Pp) ---
-        # A cota da ponta da estaca é cota_arrasamento - comprimento_estaca
-        
-        # Ajusta cota da ponta se a estaca for "Pré-moldada" ou "Metálica"
-        # Para fins de cálculo, consideramos a penetração um pouco maior.
-        if "Pré-moldada" in tipo_estaca or tipo_estaca == "Metálica":
-            cota_ponta_calculo = cota_ponta - (0.05 * diametro_m) # 5% do diâmetro a mais
-        else:
-            cota_ponta_calculo = cota_ponta
+        # --- PASSOS 2 e 3: CURVAS DE CAPACIDADE (Décourt-Quaresma e Aoki-Velloso em todas as profundidades) ---
+        # Uma única passada com somas acumuladas nos segmentos (1 m, camadas ou o passo escolhido
+        # em "Integração do Atrito Lateral") fornece a capacidade pelos dois métodos para cada
+        # profundidade de ponta ao longo da sondagem. A ponta da estaca informada é avaliada na
+        # mesma passada (último elemento de prof_pontas).
+        # Estacas "Pré-moldada" e "Metálica" têm a ponta de cálculo 5% do diâmetro mais profunda (Décourt-Quaresma).
+        # O resultado é reutilizado do cache se a sondagem, a estaca e as tabelas não mudaram:
+        # primeiro o da sessão (memória, compartilhado pelas abas dos dois métodos quando usam a
+        # mesma integração), depois o de disco, endereçado pelo conteúdo.
+        # O cálculo (e a leitura do disco) roda numa thread de trabalho; a janela continua respondendo.
+        prof_ponta = cota_terreno - cota_ponta
+        hash_dados = hash_sondagem(self.sondagem_data)
+        versao = self.coeficientes_dq.versao
+        chave = (self.sondagem_name, hash_dados, diametro_cm, cota_arrasamento,
+                 comprimento_estaca, tipo_estaca, discretizacao, nspt_ponta_media, versao)
+        estaca = dict(cota_terreno=cota_terreno, cota_arrasamento=cota_arrasamento, cota_ponta=cota_ponta,
+                      diametro_m=diametro_m, tipo_estaca=tipo_estaca, prof_ponta=prof_ponta)
+        resultado = self.cache_resultados.obter(chave)
+        if resultado is not None:
+            self._show_result(chave, resultado, estaca)
+            return
 
-        def _get_nspt_and_soil(cota_target):
-            """Retorna o Nspt e o tipo de solo para uma dada cota (profundidade)."""
-            if not self.sondagem_data or not self.sondagem_data.get('camadas'):
-                return None, None
-            
-            # Converte cota_target para profundidade
-            profundidade_target = cota_terreno - cota_target
-
-            for camada in self.sondagem_data['camadas']:
-                # Verifica se a profundidade alvo está dentro da camada
-                # camada['prof_inicial'] é a profundidade de início da camada
-                # camada['prof_final'] é a profundidade de fim da camada
-                if camada['prof_inicial'] <= profundidade_target <= camada['prof_final_camada']:
-                    return float(camada['n_spt']), camada['tipo_solo']
-            return None, None # Se a cota não estiver em nenhuma camada
-
-        # Nspt médio na ponta da estaca (média dos 4 últimos valores do SPT dentro do bulbo)
-        # Bulbo de pressão: de Zp (cota da ponta) a Zp + 2D (cota acima da ponta)
-        # Nspt médio na ponta: média dos Nspt dos últimos 4 metros acima da ponta e 1 metro abaixo da ponta
-        # Vamos simplificar para pegar o Nspt da camada onde a ponta se encontra para o cálculo de qp
-        nspt_ponta, tipo_solo_ponta = _get_nspt_and_soil(cota_ponta_calculo) # Usar a cota de cálculo da ponta
-
-        if nspt_ponta is None:
+        # A thread de trabalho usa uma cópia das tabelas: se a interface alterá-las durante o
+        # cálculo, a curva continua correspondendo à chave de disco calculada aqui
+        params = copy.deepcopy(self.params)
+        coeficientes = TabelaCoeficientesDecourt(params)
+        fatores = TabelaFatoresAokiVelloso(params)
+        k = k_aoki_velloso(params)
+        chave_disco = self._chave_disco(coeficientes, hash_dados, diametro_cm, cota_arrasamento, comprimento_estaca,
+                                        tipo_estaca, discretizacao, nspt_ponta_media)
+
+        @instrumentado("BoreholeCalculationFrame.calculo_capacidade")
+        def calcular(tarefa):
+            resultado = self._obter_resultado_disco(chave_disco)
+            if resultado is None:
+                tarefa.verificar_cancelamento()
+                prof_curva = profundidades_do_perfil(indice, cota_arrasamento, discretizacao)
+                perfil = perfil_capacidade_metodos(
+                    indice, coeficientes, k, ALFA_AOKI_VELLOSO, fatores, tipo_estaca, diametro_m, cota_arrasamento,
+                    prof_pontas=np.append(prof_curva, prof_ponta), discretizacao=discretizacao,
+                    nspt_ponta_media=nspt_ponta_media
+                )
+                resultado = (prof_curva, perfil)
+                self._guardar_resultado_disco(chave_disco, resultado)
+            return resultado
+
+        def concluir(resultado):
+            # Tabelas alteradas durante o cálculo: o resultado é exibido, mas não vai para o cache
+            if self.coeficientes_dq.versao == versao:
+                self.cache_resultados.guardar(chave, resultado)
+            self._show_result(chave, resultado, estaca)
+
+        self._start_job(calcular, concluir)
+
+    @instrumentado()
+    def _show_result(self, chave, resultado, estaca):
+        """Exibe a curva calculada do método desta aba (thread do Tk): tabela, mensagem e desenho."""
+        prof_curva, perfil = resultado
+        cota_ponta = estaca["cota_ponta"]
+        diametro_m = estaca["diametro_m"]
+        tipo_estaca = estaca["tipo_estaca"]
+        carga = self.metodo_info["carga"]
+
+        # Nspt na ponta: o da camada onde a ponta se encontra ou, em Décourt-Quaresma com a opção
+        # marcada, a média de Décourt (ponta - 1 m, ponta, ponta + 1 m) lida do perfil pré-calculado
+        if np.isnan(perfil[self.metodo_info["nspt_ponta"]][-1]):
+            if self.metodo_info["ponta_deslocada"] and ("Pré-moldada" in tipo_estaca or tipo_estaca == "Metálica"):
+                cota_ponta_calculo = cota_ponta - (0.05 * diametro_m)
+            else:
+                cota_ponta_calculo = cota_ponta
+            self.results_table.definir_linhas([])
+            self._displayed_result_key = None
             messagebox.showwarning("Dados Incompletos", f"Não foi possível encontrar dados de SPT para a cota da ponta da estaca ({cota_ponta_calculo:.2f} m).")
             return
 
-        # Obter qp da tabela
-        qp = 0.0
-        # Simplificação: para Décourt, qp é Nspt * Coeficiente (pode ser específico do tipo de solo ou genérico)
-        # Para solos granulares (areias), qp = K * Nspt (onde K varia de 250 a 350 kN/m2)
-        # Para solos coesivos (argilas), qp = K * Nspt (onde K varia de 120 a 180 kN/m2)
-        
-        # Para a formulação padrão de Décourt-Quaresma (1996) a ser implementada:
-        # qp = C_p * Nspt (onde C_p é um coeficiente que depende do tipo de solo na ponta)
-
-        # Usando valores de referência para C_p (kN/m²/golpe) - simplificação didática
-        C_p_areia = 250
-        C_p_argila = 120
-
-        if "Areia" in tipo_solo_ponta:
-            qp = C_p_areia * nspt_ponta
-        elif "Argila" in tipo_solo_ponta:
-            qp = C_p_argila * nspt_ponta
-        elif "Silte" in tipo_solo_ponta:
-            qp = C_p_argila * nspt_ponta # Para silte, assumir comportamento similar a argila
-        else:
-            qp = C_p_areia * nspt_ponta # Default para tipo de solo não especificado
+        # --- PASSO 4: CARGA ADMISSÍVEL ---
+        # Décourt-Quaresma: Pdqm = (Pp + Pl) / 2 (fator de segurança implícito de 2.0)
+        # Aoki-Velloso: Qadm = Qult / 2 (fator de segurança global 2.0)
+        carga_total = float(perfil[carga][-1])
+        if self.metodo == "aoki_velloso" and np.isnan(carga_total):
+            self.results_table.definir_linhas([])
+            self._displayed_result_key = None
+            messagebox.showwarning("Dados Incompletos", "Há solos sem coeficientes K/α de Aoki-Velloso ao longo da estaca. "
+                                   "Verifique a aba 'Configurações'.")
+            return
 
-        # Área da ponta da estaca (Ap)
-        area_ponta = math.pi * (diametro_m / 2)**2
+        if chave != self._displayed_result_key:
+            self._fill_results_tree(perfil, prof_curva, estaca["prof_ponta"], carga_total)
+            self._displayed_result_key = chave
 
-        # Resistência de ponta (Pp)
-        Pp = qp * area_ponta
+        messagebox.showinfo("Cálculo Concluído",
+                            f"A Carga Admissível ({self.metodo_info['rotulo']}) para a estaca é: {carga_total:.2f} kN")
 
-        # --- PASSO 3: CÁLCULO DE RESISTÊNCIA LATERAL (Pl) ---
-        Pl = 0.0
-        # A resistência lateral é a soma das resistências laterais de cada camada atravessada pela estaca
-        # Vamos iterar por cada metro de comprimento da estaca para calcular a resistência lateral.
-        # Considerar os Nspt a cada metro para o cálculo de ql
+        # Desenhar o gráfico após o cálculo
+        self._draw_pile_and_soil_profile(
+            sondagem_data=self.sondagem_data,
+            cota_terreno=estaca["cota_terreno"], # Passa a cota do terreno
+            cota_arrasamento=estaca["cota_arrasamento"],
+            cota_ponta=cota_ponta,
+            diametro_m=diametro_m,
+            tipo_estaca=tipo_estaca,
+            perfil=perfil,
+            prof_curva=prof_curva
+        )
 
-        # Gera uma lista de profundidades (a cada 1m) ao longo da estaca
-        # A estaca vai de cota_arrasamento até cota_ponta
-        # Itera de cota_arrasamento para baixo
-        
-        # Garante que a iteração é pela profundidade (positiva)
-        prof_arrasamento = cota_terreno - cota_arrasamento
-        prof_ponta = cota_terreno - cota_ponta
+    def _start_job(self, funcao, ao_concluir):
+        """Executa ``funcao(tarefa)`` numa thread de trabalho, com barra de progresso e botão Cancelar.
 
-        # A iteração deve ser da profundidade de arrasamento até a profundidade da ponta
-        # Vamos iterar a cada 1 metro de profundidade
-        
-        detailed_results = [] # Para armazenar resultados detalhados por metro/camada
+        Os botões de cálculo ficam desabilitados até a tarefa terminar;
+        ``ao_concluir(resultado)`` é chamado na thread do Tk.
+        """
+        if self._job is not None and self._job.ativa:
+            return
+        for button in self.job_buttons:
+            button.state(["disabled"])
+        self.progress_bar.configure(mode="indeterminate", value=0)
+        self.progress_bar.pack(side="left", padx=5)
+        self.progress_bar.start(10)
+        self.cancel_button.state(["!disabled"])
+        self.cancel_button.pack(side="left", padx=5)
+
+        def concluir(resultado):
+            self._finish_job()
+            ao_concluir(resultado)
+
+        def falhar(erro):
+            self._finish_job()
+            messagebox.showerror("Erro", f"Ocorreu um erro no cálculo: {erro}")
+
+        self._job = TarefaSegundoPlano(self, funcao, ao_concluir=concluir, ao_falhar=falhar,
+                                       ao_progresso=self._on_job_progress, ao_cancelar=self._finish_job)
+        self._job.iniciar()
+
+    def _on_job_progress(self, feitas, total):
+        if total:
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode="determinate", maximum=total, value=feitas)
+
+    def _cancel_job(self):
+        if self._job is not None:
+            self._job.cancelar()
+            self.cancel_button.state(["disabled"]) # Aguarda a thread chegar a um ponto de verificação
+
+    def _finish_job(self):
+        self._job = None
+        self.progress_bar.stop()
+        self.progress_bar.pack_forget()
+        self.cancel_button.pack_forget()
+        for button in self.job_buttons:
+            button.state(["!disabled"])
+
+    def _get_side_friction_step(self):
+        """Discretização do atrito lateral escolhida no formulário (None = segmentos de 1 m)."""
+        return SIDE_FRICTION_STEPS.get(self.side_friction_combobox.get())
+
+    def _chave_disco(self, coeficientes, hash_dados, diametro_cm, cota_arrasamento, comprimento_estaca, tipo_estaca,
+                     discretizacao=None, nspt_ponta_media=False):
+        # As curvas dos dois métodos são guardadas juntas; VERSAO_CALCULO descarta as entradas
+        # de versões anteriores das fórmulas, e a assinatura de ``coeficientes`` cobre todas as
+        # tabelas de parâmetros usadas no cálculo
+        return CacheDisco.chave("decourt_quaresma+aoki_velloso", VERSAO_CALCULO, hash_dados, diametro_cm,
+                                cota_arrasamento, comprimento_estaca, tipo_estaca, discretizacao,
+                                nspt_ponta_media, coeficientes.assinatura())
+
+    def _obter_resultado_disco(self, chave_disco):
+        """Curva (prof_curva, perfil) guardada no cache em disco, ou None."""
+        if self.cache_disco is None:
+            return None
+        arrays = self.cache_disco.obter_arrays(chave_disco)
+        if arrays is None:
+            return None
+        prof_curva = arrays.pop("prof_curva")
+        return prof_curva, arrays
+
+    def _guardar_resultado_disco(self, chave_disco, resultado):
+        if self.cache_disco is None:
+            return
+        prof_curva, perfil = resultado
+        try:
+            self.cache_disco.guardar_arrays(chave_disco, {"prof_curva": prof_curva, **perfil})
+        except OSError:
+            pass # O cache em disco é opcional: sem permissão de escrita, apenas não guarda
 
-        current_prof = math.floor(prof_arrasamento) # Começa da profundidade de arrasamento (arredonda para baixo)
-        
-        while current_prof < prof_ponta:
-            prof_inicial_segmento = current_prof
-            prof_final_segmento = min(current_prof + 1, prof_ponta) # Garante que não ultrapasse a ponta da estaca
+    @instrumentado()
+    def _fill_results_tree(self, perfil, prof_curva, prof_ponta, carga_total):
+        """Preenche a tabela com a curva de capacidade (uma linha por profundidade de ponta).
 
-            if prof_inicial_segmento >= prof_final_segmento: # Evita segmentos vazios ou invertidos
-                current_prof += 1
-                continue
+        As linhas são formatadas sob demanda (ver LinhasCurvaCapacidade); só as
+        visíveis são convertidas em itens do Treeview.
+        """
+        tags = [('evenrow' if i % 2 == 0 else 'oddrow',) + (('below_tip',) if prof_final_segmento > prof_ponta else ())
+                for i, prof_final_segmento in enumerate(prof_curva.tolist())]
+        tags.append(('total_row',)) # Carga admissível final no final
+        self.results_table.definir_linhas(self.metodo_info["linhas"](perfil, prof_curva, carga_total), tags)
 
-            # Encontrar a camada ou camadas que o segmento atravessa
-            # Para simplificar, vamos usar o Nspt da profundidade central do segmento
-            
-            prof_central_segmento = (prof_inicial_segmento + prof_final_segmento) / 2.0
-            
-            # Converte a profundidade central para cota para _get_nspt_and_soil
-            cota_central_segmento = cota_terreno - prof_central_segmento
-            
-            nspt_segmento, tipo_solo_segmento = _get_nspt_and_soil(cota_central_segmento)
+    def _execute_optimization(self):
+        """Encontra, para cada pilar, a estaca mais econômica que atende ao N_max nesta sondagem."""
+        if not self.sondagem_data or not self.sondagem_data.get('camadas'):
+            messagebox.showwarning("Dados Ausentes", "Nenhum dado de sondagem disponível para esta sub-aba. Por favor, adicione dados na aba 'Sondagens'.")
+            return
+        pilares = self.main_app.dados_pilares if self.main_app else {}
+        if not pilares:
+            messagebox.showwarning("Dados Ausentes", "Nenhum pilar cadastrado. Adicione ou importe pilares na aba 'Pilares'.")
+            return
 
-            if nspt_segmento is None:
-                # Se não há dados SPT para este segmento, pula ou trata como 0
-                ql_segmento = 0.0
-                alfa_segmento = 0.0
-                beta_segmento = 0.0
-            else:
-                # Obter alpha e beta da tabela de parâmetros (simplificado)
-                # Adaptação para usar as tabelas de self.params
-                alpha_data = self.params["decourt_quaresma_alpha"]["data"]
-                beta_data = self.params["decourt_quaresma_beta"]["data"]
-                
-                alfa_segmento = 0.0
-                beta_segmento = 0.0
-
-                # Mapeia tipo de estaca para o índice da coluna
-                # Headers: ["Tipo de Solo", "Cravada a céu aberto", "Escavada a fluido", "Hélice Contínua", "Raiz", "Injetada sob pressão", "Franki"]
-                # Assumindo que "Pré-moldada Redonda" e "Pré-moldada Quadrada" se enquadram em "Cravada a céu aberto" para alpha/beta
-                col_idx_map = {
-                    "Cravada a céu aberto": 1,
-                    "Escavada a fluido": 2,
-                    "Hélice Contínua": 3,
-                    "Raiz": 4,
-                    "Injetada sob pressão": 5,
-                    "Franki": 6,
-                    "Pré-moldada Redonda": 1, # Mapeia para "Cravada a céu aberto"
-                    "Pré-moldada Quadrada": 1  # Mapeia para "Cravada a céu aberto"
-                }
-
-                tipo_estaca_col_idx = col_idx_map.get(tipo_estaca, 1) # Default para Cravada a céu aberto
-
-                # Encontra a linha de solo correspondente para alpha e beta
-                # Mapeia o tipo de solo para a chave da tabela
-                # Ex: "Argila Arenosa" -> "Argilas Intermediárias"
-                solo_key = None
-                if "Areia" in tipo_solo_segmento:
-                    solo_key = "Areias"
-                elif "Argila" in tipo_solo_segmento:
-                    solo_key = "Argilas"
-                elif "Silte" in tipo_solo_segmento: # Silte pode ser intermediário
-                    solo_key = "Argilas Intermediárias"
-                
-                if solo_key and solo_key in alpha_data and solo_key in beta_data:
-                    try:
-                        alfa_segmento = float(alpha_data[solo_key][tipo_estaca_col_idx - 1].replace(',', '.'))
-                        beta_segmento = float(beta_data[solo_key][tipo_estaca_col_idx - 1].replace(',', '.'))
-                    except (ValueError, IndexError):
-                        alfa_segmento = 0.0
-                        beta_segmento = 0.0
-                    except Exception as e:
-                        messagebox.showerror("Erro de Cálculo", f"Erro ao obter alpha/beta: {e}")
-                        alfa_segmento = 0.0
-                        beta_segmento = 0.0
-
-            # ql = alfa * Nspt + beta (Décourt-Quaresma simplificado)
-            ql_segmento = alfa_segmento * nspt_segmento + beta_segmento
-            Pl_trecho_kN = ql_segmento * area_ponta
-            Pl += Pl_trecho_kN
-            ql_ult_kPa = ql_segmento
-            ql_ult_tf_m2 = ql_segmento / 9.81 # Convertendo kPa para tf/m2
-            Pl_trecho_tf = Pl_trecho_kN / 9.81
-
-            detailed_results.append([
-                f"{prof_inicial_segmento:.2f} a {prof_final_segmento:.2f}",
-                nspt_segmento,
-                tipo_solo_segmento,
-                ql_ult_kPa,
-                ql_ult_tf_m2,
-                Pl_trecho_tf
-            ])
-
-            current_prof += 1 # Move para o próximo segmento
-
-        # --- PASSO 4: CÁLCULO DA CARGA ADMISSÍVEL (Pdqm) ---
-        # Formulação de Décourt-Quaresma: Pdqm = (Pp + Pl) / 2
-        # Fator de segurança implícito de 2.0 (Décourt-Quaresma utiliza Fs=2)
-        # Aqui estou assumindo FSL = 1 e FSP = 1 para a fórmula de Décourt-Quaresma
-        # Se houver outros fatores de segurança, eles devem ser aplicados.
-        FSL = 1.0 # Fator de Segurança para Resistência Lateral
-        FSP = 1.0 # Fator de Segurança para Resistência de Ponta
-        # Para Décourt-Quaresma (1996), a fórmula já incorpora o fator de segurança
-        Pdqm = (Pp + Pl) / 2.0
-
-        # Exibir resultados detalhados no Treeview
-        for i, row_data in enumerate(detailed_results):
-            tag = 'evenrow' if i % 2 == 0 else 'oddrow'
-            self.results_tree.insert("", "end", values=(
-                row_data[0],
-                row_data[1],
-                row_data[2],
-                row_data[3],
-                row_data[4],
-                row_data[5],
-                "" # Deixando a última coluna vazia para Pdqm total
-            ), tags=(tag,))
-
-        # Adicionar a carga admissível final no final
-        self.results_tree.insert("", "end", values=("", "", "", "", "", "Pdqm Total (kN)", f"{Pdqm:.2f}"), tags=('total_row'))
-        self.results_tree.tag_configure('total_row', background='#D3EDF8', font=('Arial', 10, 'bold'))
+        try:
+            cota_arrasamento = float(self.top_level_entry.get().replace(',', '.'))
+        except ValueError:
+            messagebox.showerror("Erro de Entrada", "Por favor, insira um valor numérico válido para a cota de arrasamento.")
+            return
 
+        indice = self._get_depth_index()
+        # Comprimentos inteiros até a última profundidade com dados de SPT
+        comprimentos = comprimentos_da_sondagem(indice, cota_arrasamento)
+        if not comprimentos:
+            messagebox.showwarning("Dados Incompletos", "A sondagem não tem profundidade suficiente abaixo da cota de arrasamento.")
+            return
 
-        messagebox.showinfo("Cálculo Concluído", f"A Carga Admissível (Pdqm) para a estaca é: {Pdqm:.2f} kN")
+        # Diâmetros disponíveis de cada tipo de estaca vêm da Tabela de SEÇÃO
+        diametros = diametros_da_tabela_secao(self.params, self.pile_type_combobox["values"])
+        # Cópias: a aba Pilares e as tabelas de parâmetros podem mudar durante o cálculo
+        pilares = dict(pilares)
+        coeficientes = TabelaCoeficientesDecourt(copy.deepcopy(self.params))
+        discretizacao = self._get_side_friction_step()
+        nspt_ponta_media = self.tip_average_var.get()
+
+        @instrumentado("BoreholeCalculationFrame.varredura_otimizador")
+        def otimizar(tarefa):
+            def progresso(feitos, total):
+                tarefa.verificar_cancelamento()
+                tarefa.informar_progresso(feitos, total)
+            grade = varrer_grade(indice, coeficientes, diametros, comprimentos, cota_arrasamento, progresso=progresso,
+                                 discretizacao=discretizacao, nspt_ponta_media=nspt_ponta_media)
+            return otimizar_pilares(grade, pilares)
+
+        self._start_job(otimizar, functools.partial(self._show_optimization_results, pilares))
+
+    def _show_optimization_results(self, pilares, solucoes):
+        """Exibe as soluções do otimizador em uma janela com uma tabela.
+
+        ``pilares`` é a cópia usada na otimização (a aba Pilares pode ter mudado desde então).
+        """
+        dialog = tk.Toplevel(self)
+        dialog.title(f"Otimização de Estacas - {self.sondagem_name}")
+        dialog.transient(self.winfo_toplevel())
+
+        cols = ("Pilar", "N max", "Tipo de Estaca", "Diâm. (cm)", "Comp. (m)", "Pdqm (kN)", "Volume (m³)")
+        tree = ttk.Treeview(dialog, columns=cols, show="headings")
+        for col in cols:
+            tree.heading(col, text=col)
+            tree.column(col, width=110, anchor="center")
+        tree.tag_configure('sem_solucao', background='#F8D3D3')
+
+        for nome, solucao in solucoes.items():
+            if solucao is None:
+                n_max = pilares[nome].get('N_max', '')
+                tree.insert("", "end", values=(nome, n_max, "Sem solução", "", "", "", ""), tags=('sem_solucao',))
+            else:
+                tree.insert("", "end", values=(
+                    nome, f"{solucao['N_max']:.2f}", solucao['Tipo_Estaca'], f"{solucao['Diametro_cm']:.0f}",
+                    f"{solucao['Comprimento']:.2f}", f"{solucao['Pdqm']:.2f}", f"{solucao['Custo']:.3f}"
+                ))
+
+        scroll_y = ttk.Scrollbar(dialog, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scroll_y.set)
+        scroll_y.pack(side="right", fill="y")
+        tree.pack(expand=True, fill="both", padx=5, pady=5)
+        ttk.Button(dialog, text="Fechar", command=dialog.destroy).pack(pady=5)
+
+    def _begin_canvas_pass(self):
+        """Inicia um redesenho do canvas: itens não usados até _end_canvas_pass são removidos."""
+        self._canvas_used = []
+        self._canvas_created = False
+        self._canvas_reused = False
+
+    def _canvas_item(self, key, kind, coords, **options):
+        """Desenha um item do canvas identificado por ``key``.
+
+        O item é criado apenas na primeira vez; nos redesenhos seguintes ele é
+        movido com ``coords()`` e reconfigurado só se as opções mudaram.
+        """
+        entry = self._canvas_items.get(key)
+        if entry is not None and entry[1] == kind:
+            item, _, old_coords, old_options = entry
+            if coords != old_coords:
+                self.canvas.coords(item, *coords)
+            if options != old_options:
+                self.canvas.itemconfigure(item, **options)
+            self._canvas_reused = True
+        else:
+            if entry is not None:
+                self.canvas.delete(entry[0])
+            item = getattr(self.canvas, "create_" + kind)(*coords, **options)
+            self._canvas_created = True
+        self._canvas_items[key] = (item, kind, coords, options)
+        self._canvas_used.append(key)
+        return item
+
+    def _end_canvas_pass(self):
+        """Remove os itens que não foram desenhados neste redesenho."""
+        used = set(self._canvas_used)
+        for key in [k for k in self._canvas_items if k not in used]:
+            self.canvas.delete(self._canvas_items.pop(key)[0])
+        if self._canvas_created and self._canvas_reused:
+            # Itens novos ficam acima dos reaproveitados: restaura a ordem de desenho
+            for key in self._canvas_used:
+                self.canvas.tag_raise(self._canvas_items[key][0])
+        self._drawn_size = self._canvas_size()
+
+    def _canvas_size(self):
+        canvas_width = self.canvas.winfo_width() if self.canvas.winfo_width() > 1 else 300
+        canvas_height = self.canvas.winfo_height() if self.canvas.winfo_height() > 1 else 400
+        return canvas_width, canvas_height
+
+    def _show_empty_canvas(self):
+        """Limpa o canvas e mostra o aviso de sondagem sem dados (o Label é criado uma única vez)."""
+        self._begin_canvas_pass()
+        self._end_canvas_pass()
+        if self._empty_label is None:
+            self._empty_label = ttk.Label(self.canvas, text="Nenhum dado de sondagem disponível para desenhar.")
+        self._empty_label.place(relx=0.5, rely=0.5, anchor="center")
+
+    def _hide_empty_canvas(self):
+        if self._empty_label is not None:
+            self._empty_label.place_forget()
+
+    def _layer_geometry(self, indice):
+        """Faixas de solo do desenho, calculadas uma vez por índice de profundidade.
+
+        Camadas consecutivas do mesmo tipo de solo formam uma única faixa, cujo
+        rótulo mostra o intervalo de N. Retorna (faixas, menor cota da base,
+        maior cota do topo), com faixas = [(cota_topo, cota_base, rótulo)]; só a
+        conversão para pixels depende do tamanho do canvas.
+        """
+        if self._geometry_index is not indice:
+            grupos = [] # [cota_topo, cota_base, tipo_solo, [n_spt, ...]]
+            for camada, cota_topo, cota_base in zip(indice.camadas, indice.cotas_topo.tolist(), indice.cotas_base.tolist()):
+                if grupos and grupos[-1][2] == camada['tipo_solo'] and abs(grupos[-1][1] - cota_topo) < 1e-9:
+                    grupos[-1][1] = cota_base
+                    grupos[-1][3].append(camada['n_spt'])
+                else:
+                    grupos.append([cota_topo, cota_base, camada['tipo_solo'], [camada['n_spt']]])
+            faixas = []
+            for cota_topo, cota_base, tipo_solo, valores_n in grupos:
+                n_min, n_max = min(valores_n), max(valores_n)
+                n_texto = f"{n_min}" if n_min == n_max else f"{n_min} a {n_max}"
+                faixas.append((cota_topo, cota_base, f"{tipo_solo} (N={n_texto})"))
+            self._geometry = (faixas, float(indice.cotas_base.min()), float(indice.cotas_topo.max()))
+            self._geometry_index = indice
+        return self._geometry
+
+    def _draw_soil_layers(self, faixas, cota_to_y, x_left, x_right, x_cota, canvas_height):
+        """Desenha as faixas de solo com nível de detalhe adequado à escala atual.
+
+        Faixas mais finas que MIN_BAND_PX são unidas à seguinte (todas usam a
+        mesma cor, então só some a linha divisória) e o grupo mostra o rótulo da
+        sua faixa mais alta; o nome do solo é omitido em faixas baixas demais
+        para o texto e rótulos de cota que se sobreporiam são descartados. Assim o número de itens depende da altura do canvas, e
+        não da resolução das camadas.
+        """
+        visiveis = [] # [y_topo, y_base, rótulo, cota_topo, cota_base, altura da faixa do rótulo]
+        for cota_topo, cota_base, rotulo in faixas:
+            y_start = cota_to_y(cota_topo)
+            y_end = cota_to_y(cota_base)
+            if y_start >= canvas_height or y_end <= 0: # Otimização: não desenha camadas fora da visão
+                continue
+            if visiveis and visiveis[-1][1] - visiveis[-1][0] < MIN_BAND_PX and abs(visiveis[-1][1] - y_start) < 1:
+                grupo = visiveis[-1]
+                grupo[1], grupo[4] = y_end, cota_base
+                if y_end - y_start > grupo[5]: # O grupo mostra o rótulo da sua faixa mais alta
+                    grupo[2], grupo[5] = rotulo, y_end - y_start
+            else:
+                visiveis.append([y_start, y_end, rotulo, cota_topo, cota_base, y_end - y_start])
 
-        # Desenhar o gráfico após o cálculo
-        self._draw_pile_and_soil_profile(
-            sondagem_data=self.sondagem_data,
-            cota_terreno=cota_terreno, # Passa a cota do terreno
-            cota_arrasamento=cota_arrasamento,
-            cota_ponta=cota_ponta,
-            diametro_m=diametro_m,
-            tipo_estaca=tipo_estaca
-        )
+        ultimo_y_cota = -math.inf
+        for i, (y_start, y_end, rotulo, cota_topo, cota_base, _) in enumerate(visiveis):
+            # Desenhar o retângulo da camada
+            self._canvas_item(("camada", i), "rectangle", (x_left, y_start, x_right, y_end),
+                              fill="#D2B48C", outline="black", tags="solo_layer") # Cor genérica de solo
+            self._canvas_item(("camada_base", i), "line", (x_left, y_end, x_right, y_end), fill="black", width=1) # Linha divisória da camada
+
+            # Adicionar texto da camada, se couber na faixa
+            if y_end - y_start >= LABEL_MIN_PX:
+                self._canvas_item(("camada_texto", i), "text", ((x_left + x_right) / 2, (y_start + y_end) / 2), text=rotulo,
+                                  fill="black", font=("Arial", 8), tags="solo_text")
+
+            # Adicionar cotas ao lado esquerdo (a do topo coincide com a base da faixa anterior e é descartada)
+            for key, y, cota in ((("cota_topo", i), y_start, cota_topo), (("cota_base", i), y_end, cota_base)):
+                if y - ultimo_y_cota >= COTA_LABEL_SPACING_PX:
+                    self._canvas_item(key, "text", (x_cota, y), anchor="e", text=f"{cota:.1f}m", font=("Arial", 7))
+                    ultimo_y_cota = y
+
+    def _on_canvas_configure(self, event=None):
+        """Agrupa os eventos de redimensionamento: redesenha uma vez, após o último evento."""
+        if self._redraw_after_id is not None:
+            self.canvas.after_cancel(self._redraw_after_id)
+        self._redraw_after_id = self.canvas.after(REDRAW_DELAY_MS, self._redraw_canvas)
+
+    def _redraw_canvas(self):
+        """Refaz o último desenho (perfil do solo ou estaca) com o tamanho atual do canvas."""
+        self._redraw_after_id = None
+        if not self.canvas.winfo_exists():
+            return
+        if self._canvas_size() == self._drawn_size:
+            return # <Configure> sem mudança de tamanho (ex: a aba apenas foi exibida)
+        draw, kwargs = self._last_drawing
+        draw(**kwargs)
 
+    @instrumentado()
     def _draw_soil_profile_only(self, event=None):
         # Desenha apenas o perfil do solo quando a aba é carregada ou redimensionada
-        self.canvas.delete("all")
+        self._last_drawing = (self._draw_soil_profile_only, {})
         if not self.sondagem_data or not self.sondagem_data.get('camadas'):
-            ttk.Label(self.canvas, text="Nenhum dado de sondagem disponível para desenhar.").place(relx=0.5, rely=0.5, anchor="center")
+            self._show_empty_canvas()
             return
+        self._hide_empty_canvas()
 
-        cota_terreno = 0.0 # Assumindo 0.0 para o nível do terreno
-        
-        camadas = sorted(self.sondagem_data['camadas'], key=lambda x: x['cota_inicial'], reverse=True) # Ordena pela cota inicial (maior cota = menor profundidade)
+        indice = self._get_depth_index() # Camadas já ordenadas (maior cota = menor profundidade)
+        cota_terreno = indice.cota_terreno
+        faixas, min_cota, max_cota = self._layer_geometry(indice)
 
-        canvas_height = self.canvas.winfo_height() if self.canvas.winfo_height() > 1 else 400
-        canvas_width = self.canvas.winfo_width() if self.canvas.winfo_width() > 1 else 300
-
-        # Encontra a cota mais baixa (maior profundidade) para determinar a escala
-        min_cota = min([layer['cota_final_camada'] for layer in camadas])
-        max_cota = max([layer['cota_inicial'] for layer in camadas] + [cota_terreno]) # Cota mais alta (menor profundidade, geralmente 0 ou perto de 0)
+        canvas_width, canvas_height = self._canvas_size()
 
-        # Se a cota do terreno for a mais alta, ajusta o max_cota
+        # Cota mais alta (menor profundidade): o topo das camadas ou o terreno
         if cota_terreno > max_cota:
             max_cota = cota_terreno
 
@@ -635,50 +1028,38 @@ class BoreholeCalculationFrame(ttk.Frame):
             # A cota mais baixa (ex: -20m) deve estar na parte inferior do gráfico (y grande)
             return margin_top + (max_cota - cota) * scale_y
 
+        self._begin_canvas_pass()
+
         # Desenhar o nível do terreno
         y_terreno = cota_to_y(cota_terreno)
-        self.canvas.create_line(0, y_terreno, canvas_width, y_terreno, fill="green", width=2, tags="terreno_level")
-        self.canvas.create_text(10, y_terreno - 10, anchor="nw", text=f"Nível do Terreno (Cota {cota_terreno:.1f}m)", fill="green", font=("Arial", 8))
+        self._canvas_item("terreno_linha", "line", (0, y_terreno, canvas_width, y_terreno), fill="green", width=2, tags="terreno_level")
+        self._canvas_item("terreno_texto", "text", (10, y_terreno - 10), anchor="nw", text=f"Nível do Terreno (Cota {cota_terreno:.1f}m)", fill="green", font=("Arial", 8))
 
         # Desenhar as camadas de solo
-        for camada in camadas:
-            y_start = cota_to_y(camada['cota_inicial'])
-            y_end = cota_to_y(camada['cota_final_camada'])
-
-            # Evita desenhar se as coordenadas não são válidas
-            if y_start is None or y_end is None:
-                continue
-
-            # Desenhar o retângulo da camada
-            self.canvas.create_rectangle(50, y_start, canvas_width - 50, y_end,
-                                         fill="#D2B48C", outline="black", tags="solo_layer") # Cor genérica de solo
-            self.canvas.create_line(50, y_end, canvas_width - 50, y_end, fill="black", width=1) # Linha divisória da camada
-
-            # Adicionar texto da camada
-            mid_y = (y_start + y_end) / 2
-            self.canvas.create_text(canvas_width / 2, mid_y, text=f"{camada['tipo_solo']} (N={camada['n_spt']})",
-                                    fill="black", font=("Arial", 8), tags="solo_text")
-            
-            # Adicionar cota inicial e final da camada
-            self.canvas.create_text(45, y_start, anchor="e", text=f"{camada['cota_inicial']:.1f}m", font=("Arial", 7))
-            self.canvas.create_text(45, y_end, anchor="e", text=f"{camada['cota_final_camada']:.1f}m", font=("Arial", 7))
+        self._draw_soil_layers(faixas, cota_to_y, 50, canvas_width - 50, 45, canvas_height)
 
+        self._end_canvas_pass()
 
-    def _draw_pile_and_soil_profile(self, sondagem_data, cota_terreno, cota_arrasamento, cota_ponta, diametro_m, tipo_estaca):
-        self.canvas.delete("all") # Limpa o canvas antes de redesenhar
+    @instrumentado()
+    def _draw_pile_and_soil_profile(self, sondagem_data, cota_terreno, cota_arrasamento, cota_ponta, diametro_m, tipo_estaca,
+                                    perfil=None, prof_curva=None):
+        self._last_drawing = (self._draw_pile_and_soil_profile, dict(
+            sondagem_data=sondagem_data, cota_terreno=cota_terreno, cota_arrasamento=cota_arrasamento,
+            cota_ponta=cota_ponta, diametro_m=diametro_m, tipo_estaca=tipo_estaca, perfil=perfil, prof_curva=prof_curva))
 
         if not sondagem_data or not sondagem_data.get('camadas'):
-            ttk.Label(self.canvas, text="Nenhum dado de sondagem disponível para desenhar.").place(relx=0.5, rely=0.5, anchor="center")
+            self._show_empty_canvas()
             return
+        self._hide_empty_canvas()
 
-        camadas = sorted(sondagem_data['camadas'], key=lambda x: x['cota_inicial'], reverse=True)
+        indice = self._get_depth_index() if sondagem_data is self.sondagem_data else IndiceProfundidade.da_sondagem(sondagem_data)
+        faixas, min_cota_camadas, max_cota_camadas = self._layer_geometry(indice)
 
-        canvas_height = self.canvas.winfo_height() if self.canvas.winfo_height() > 1 else 400
-        canvas_width = self.canvas.winfo_width() if self.canvas.winfo_width() > 1 else 300
+        canvas_width, canvas_height = self._canvas_size()
 
         # Encontra a cota mais baixa (maior profundidade) e mais alta
-        min_cota = min([layer['cota_final_camada'] for layer in camadas] + [cota_ponta])
-        max_cota = max([layer['cota_inicial'] for layer in camadas] + [cota_arrasamento, cota_terreno])
+        min_cota = min(min_cota_camadas, cota_ponta)
+        max_cota = max(max_cota_camadas, cota_arrasamento, cota_terreno)
 
         # Adiciona uma pequena margem para cima e para baixo do perfil total
         plot_cota_range = (max_cota - min_cota)
@@ -698,38 +1079,16 @@ class BoreholeCalculationFrame(ttk.Frame):
         def cota_to_y(cota):
             return margin_top + (max_cota - cota) * scale_y
 
-        def cota_to_y_relative(cota, base_cota):
-            # Converte cota para coordenada Y relativa a uma base (ex: cota_terreno)
-            return margin_top + (base_cota - cota) * scale_y
-
+        self._begin_canvas_pass()
 
         # Desenhar o nível do terreno
         y_terreno = cota_to_y(cota_terreno)
-        self.canvas.create_line(0, y_terreno, canvas_width, y_terreno, fill="green", width=2, tags="terreno_level")
-        self.canvas.create_text(10, y_terreno - 10, anchor="nw", text=f"Nível do Terreno (Cota {cota_terreno:.1f}m)", fill="green", font=("Arial", 8))
+        self._canvas_item("terreno_linha", "line", (0, y_terreno, canvas_width, y_terreno), fill="green", width=2, tags="terreno_level")
+        self._canvas_item("terreno_texto", "text", (10, y_terreno - 10), anchor="nw", text=f"Nível do Terreno (Cota {cota_terreno:.1f}m)", fill="green", font=("Arial", 8))
 
         # Desenhar as camadas de solo
-        for camada in camadas:
-            y_start = cota_to_y(camada['cota_inicial'])
-            y_end = cota_to_y(camada['cota_final_camada'])
+        self._draw_soil_layers(faixas, cota_to_y, x_offset, x_offset + plot_width, x_offset - 5, canvas_height)
 
-            if y_start >= canvas_height or y_end <= 0: # Otimização: não desenha camadas fora da visão
-                continue
-
-            # Desenhar o retângulo da camada
-            self.canvas.create_rectangle(x_offset, y_start, x_offset + plot_width, y_end,
-                                         fill="#D2B48C", outline="black", tags="solo_layer")
-            self.canvas.create_line(x_offset, y_end, x_offset + plot_width, y_end, fill="black", width=1) # Linha divisória da camada
-
-            # Adicionar texto da camada
-            mid_y = (y_start + y_end) / 2
-            self.canvas.create_text(x_offset + plot_width / 2, mid_y, text=f"{camada['tipo_solo']} (N={camada['n_spt']})",
-                                    fill="black", font=("Arial", 8), tags="solo_text")
-            
-            # Adicionar cotas ao lado esquerdo
-            self.canvas.create_text(x_offset - 5, y_start, anchor="e", text=f"{camada['cota_inicial']:.1f}m", font=("Arial", 7))
-            self.canvas.create_text(x_offset - 5, y_end, anchor="e", text=f"{camada['cota_final_camada']:.1f}m", font=("Arial", 7))
-        
         # Desenhar a estaca
         # A estaca é desenhada com base na cota de arrasamento e cota da ponta
         # Sua largura é proporcional ao diâmetro
@@ -742,30 +1101,52 @@ class BoreholeCalculationFrame(ttk.Frame):
         y_arrasamento = cota_to_y(cota_arrasamento)
         y_ponta = cota_to_y(cota_ponta)
 
-        self.canvas.create_rectangle(x1_pile, y_arrasamento, x2_pile, y_ponta, fill="grey", outline="black", tags="pile")
+        self._canvas_item("estaca", "rectangle", (x1_pile, y_arrasamento, x2_pile, y_ponta), fill="grey", outline="black", tags="pile")
 
         # Adicionar texto para cota de arrasamento e cota da ponta da estaca
-        self.canvas.create_text(x2_pile + 10, y_arrasamento, anchor="w", text=f"Arrasamento: {cota_arrasamento:.1f}m", font=("Arial", 8))
-        self.canvas.create_text(x2_pile + 10, y_ponta, anchor="w", text=f"Ponta: {cota_ponta:.1f}m", font=("Arial", 8))
-        self.canvas.create_text(x2_pile + 10, (y_arrasamento + y_ponta) / 2, anchor="w", text=f"Tipo: {tipo_estaca}", font=("Arial", 8))
-        self.canvas.create_text(x2_pile + 10, (y_arrasamento + y_ponta) / 2 + 15, anchor="w", text=f"Diâm: {diametro_m:.2f}m", font=("Arial", 8))
-        self.canvas.create_text(x2_pile + 10, (y_arrasamento + y_ponta) / 2 + 30, anchor="w", text=f"Comp: {(cota_arrasamento - cota_ponta):.2f}m", font=("Arial", 8))
+        self._canvas_item("estaca_arrasamento", "text", (x2_pile + 10, y_arrasamento), anchor="w", text=f"Arrasamento: {cota_arrasamento:.1f}m", font=("Arial", 8))
+        self._canvas_item("estaca_ponta", "text", (x2_pile + 10, y_ponta), anchor="w", text=f"Ponta: {cota_ponta:.1f}m", font=("Arial", 8))
+        self._canvas_item("estaca_tipo", "text", (x2_pile + 10, (y_arrasamento + y_ponta) / 2), anchor="w", text=f"Tipo: {tipo_estaca}", font=("Arial", 8))
+        self._canvas_item("estaca_diametro", "text", (x2_pile + 10, (y_arrasamento + y_ponta) / 2 + 15), anchor="w", text=f"Diâm: {diametro_m:.2f}m", font=("Arial", 8))
+        self._canvas_item("estaca_comprimento", "text", (x2_pile + 10, (y_arrasamento + y_ponta) / 2 + 30), anchor="w", text=f"Comp: {(cota_arrasamento - cota_ponta):.2f}m", font=("Arial", 8))
 
         # Desenhar bloco da fundação (simplificado - um pequeno retângulo no arrasamento)
         block_height_pixels = 20 # Altura visual do bloco
         block_width_pixels = pile_width_pixels * 1.5 # Largura maior que a estaca
-        self.canvas.create_rectangle(pile_center_x - (block_width_pixels / 2), y_arrasamento - block_height_pixels,
-                                     pile_center_x + (block_width_pixels / 2), y_arrasamento, fill="brown", outline="black", tags="foundation_block")
+        self._canvas_item("bloco", "rectangle", (pile_center_x - (block_width_pixels / 2), y_arrasamento - block_height_pixels,
+                                                 pile_center_x + (block_width_pixels / 2), y_arrasamento),
+                          fill="brown", outline="black", tags="foundation_block")
         
+        # Desenhar a curva de capacidade do método (Pdqm ou Qadm) x profundidade (escala horizontal: 0 ao máximo)
+        rotulo = self.metodo_info["rotulo"]
+        if perfil is not None and prof_curva is not None and prof_curva.size:
+            carga_curva = perfil[self.metodo_info["carga"]][:prof_curva.size]
+            validos = ~np.isnan(carga_curva)
+            carga_max = float(carga_curva[validos].max()) if validos.any() else 0.0
+            if carga_max > 0:
+                pontos = []
+                for prof, carga in zip(prof_curva[validos].tolist(), carga_curva[validos].tolist()):
+                    pontos.extend((x_offset + carga / carga_max * plot_width, cota_to_y(cota_terreno - prof)))
+                if len(pontos) >= 4:
+                    self._canvas_item("curva", "line", tuple(pontos), fill="blue", width=2, tags="capacity_curve")
+                else:
+                    self._canvas_item("curva", "oval", (pontos[0] - 3, pontos[1] - 3, pontos[0] + 3, pontos[1] + 3), fill="blue", tags="capacity_curve")
+                self._canvas_item("curva_maximo", "text", (x_offset + plot_width, margin_top - 5), anchor="se",
+                                  text=f"{rotulo} máx: {carga_max:.0f} kN", fill="blue", font=("Arial", 8))
+
         # Adicionar legendas para o gráfico
         legend_x = canvas_width - 10 # Canto superior direito
         legend_y = margin_top
 
-        self.canvas.create_text(legend_x, legend_y, anchor="ne", text="Legenda:", font=("Arial", 9, "bold"))
-        self.canvas.create_rectangle(legend_x - 70, legend_y + 10, legend_x - 60, legend_y + 20, fill="#D2B48C", outline="black")
-        self.canvas.create_text(legend_x - 55, legend_y + 15, anchor="w", text="Solo", font=("Arial", 8))
-        self.canvas.create_rectangle(legend_x - 70, legend_y + 25, legend_x - 60, legend_y + 35, fill="grey", outline="black")
-        self.canvas.create_text(legend_x - 55, legend_y + 30, anchor="w", text="Estaca", font=("Arial", 8))
-        self.canvas.create_rectangle(legend_x - 70, legend_y + 40, legend_x - 60, legend_y + 50, fill="brown", outline="black")
-        self.canvas.create_text(legend_x - 55, legend_y + 45, anchor="w", text="Bloco", font=("Arial", 8))
-
+        self._canvas_item("legenda", "text", (legend_x, legend_y), anchor="ne", text="Legenda:", font=("Arial", 9, "bold"))
+        self._canvas_item("legenda_solo", "rectangle", (legend_x - 70, legend_y + 10, legend_x - 60, legend_y + 20), fill="#D2B48C", outline="black")
+        self._canvas_item("legenda_solo_texto", "text", (legend_x - 55, legend_y + 15), anchor="w", text="Solo", font=("Arial", 8))
+        self._canvas_item("legenda_estaca", "rectangle", (legend_x - 70, legend_y + 25, legend_x - 60, legend_y + 35), fill="grey", outline="black")
+        self._canvas_item("legenda_estaca_texto", "text", (legend_x - 55, legend_y + 30), anchor="w", text="Estaca", font=("Arial", 8))
+        self._canvas_item("legenda_bloco", "rectangle", (legend_x - 70, legend_y + 40, legend_x - 60, legend_y + 50), fill="brown", outline="black")
+        self._canvas_item("legenda_bloco_texto", "text", (legend_x - 55, legend_y + 45), anchor="w", text="Bloco", font=("Arial", 8))
+        if perfil is not None:
+            self._canvas_item("legenda_curva", "line", (legend_x - 70, legend_y + 60, legend_x - 60, legend_y + 60), fill="blue", width=2)
+            self._canvas_item("legenda_curva_texto", "text", (legend_x - 55, legend_y + 60), anchor="w", text=rotulo, font=("Arial", 8))
+
+        self._end_canvas_pass()
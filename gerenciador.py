@@ -1,9 +1,14 @@
+import argparse
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
-import pandas as pd
-import re
-import json
-from geotechnical_tab import GeotechnicalDesignTab
+from lazy_notebook import LazyNotebook
+from tabela_virtual import TabelaVirtual
+from persistencia import DiarioSondagens
+import instrumentacao
+from instrumentacao import instrumentado, trecho
+
+# Módulos pesados (pandas, NumPy e a aba de dimensionamento) são importados apenas
+# quando usados pela primeira vez, para reduzir o tempo de abertura do aplicativo.
 
 # Constante de tipos de solo, útil para a aba de Sondagens
 SOIL_TYPES = ["Argila", "Argila Arenosa", "Argila Siltosa", "Silte Argiloso", "Silte Arenoso", "Areia Siltosa", "Areia Argilosa", "Areia"]
@@ -13,7 +18,9 @@ class App(tk.Tk):
     Aplicação para gerenciamento de dados de Pilares e Sondagens.
     Funcionalidades de cálculo e resultados foram removidas conforme solicitado.
     """
-    def __init__(self):
+    def __init__(self, caminho_banco=None, projeto=None):
+        """`caminho_banco`: opcional, banco SQLite do projeto (ver banco_projeto.py) usado no lugar do sondagens.json.
+        `projeto`: nome do projeto dentro do banco (padrão: o único projeto gravado nele)."""
         super().__init__()
         self.title("Gerenciador de Pilares e Sondagens")
         self.geometry("1000x600")
@@ -23,11 +30,21 @@ class App(tk.Tk):
         self.dados_sondagens = {}
         self.current_sondagem_name = None # Rastreia a sondagem atualmente selecionada
         self.last_pilares_excel_path = None # Armazena o caminho do último Excel de pilares importado
-        self.sondagem_treeviews = {} # Dicionário para armazenar as Treeviews das sondagens
+        self.sondagem_treeviews = {} # Dicionário para armazenar as Treeviews das sondagens (apenas abas já construídas)
+        self.diario_sondagens = DiarioSondagens("sondagens.json") # Cada edição é gravada no diário ao ser feita
+        self.banco_projeto = None
+        if caminho_banco:
+            from banco_projeto import BancoProjeto
+            # O banco oferece a mesma interface do diário; as sondagens são lidas sob demanda
+            self.banco_projeto = BancoProjeto(caminho_banco, projeto)
+            self.diario_sondagens = self.banco_projeto
 
         # --- Interface do Usuário ---
         self.setup_ui()
         self.load_sondagem_data() # Carrega os dados das sondagens ao iniciar
+        if self.banco_projeto:
+            self.dados_pilares = self.banco_projeto.carregar_pilares()
+            self.update_pilar_tree()
 
         # --- Protocolo de Fechamento ---
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -47,9 +64,26 @@ class App(tk.Tk):
         self.notebook.add(self.sondagem_frame, text="Sondagens")
         self.setup_sondagem_tab()
 
-        # Aba de Dimensionamento Geotecnico
-        self.geo_design_frame = GeotechnicalDesignTab(self.notebook, self)
-        self.notebook.add(self.geo_design_frame, text="Dimensionamento Geotécnico")
+        # Aba de Dimensionamento Geotecnico (construída na primeira vez que é selecionada)
+        self.geo_design_container = ttk.Frame(self.notebook)
+        self.notebook.add(self.geo_design_container, text="Dimensionamento Geotécnico")
+        self.geo_design_frame = None
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_main_tab_change)
+
+        # Menu de diagnóstico: apenas com a instrumentação ligada (variável GEO360_INSTRUMENTACAO)
+        if instrumentacao.ativa:
+            menubar = tk.Menu(self)
+            menu_diagnostico = tk.Menu(menubar, tearoff=0)
+            menu_diagnostico.add_command(label="Tempos de Execução...", command=self.show_diagnostics)
+            menubar.add_cascade(label="Diagnóstico", menu=menu_diagnostico)
+            self.config(menu=menubar)
+
+    def on_main_tab_change(self, event):
+        """Constrói a aba de dimensionamento geotécnico na primeira seleção."""
+        if self.geo_design_frame is None and self.notebook.select() == str(self.geo_design_container):
+            from geotechnical_tab import GeotechnicalDesignTab
+            self.geo_design_frame = GeotechnicalDesignTab(self.geo_design_container, self)
+            self.geo_design_frame.pack(expand=True, fill="both")
 
     def setup_pilar_tab(self):
         """Configura a aba 'Pilares'."""
@@ -102,6 +136,9 @@ class App(tk.Tk):
         self.sondagem_notebook = ttk.Notebook(self.sondagem_frame)
         self.sondagem_notebook.pack(expand=True, fill="both", padx=5, pady=5)
         self.sondagem_notebook.bind("<<NotebookTabChanged>>", self.on_sondagem_tab_change)
+        # Abas de sondagem construídas na primeira seleção; as Treeviews ficam em self.sondagem_treeviews
+        self.sondagem_tabs = LazyNotebook(self.sondagem_notebook, self._build_sondagem_tab, "Nenhuma sondagem cadastrada.")
+        self.sondagem_treeviews = self.sondagem_tabs.contents
         
         # Binds para salvar automaticamente ao sair do campo
         self.na_entry.bind("<FocusOut>", self.on_na_change)
@@ -119,6 +156,7 @@ class App(tk.Tk):
                 "My_max": "0.000", "Fx_max": "0.000", "Fy_max": "0.000",
                 "Mz": "0.000"
             }
+            self._salvar_pilares_banco()
             self.update_pilar_tree()
 
     def add_sondagem(self):
@@ -131,14 +169,12 @@ class App(tk.Tk):
                 return
             
             self.dados_sondagens[nome] = {'NA': 0.0, 'Cota_Terreno': 0.0, 'camadas': []}
-            self.update_sondagem_display()
+            self._registrar_alteracao(self.diario_sondagens.registrar_sondagem, nome, self.dados_sondagens[nome])
+            self.update_sondagem_display(alteradas=())
             
             # Seleciona a nova aba criada
-            for i, tab_id in enumerate(self.sondagem_notebook.tabs()):
-                if self.sondagem_notebook.tab(tab_id, "text") == nome:
-                    self.sondagem_notebook.select(i)
-                    self.current_sondagem_name = nome
-                    break
+            self.sondagem_tabs.select(nome)
+            self.current_sondagem_name = nome
         elif sondagem_num_str:
             messagebox.showerror("Erro", "Por favor, insira um número válido para a sondagem.")
 
@@ -150,7 +186,8 @@ class App(tk.Tk):
 
         if messagebox.askyesno("Confirmar Remoção", f"Tem certeza que deseja remover a sondagem {self.current_sondagem_name}?"):
             del self.dados_sondagens[self.current_sondagem_name]
-            self.update_sondagem_display()
+            self._registrar_alteracao(self.diario_sondagens.registrar_remocao, self.current_sondagem_name)
+            self.update_sondagem_display(alteradas=())
             # Limpa os campos de configuração se não houver mais sondagens
             if not self.dados_sondagens:
                 self.current_sondagem_name = None
@@ -160,9 +197,8 @@ class App(tk.Tk):
     def on_sondagem_tab_change(self, event):
         """Lida com a mudança de abas de sondagem."""
         try:
-            selected_tab_id = self.sondagem_notebook.select()
-            if selected_tab_id:
-                new_tab_name = self.sondagem_notebook.tab(selected_tab_id, "text")
+            new_tab_name = self.sondagem_tabs.selected_name()
+            if new_tab_name:
                 self.current_sondagem_name = new_tab_name
                 
                 # Carrega os dados da nova aba selecionada
@@ -181,6 +217,7 @@ class App(tk.Tk):
             try:
                 new_na = float(self.na_var_display.get().replace(',', '.'))
                 self.dados_sondagens[self.current_sondagem_name]['NA'] = new_na
+                self._registrar_alteracao(self.diario_sondagens.registrar_campo, self.current_sondagem_name, 'NA', new_na)
             except (ValueError, KeyError):
                 messagebox.showerror("Erro de Entrada", "N.A. deve ser um número válido.")
                 # Reverte para o valor anterior
@@ -192,6 +229,7 @@ class App(tk.Tk):
             try:
                 new_cota = float(self.cota_terreno_var_display.get().replace(',', '.'))
                 self.dados_sondagens[self.current_sondagem_name]['Cota_Terreno'] = new_cota
+                self._registrar_alteracao(self.diario_sondagens.registrar_campo, self.current_sondagem_name, 'Cota_Terreno', new_cota)
                 self.refresh_sondagem_treeview(self.current_sondagem_name)
             except (ValueError, KeyError):
                 messagebox.showerror("Erro de Entrada", "Cota do terreno deve ser um número válido.")
@@ -299,6 +337,7 @@ class App(tk.Tk):
                 
                 # Filtra camadas inválidas e atualiza os dados da sondagem
                 self.dados_sondagens[sondagem_name]['camadas'] = [c for c in todas_camadas if c['prof_final_camada'] > c['prof_inicial']]
+                self._registrar_alteracao(self.diario_sondagens.registrar_campo, sondagem_name, 'camadas', self.dados_sondagens[sondagem_name]['camadas'])
                 
                 self.refresh_sondagem_treeview(sondagem_name)
                 dialog.destroy()
@@ -311,57 +350,39 @@ class App(tk.Tk):
 
 
     def importar_excel_pilares(self, file_path=None, reimport=False):
-        """Importa dados dos pilares de um arquivo Excel."""
+        """Importa dados dos pilares de um arquivo Excel, CSV ou Parquet."""
         if not file_path and reimport and self.last_pilares_excel_path:
             file_path = self.last_pilares_excel_path
         elif not file_path:
-            file_path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx *.xls")])
+            file_path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx *.xls"), ("CSV files", "*.csv"), ("Parquet files", "*.parquet")])
 
         if file_path:
-            try:
-                df = pd.read_excel(file_path)
-                self.last_pilares_excel_path = file_path
-                self.dados_pilares = {}
-
-                def normalize_col(col):
-                    """Normaliza os nomes das colunas para facilitar a importação."""
-                    col = str(col).strip().lower()
-                    col = re.sub(r'[^a-z0-9_]+', '_', col)
-                    return col.strip('_')
-
-                df.columns = [normalize_col(col) for col in df.columns]
-
-                # Mapeamento flexível de colunas
-                mapping = {
-                    'Nome': ['nome', 'pilar'], 'Secao_X': ['secao_x'], 'Secao_Y': ['secao_y'],
-                    'N_max': ['n_max', 'nmax'], 'N_min': ['n_min', 'nmin'], 'Mx_max': ['mx_max'],
-                    'My_max': ['my_max'], 'Fx_max': ['fx_max'], 'Fy_max': ['fy_max'], 'Mz': ['mz']
-                }
-
-                # Encontra a coluna de nome do pilar
-                nome_col = next((c for p in mapping['Nome'] for c in df.columns if p in c), None)
-                if not nome_col:
-                    messagebox.showerror("Erro", "Coluna de nome do pilar ('Nome', 'Pilar') não encontrada.")
+            # A medição começa depois da janela de escolha do arquivo
+            with trecho("App.importar_excel_pilares"):
+                try:
+                    from importacao_pilares import ler_pilares # Importa o pandas apenas na primeira importação
+                    dados_pilares = ler_pilares(file_path)
+                except ValueError as e:
+                    # Coluna de nome do pilar não encontrada
+                    messagebox.showerror("Erro", str(e))
                     return
-                
-                for _, row in df.iterrows():
-                    nome = str(row[nome_col])
-                    if not nome or pd.isna(row[nome_col]): continue
-                    
-                    self.dados_pilares[nome] = {'Nome': nome}
-                    for key, possible_names in mapping.items():
-                        if key == 'Nome': continue
-                        col_found = next((c for p in possible_names for c in df.columns if p in c), None)
-                        if col_found and pd.notna(row[col_found]):
-                            self.dados_pilares[nome][key] = str(row[col_found]).replace(',', '.')
-                        else:
-                            # Valores padrão para colunas não encontradas
-                            self.dados_pilares[nome][key] = "0"
-                
+                except Exception as e:
+                    messagebox.showerror("Erro", f"Erro ao importar arquivo: {e}")
+                    return
+
+                self.last_pilares_excel_path = file_path
+                self.dados_pilares = dados_pilares
+                self._salvar_pilares_banco()
                 self.update_pilar_tree()
-                messagebox.showinfo("Sucesso", "Dados dos pilares importados com sucesso!")
+            messagebox.showinfo("Sucesso", "Dados dos pilares importados com sucesso!")
+
+    def _salvar_pilares_banco(self):
+        """Grava os pilares no banco do projeto, se houver (com o sondagens.json eles não são persistidos)."""
+        if self.banco_projeto:
+            try:
+                self.banco_projeto.salvar_pilares(self.dados_pilares)
             except Exception as e:
-                messagebox.showerror("Erro", f"Erro ao importar arquivo: {e}")
+                messagebox.showerror("Erro ao Salvar", f"Erro ao gravar pilares no banco: {e}")
 
     def update_pilar_tree(self):
         """Atualiza a tabela de pilares com os dados carregados."""
@@ -379,69 +400,57 @@ class App(tk.Tk):
             except (ValueError, KeyError) as e:
                 print(f"Aviso: Pulando pilar '{pilar.get('Nome', 'N/A')}' devido a dados inválidos. Erro: {e}")
 
-    def update_sondagem_display(self):
-        """Atualiza a Treeview de sondagens e o notebook de abas."""
-        # Limpa as abas existentes
-        for tab in self.sondagem_notebook.tabs():
-            self.sondagem_notebook.forget(tab)
-        self.sondagem_treeviews.clear() # Limpa as referências dos Treeviews antigos
+    @instrumentado()
+    def update_sondagem_display(self, alteradas=None):
+        """
+        Atualiza o notebook de abas de sondagens de forma incremental: apenas as abas de
+        sondagens adicionadas ou removidas são criadas/destruídas, e o conteúdo de cada aba
+        só é construído quando ela é selecionada.
+        `alteradas` indica as sondagens cujos dados mudaram (None = todas, ex: ao carregar o arquivo).
+        """
+        self.sondagem_tabs.sync(sorted(self.dados_sondagens.keys()))
+
+        # Atualiza apenas as tabelas já construídas das sondagens alteradas
+        nomes_alterados = list(self.sondagem_treeviews) if alteradas is None else alteradas
+        for nome_sondagem in nomes_alterados:
+            self.refresh_sondagem_treeview(nome_sondagem)
 
         if not self.dados_sondagens:
-            empty_frame = ttk.Frame(self.sondagem_notebook)
-            self.sondagem_notebook.add(empty_frame, text="Nenhuma Sondagem")
-            ttk.Label(empty_frame, text="Nenhuma sondagem cadastrada.", wraplength=300).pack(pady=20)
             self.current_sondagem_name = None
             self.na_var_display.set("0.0")
             self.cota_terreno_var_display.set("0.0")
         else:
-            for nome_sondagem in sorted(self.dados_sondagens.keys()):
-                sondagem_detail_frame = ttk.Frame(self.sondagem_notebook)
-                self.sondagem_notebook.add(sondagem_detail_frame, text=nome_sondagem)
-
-                # Cria o Treeview para esta sondagem e o armazena
-                cols = ("Cota", "Prof.", "Tipo de Solo", "N")
-                tree = ttk.Treeview(sondagem_detail_frame, columns=cols, show="headings")
-                for col in cols:
-                    tree.heading(col, text=col)
-                    tree.column(col, width=150, anchor="center")
-                tree.pack(expand=True, fill="both")
-                self.sondagem_treeviews[nome_sondagem] = tree # Armazena a referência
-
-                # Adiciona o botão Salvar Alterações na Sondagem
-                ttk.Button(sondagem_detail_frame, text="Salvar Alterações na Sondagem", command=lambda n=nome_sondagem: self.save_sondagem_changes(n)).pack(pady=5)
-
-                self.make_treeview_editable(tree, nome_sondagem)
-                self.refresh_sondagem_treeview(nome_sondagem)
-
-            # Seleciona a primeira aba ou mantém a selecionada se existir
-            if self.dados_sondagens:
-                if self.current_sondagem_name and self.current_sondagem_name in self.dados_sondagens:
-                    # Tenta re-selecionar a aba que estava ativa
-                    for i, tab_id in enumerate(self.sondagem_notebook.tabs()):
-                        if self.sondagem_notebook.tab(tab_id, "text") == self.current_sondagem_name:
-                            self.sondagem_notebook.select(i)
-                            break
-                else:
-                    # Seleciona a primeira aba se a atual não existir mais ou for nula
-                    first_tab_id = self.sondagem_notebook.tabs()[0] if self.sondagem_notebook.tabs() else None
-                    if first_tab_id:
-                        self.sondagem_notebook.select(first_tab_id)
-                        self.current_sondagem_name = self.sondagem_notebook.tab(first_tab_id, "text")
-                    else:
-                        self.current_sondagem_name = None
+            # Mantém a aba selecionada se ainda existir; senão seleciona a primeira
+            if not (self.current_sondagem_name and self.current_sondagem_name in self.dados_sondagens):
+                self.current_sondagem_name = sorted(self.dados_sondagens.keys())[0]
+            self.sondagem_tabs.select(self.current_sondagem_name)
 
             # Garante que os campos de N.A. e Cota do Terreno reflitam a sondagem selecionada
-            if self.current_sondagem_name:
-                sondagem_data = self.dados_sondagens[self.current_sondagem_name]
-                self.na_var_display.set(str(sondagem_data.get('NA', 0.0)))
-                self.cota_terreno_var_display.set(str(sondagem_data.get('Cota_Terreno', 0.0)))
-            else:
-                self.na_var_display.set("0.0")
-                self.cota_terreno_var_display.set("0.0")
+            sondagem_data = self.dados_sondagens[self.current_sondagem_name]
+            self.na_var_display.set(str(sondagem_data.get('NA', 0.0)))
+            self.cota_terreno_var_display.set(str(sondagem_data.get('Cota_Terreno', 0.0)))
         
-        # *** Chamar o método para popular as abas de dimensionamento geotécnico ***
+        # *** Chamar o método para atualizar as abas de dimensionamento geotécnico ***
         if hasattr(self, 'geo_design_frame') and self.geo_design_frame:
-            self.geo_design_frame._populate_de_court_tabs()
+            self.geo_design_frame._populate_calculation_tabs(alteradas)
+
+    def _build_sondagem_tab(self, sondagem_detail_frame, nome_sondagem):
+        """Constrói o conteúdo da aba de uma sondagem (chamado na primeira seleção da aba)."""
+        # Cria a tabela para esta sondagem (apenas as linhas visíveis viram itens do Treeview)
+        cols = ("Cota", "Prof.", "Tipo de Solo", "N")
+        tabela = TabelaVirtual(sondagem_detail_frame, columns=cols)
+        for col in cols:
+            tabela.tree.heading(col, text=col)
+            tabela.tree.column(col, width=150, anchor="center")
+        tabela.pack(expand=True, fill="both")
+
+        # Adiciona o botão Salvar Alterações na Sondagem
+        ttk.Button(sondagem_detail_frame, text="Salvar Alterações na Sondagem", command=lambda n=nome_sondagem: self.save_sondagem_changes(n)).pack(pady=5)
+
+        self.make_treeview_editable(tabela, nome_sondagem)
+        self.sondagem_treeviews[nome_sondagem] = tabela # Armazena a referência antes de preencher
+        self.refresh_sondagem_treeview(nome_sondagem)
+        return tabela
 
     def save_sondagem_changes(self, sondagem_name):
         """Salva as alterações feitas diretamente na tabela de uma sondagem."""
@@ -449,13 +458,12 @@ class App(tk.Tk):
             messagebox.showerror("Erro", "Treeview da sondagem não encontrada.")
             return
         
-        tree = self.sondagem_treeviews[sondagem_name]
+        tabela = self.sondagem_treeviews[sondagem_name]
         try:
             camadas_novas = []
             cota_terreno = self.dados_sondagens[sondagem_name]['Cota_Terreno']
             
-            for child in tree.get_children():
-                valores = tree.item(child, 'values')
+            for valores in tabela.linhas:
                 # Valores na Treeview: Cota, Prof., Tipo de Solo, N
                 # Precisamos de Prof_Inicial, Prof_Final_Camada, Tipo_Solo, N_SPT
                 prof_final_camada = float(valores[1]) # Profundidade final é o segundo valor
@@ -474,52 +482,63 @@ class App(tk.Tk):
                 })
             
             self.dados_sondagens[sondagem_name]['camadas'] = camadas_novas # Ajusta para 'camadas' em minúsculas
+            self._registrar_alteracao(self.diario_sondagens.registrar_campo, sondagem_name, 'camadas', camadas_novas)
             self.refresh_sondagem_treeview(sondagem_name) # Re-ordena e re-exibe
             messagebox.showinfo("Sucesso", f"Alterações em {sondagem_name} salvas.")
         except (ValueError, IndexError) as e:
             messagebox.showerror("Erro", f"Dados inválidos na tabela. Verifique os valores. Erro: {e}")
 
+    @instrumentado()
     def refresh_sondagem_treeview(self, sondagem_name):
         """Atualiza a tabela de uma sondagem específica."""
         if sondagem_name not in self.sondagem_treeviews:
-            # Isso pode acontecer se a aba foi limpa mas o refresh foi chamado antes da recriação
+            # A aba ainda não foi construída; a tabela será preenchida na primeira seleção
             return
         
-        tree = self.sondagem_treeviews[sondagem_name]
-                
-        tree.delete(*tree.get_children())
+        tabela = self.sondagem_treeviews[sondagem_name]
         sondagem_data = self.dados_sondagens[sondagem_name]
         cota_terreno = sondagem_data.get('Cota_Terreno', 0.0)
         
         # Ordena camadas pela profundidade inicial (agora é 'prof_inicial')
         camadas_sorted = sorted(sondagem_data.get('camadas', []), key=lambda x: x['prof_inicial'])
         
+        linhas = []
         for camada in camadas_sorted:
             prof_inicial = float(camada['prof_inicial'])
             prof_final_camada = float(camada['prof_final_camada'])
             cota_inicial = cota_terreno - prof_inicial
             cota_final_camada = cota_terreno - prof_final_camada
 
-            tree.insert("", "end", values=[
+            linhas.append((
                 f"{cota_inicial:.2f}", f"{prof_final_camada:.2f}",
                 camada["tipo_solo"], camada["n_spt"]
-            ])
+            ))
+        # Atualiza apenas as linhas visíveis que mudaram
+        tabela.definir_linhas(linhas)
+
+    def make_treeview_editable(self, tabela, sondagem_name):
+        """Permite a edição das células da tabela de sondagem.
+
+        As edições são gravadas nas linhas da tabela (o modelo), e não nos itens
+        do Treeview, que só existem para as linhas visíveis.
+        """
+        tree = tabela.tree
 
-    def make_treeview_editable(self, tree, sondagem_name):
-        """Permite a edição das células da tabela de sondagem."""
         def on_double_click(event):
             region = tree.identify("region", event.x, event.y)
             if region != "cell": return
             
             column_id = tree.identify_column(event.x)
             item_id = tree.identify_row(event.y)
+            linha = tabela.linha_do_item(item_id)
+            if linha is None: return
             col_index = int(column_id.replace('#', '')) - 1
             col_name = tree.heading(column_id)['text']
 
             if col_name == "Cota": return # Cota não é editável
 
             x, y, width, height = tree.bbox(item_id, column_id)
-            current_value = tree.item(item_id, 'values')[col_index]
+            current_value = tabela.linhas[linha][col_index]
 
             editor = None
             if col_name == "Tipo de Solo":
@@ -544,7 +563,7 @@ class App(tk.Tk):
                     messagebox.showerror("Erro", f"Valor inválido para a coluna '{col_name}'.")
                     return
                 
-                current_values = list(tree.item(item_id, 'values'))
+                current_values = list(tabela.linhas[linha])
                 current_values[col_index] = new_value
 
                 # Recalcula cota se a profundidade mudar
@@ -557,18 +576,17 @@ class App(tk.Tk):
                     current_values[0] = f"{new_cota_final:.2f}" # Atualiza a cota da profundidade final
 
                     # Também preciso atualizar a profundidade inicial da PRÓXIMA camada, se houver
-                    next_item = tree.next(item_id)
-                    if next_item:
-                        next_values = list(tree.item(next_item, 'values'))
+                    if linha + 1 < len(tabela):
+                        next_values = list(tabela.linhas[linha + 1])
                         next_values[1] = f"{new_prof_final:.2f}" # Atualiza a profundidade inicial da próxima camada
-                        tree.item(next_item, values=next_values)
+                        tabela.atualizar_linha(linha + 1, next_values)
 
-                tree.item(item_id, values=current_values)
+                tabela.atualizar_linha(linha, current_values)
 
                 # Navegação com Enter na coluna 'N'
                 if col_name == "N" and event.keysym == "Return":
-                    next_item = tree.next(item_id)
-                    if next_item:
+                    if linha + 1 < len(tabela):
+                        next_item = tabela.mostrar_linha(linha + 1) # Rola a tabela se a linha não estiver visível
                         tree.selection_set(next_item)
                         tree.focus(next_item)
                         # Abre editor na mesma coluna da próxima linha
@@ -587,11 +605,14 @@ class App(tk.Tk):
 
         tree.bind("<Double-1>", on_double_click)
 
+    @instrumentado()
     def load_sondagem_data(self):
-        """Carrega os dados de sondagem de um arquivo JSON."""
+        """Carrega os dados de sondagem do arquivo JSON e reaplica o diário de alterações."""
         try:
-            with open("sondagens.json", "r", encoding="utf-8") as f:
-                self.dados_sondagens = json.load(f)
+            self.dados_sondagens = self.diario_sondagens.carregar()
+            if self.diario_sondagens.registros or self.diario_sondagens.registros_invalidos:
+                # Incorpora as alterações da sessão anterior ao snapshot
+                self.diario_sondagens.compactar(self.dados_sondagens)
             self.update_sondagem_display() # Atualiza a UI com os dados carregados
             messagebox.showinfo("Dados Carregados", "Dados de sondagem carregados com sucesso!")
         except FileNotFoundError:
@@ -599,21 +620,86 @@ class App(tk.Tk):
         except Exception as e:
             messagebox.showerror("Erro de Carregamento", f"Erro ao carregar dados de sondagem: {e}")
 
+    def _registrar_alteracao(self, registrar, *args):
+        """
+        Grava uma alteração no diário de sondagens, compactando-o quando fica grande,
+        e descarta os resultados de cálculo em cache da sondagem (args[0] é o nome).
+        """
+        if self.geo_design_frame:
+            self.geo_design_frame.invalidar_sondagem(args[0])
+        try:
+            registrar(*args)
+            if self.diario_sondagens.precisa_compactar():
+                self.diario_sondagens.compactar(self.dados_sondagens)
+        except OSError as e:
+            messagebox.showerror("Erro ao Salvar", f"Erro ao gravar alteração da sondagem: {e}")
+
     def save_sondagem_data(self):
-        """Salva os dados de sondagem em um arquivo JSON."""
+        """Salva os dados de sondagem completos no arquivo JSON (compacta o diário)."""
         try:
-            with open("sondagens.json", "w", encoding="utf-8") as f:
-                json.dump(self.dados_sondagens, f, indent=4)
-            # messagebox.showinfo("Dados Salvos", "Dados de sondagem salvos com sucesso!") # Pode ser muito intrusivo
+            self.diario_sondagens.compactar(self.dados_sondagens)
         except Exception as e:
             messagebox.showerror("Erro ao Salvar", f"Erro ao salvar dados de sondagem: {e}")
 
+    def show_diagnostics(self):
+        """Janela com os tempos medidos pela instrumentação (ver instrumentacao.py)."""
+        dialog = tk.Toplevel(self)
+        dialog.title("Diagnóstico - Tempos de Execução")
+        dialog.geometry("900x400")
+
+        cols = ("Trecho", "Chamadas", "Total (ms)", "Média (ms)", "Mín. (ms)", "Máx. (ms)", "Histograma")
+        tree = ttk.Treeview(dialog, columns=cols, show="headings")
+        for col in cols:
+            tree.heading(col, text=col)
+            tree.column(col, width=90, anchor="center")
+        tree.column("Trecho", width=260, anchor="w")
+        tree.column("Histograma", width=260, anchor="w")
+        tree.pack(expand=True, fill="both", padx=5, pady=5)
+
+        def atualizar():
+            tree.delete(*tree.get_children())
+            rotulos = instrumentacao.faixas_histograma()
+            # Trechos com maior tempo total primeiro
+            for nome, e in sorted(instrumentacao.estatisticas().items(), key=lambda item: -item[1]["total_ms"]):
+                histograma = " ".join(f"{rotulo}:{n}" for rotulo, n in zip(rotulos, e["histograma"]) if n)
+                tree.insert("", "end", values=(nome, e["chamadas"], f"{e['total_ms']:.1f}", f"{e['media_ms']:.2f}",
+                                               f"{e['minimo_ms']:.2f}", f"{e['maximo_ms']:.1f}", histograma))
+
+        def zerar():
+            instrumentacao.limpar()
+            atualizar()
+
+        def salvar():
+            caminho = filedialog.asksaveasfilename(parent=dialog, defaultextension=".json",
+                                                   filetypes=[("JSON files", "*.json")])
+            if caminho:
+                try:
+                    instrumentacao.gravar(caminho)
+                except OSError as e:
+                    messagebox.showerror("Erro ao Salvar", f"Erro ao gravar as estatísticas: {e}", parent=dialog)
+
+        btn_frame = ttk.Frame(dialog)
+        btn_frame.pack(pady=5)
+        ttk.Button(btn_frame, text="Atualizar", command=atualizar).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Zerar", command=zerar).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Salvar...", command=salvar).pack(side="left", padx=5)
+        atualizar()
+
     def on_closing(self):
-        """Chamado quando a janela é fechada. Salva os dados e fecha o app."""
-        if messagebox.askyesno("Sair", "Deseja salvar os dados de sondagem antes de sair?"):
-            self.save_sondagem_data()
+        """
+        Chamado quando a janela é fechada. As edições já foram gravadas no diário;
+        aqui o diário é apenas compactado no sondagens.json.
+        """
+        self.save_sondagem_data()
+        if self.banco_projeto:
+            self.banco_projeto.fechar()
         self.destroy()
 
 if __name__ == "__main__":
-    app = App()
+    # Opcional: python gerenciador.py projeto.db [--projeto NOME] (usa o banco SQLite no lugar do sondagens.json)
+    parser = argparse.ArgumentParser(prog="python gerenciador.py", description="Gerenciador de pilares e sondagens.")
+    parser.add_argument("banco", nargs="?", default=None, help="banco SQLite do projeto (padrão: sondagens.json)")
+    parser.add_argument("--projeto", default=None, help="nome do projeto dentro do banco (padrão: o único projeto gravado nele)")
+    args = parser.parse_args()
+    app = App(args.banco, args.projeto)
     app.mainloop()
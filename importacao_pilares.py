@@ -0,0 +1,122 @@
+"""Leitura de planilhas de pilares exportadas pelo software estrutural.
+
+Converte a planilha para o formato de ``App.dados_pilares``: um dicionario
+nome -> {"Nome", "Secao_X", "Secao_Y", "N_max", ...} com os valores em texto.
+As colunas sao resolvidas uma unica vez e as linhas convertidas de forma
+vetorizada, o que permite importar dezenas de milhares de pilares rapidamente.
+O leitor de cada formato (CSV, Excel, Parquet) e escolhido pela extensao do
+arquivo; novos formatos podem ser adicionados com ``registrar_leitor``.
+Nao depende do tkinter, para poder ser usado pela linha de comando.
+"""
+
+import csv
+import os
+import re
+from typing import Callable, Dict
+
+import pandas as pd
+
+from instrumentacao import instrumentado
+
+# Mapeamento flexível de colunas: chave -> trechos aceitos no nome normalizado da coluna
+MAPEAMENTO_COLUNAS = {
+    'Nome': ['nome', 'pilar'], 'Secao_X': ['secao_x'], 'Secao_Y': ['secao_y'],
+    'N_max': ['n_max', 'nmax'], 'N_min': ['n_min', 'nmin'], 'Mx_max': ['mx_max'],
+    'My_max': ['my_max'], 'Fx_max': ['fx_max'], 'Fy_max': ['fy_max'], 'Mz': ['mz']
+}
+
+
+def normalizar_coluna(col) -> str:
+    """Normaliza os nomes das colunas para facilitar a importação."""
+    col = str(col).strip().lower()
+    col = re.sub(r'[^a-z0-9_]+', '_', col)
+    return col.strip('_')
+
+
+def _ler_csv(caminho: str) -> pd.DataFrame:
+    """Lê um CSV detectando o separador (',', ';', tabulação ou '|')."""
+    with open(caminho, newline="", encoding="utf-8-sig") as f:
+        amostra = f.read(64 * 1024)
+    try:
+        separador = csv.Sniffer().sniff(amostra, delimiters=",;\t|").delimiter
+    except csv.Error:
+        # Separador não identificado: deixa o pandas detectar (motor Python, mais lento)
+        return pd.read_csv(caminho, sep=None, engine="python", encoding="utf-8-sig")
+    return pd.read_csv(caminho, sep=separador, encoding="utf-8-sig")
+
+
+# Leitores por extensão do arquivo; extensões não registradas são lidas como Excel
+LEITORES: Dict[str, Callable[[str], pd.DataFrame]] = {
+    ".csv": _ler_csv,
+    ".txt": _ler_csv,
+    ".xlsx": pd.read_excel,
+    ".xls": pd.read_excel,
+    ".parquet": pd.read_parquet,
+}
+
+
+def registrar_leitor(extensao: str, leitor: Callable[[str], pd.DataFrame]):
+    """Registra (ou substitui) o leitor de planilhas para uma extensão, ex: ``".feather"``."""
+    LEITORES[extensao.lower()] = leitor
+
+
+def ler_tabela(caminho: str) -> pd.DataFrame:
+    """Lê a planilha de pilares com o leitor registrado para a extensão do arquivo."""
+    leitor = LEITORES.get(os.path.splitext(caminho)[1].lower(), pd.read_excel)
+    return leitor(caminho)
+
+
+def resolver_colunas(colunas) -> Dict[str, str | None]:
+    """Associa cada chave de ``MAPEAMENTO_COLUNAS`` à primeira coluna normalizada correspondente."""
+    return {
+        chave: next((c for p in trechos for c in colunas if p in c), None)
+        for chave, trechos in MAPEAMENTO_COLUNAS.items()
+    }
+
+
+def converter_pilares(df: pd.DataFrame) -> Dict[str, Dict]:
+    """Converte o DataFrame da planilha para o formato de ``App.dados_pilares``.
+
+    Valores vazios ou colunas não encontradas valem "0"; vírgulas decimais
+    são trocadas por pontos. Se houver nomes repetidos, vale a última linha.
+
+    Raises
+    ------
+    ValueError : se a coluna com o nome do pilar não for encontrada.
+    """
+    colunas_normalizadas = [normalizar_coluna(col) for col in df.columns]
+    colunas = resolver_colunas(colunas_normalizadas)
+    if not colunas['Nome']:
+        raise ValueError("Coluna de nome do pilar ('Nome', 'Pilar') não encontrada.")
+    # Posição de cada coluna na planilha original (evita copiar o DataFrame para renomear)
+    posicao = {c: i for i, c in reversed(list(enumerate(colunas_normalizadas)))}
+
+    nomes = df.iloc[:, posicao[colunas['Nome']]]
+    nomes_texto = nomes.astype(str)
+    validos = (nomes.notna() & (nomes_texto != "")).to_numpy()
+    nomes_texto = nomes_texto[validos].tolist()
+
+    valores = []
+    for chave, coluna in colunas.items():
+        if chave == 'Nome':
+            continue
+        if coluna is None:
+            # Valores padrão para colunas não encontradas
+            valores.append(["0"] * len(nomes_texto))
+            continue
+        serie = df.iloc[validos, posicao[coluna]]
+        texto = serie.astype(str).str.replace(',', '.', regex=False)
+        valores.append(texto.where(serie.notna(), "0").tolist())
+
+    chaves = [chave for chave in MAPEAMENTO_COLUNAS if chave != 'Nome']
+    return {
+        nome: {'Nome': nome, **dict(zip(chaves, linha))}
+        for nome, linha in zip(nomes_texto, zip(*valores))
+    }
+
+
+
+@instrumentado()
+def ler_pilares(caminho: str) -> Dict[str, Dict]:
+    """Lê a planilha de pilares e retorna o dicionario de pilares."""
+    return converter_pilares(ler_tabela(caminho))
@@ -0,0 +1,182 @@
+"""Medicao de tempo dos trechos criticos do aplicativo (instrumentacao).
+
+Quando o aplicativo fica lento num projeto grande, os trechos instrumentados
+(leitura da planilha de pilares, carregamento das sondagens, reconstrucao das
+abas, curva de capacidade, desenho do canvas...) mostram onde o tempo e
+gasto. Cada trecho acumula o numero de chamadas, o tempo total, minimo e
+maximo e um histograma das duracoes.
+
+A instrumentacao e ligada pela variavel de ambiente ``GEO360_INSTRUMENTACAO``:
+
+    GEO360_INSTRUMENTACAO=1 python gerenciador.py
+        mede os trechos; o menu "Diagnóstico" da janela mostra as estatisticas;
+    GEO360_INSTRUMENTACAO=tempos.json python gerenciador.py
+        idem, e grava as estatisticas em tempos.json ao sair.
+
+Desligada (padrao), ``instrumentado`` devolve a propria funcao, sem nenhum
+custo adicional, e ``trecho`` nao mede nada.
+
+Exemplo::
+
+    @instrumentado()
+    def carregar(): ...
+
+    with trecho("importar_excel_pilares"):
+        ...
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+VARIAVEL_AMBIENTE = "GEO360_INSTRUMENTACAO"
+
+# Limites superiores (ms) das faixas do histograma; a ultima faixa e "acima de 3 s"
+LIMITES_HISTOGRAMA_MS = (0.1, 0.3, 1.0, 3.0, 10.0, 30.0, 100.0, 300.0, 1000.0, 3000.0)
+
+
+def _configuracao_ambiente():
+    """(ativa, arquivo de saida) a partir de ``GEO360_INSTRUMENTACAO``."""
+    valor = os.environ.get(VARIAVEL_AMBIENTE, "").strip()
+    if valor.lower() in ("", "0", "false", "nao", "não"):
+        return False, None
+    if valor.lower() in ("1", "true", "sim"):
+        return True, None
+    return True, valor
+
+
+ativa, arquivo_saida = _configuracao_ambiente()
+
+
+class EstatisticaTrecho:
+    """Contadores e histograma das duracoes de um trecho."""
+
+    def __init__(self):
+        self.chamadas = 0
+        self.total = 0.0 # s
+        self.minimo = float("inf")
+        self.maximo = 0.0
+        self.histograma = [0] * (len(LIMITES_HISTOGRAMA_MS) + 1)
+
+    def registrar(self, duracao: float):
+        self.chamadas += 1
+        self.total += duracao
+        self.minimo = min(self.minimo, duracao)
+        self.maximo = max(self.maximo, duracao)
+        duracao_ms = duracao * 1000.0
+        faixa = 0
+        while faixa < len(LIMITES_HISTOGRAMA_MS) and duracao_ms > LIMITES_HISTOGRAMA_MS[faixa]:
+            faixa += 1
+        self.histograma[faixa] += 1
+
+    def como_dict(self) -> Dict:
+        return {
+            "chamadas": self.chamadas,
+            "total_ms": self.total * 1000.0,
+            "media_ms": self.total * 1000.0 / self.chamadas if self.chamadas else 0.0,
+            "minimo_ms": self.minimo * 1000.0 if self.chamadas else 0.0,
+            "maximo_ms": self.maximo * 1000.0,
+            "histograma": self.histograma.copy(),
+        }
+
+
+_trechos: Dict[str, EstatisticaTrecho] = {}
+_trava = threading.Lock() # Trechos tambem sao medidos nas threads de calculo
+
+
+def registrar(nome: str, duracao: float):
+    """Acumula uma duracao (s) nas estatisticas do trecho."""
+    with _trava:
+        estatistica = _trechos.get(nome)
+        if estatistica is None:
+            estatistica = _trechos[nome] = EstatisticaTrecho()
+        estatistica.registrar(duracao)
+
+
+@contextmanager
+def trecho(nome: str):
+    """Mede o bloco ``with`` como uma chamada do trecho ``nome`` (se a instrumentacao estiver ligada)."""
+    if not ativa:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(nome, time.perf_counter() - inicio)
+
+
+def instrumentado(nome: str | None = None) -> Callable:
+    """Decorador que mede cada chamada da funcao (nome padrao: ``__qualname__``).
+
+    Com a instrumentacao desligada a funcao e devolvida sem alteracao.
+    """
+    def decorar(funcao):
+        if not ativa:
+            return funcao
+        nome_trecho = nome or funcao.__qualname__
+
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                registrar(nome_trecho, time.perf_counter() - inicio)
+        return medida
+    return decorar
+
+
+def estatisticas() -> Dict[str, Dict]:
+    """Copia das estatisticas de todos os trechos, por nome."""
+    with _trava:
+        return {nome: estatistica.como_dict() for nome, estatistica in sorted(_trechos.items())}
+
+
+def faixas_histograma() -> List[str]:
+    """Rotulos das faixas do histograma (ex: "≤1ms", ">3000ms")."""
+    return [f"≤{limite:g}ms" for limite in LIMITES_HISTOGRAMA_MS] + [f">{LIMITES_HISTOGRAMA_MS[-1]:g}ms"]
+
+
+def relatorio_texto() -> str:
+    """Tabela de texto com as estatisticas, do trecho com maior tempo total para o menor."""
+    dados = estatisticas()
+    if not dados:
+        return "Nenhum trecho medido."
+    rotulos = faixas_histograma()
+    linhas = [f"{'Trecho':<56} {'Chamadas':>8} {'Total (ms)':>11} {'Média (ms)':>11} {'Máx. (ms)':>10}  Histograma"]
+    for nome, e in sorted(dados.items(), key=lambda item: -item[1]["total_ms"]):
+        histograma = " ".join(f"{rotulo}:{n}" for rotulo, n in zip(rotulos, e["histograma"]) if n)
+        linhas.append(f"{nome:<56} {e['chamadas']:>8} {e['total_ms']:>11.1f} {e['media_ms']:>11.2f} "
+                      f"{e['maximo_ms']:>10.1f}  {histograma}")
+    return "\n".join(linhas)
+
+
+def gravar(caminho: str):
+    """Grava as estatisticas em JSON."""
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump({"faixas_histograma_ms": list(LIMITES_HISTOGRAMA_MS), "trechos": estatisticas()},
+                  f, indent=2, ensure_ascii=False)
+
+
+def limpar():
+    """Zera as estatisticas de todos os trechos."""
+    with _trava:
+        _trechos.clear()
+
+
+def _gravar_ao_sair():
+    if _trechos:
+        try:
+            gravar(arquivo_saida)
+        except OSError:
+            pass # Nao impede o fechamento do aplicativo
+
+
+if ativa and arquivo_saida:
+    atexit.register(_gravar_ao_sair)
@@ -0,0 +1,85 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class LazyNotebook:
+    """
+    Mantém as abas de um ttk.Notebook sincronizadas com uma lista de nomes (ex: sondagens).
+    Cada aba começa como um frame vazio; o conteúdo é construído por `build_tab(frame, nome)`
+    apenas na primeira vez que a aba é selecionada. Em `sync`, somente as abas de nomes
+    adicionados ou removidos são tocadas.
+    """
+    def __init__(self, notebook, build_tab, empty_text, wraplength=300):
+        self.notebook = notebook
+        self.build_tab = build_tab
+        self.empty_text = empty_text
+        self.wraplength = wraplength
+        self.containers = {} # nome -> frame da aba
+        self.contents = {} # nome -> valor retornado por build_tab (apenas abas já construídas)
+        self._empty_frame = None
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed, add="+")
+
+    def sync(self, names):
+        """Adiciona e remove abas para que correspondam a `names`, na ordem dada."""
+        names = list(names)
+        wanted = set(names)
+        for name in [n for n in self.containers if n not in wanted]:
+            self.remove(name)
+
+        if not names:
+            self._show_empty()
+            return
+        if self._empty_frame is not None:
+            self._empty_frame.destroy()
+            self._empty_frame = None
+
+        for index, name in enumerate(names):
+            frame = self.containers.get(name)
+            if frame is None:
+                frame = ttk.Frame(self.notebook)
+                self.containers[name] = frame
+                self.notebook.add(frame, text=name)
+            # Move a aba para a posição correta (sem efeito se já estiver nela)
+            self.notebook.insert(index, frame)
+
+    def remove(self, name):
+        """Remove a aba de `name` e o seu conteúdo."""
+        frame = self.containers.pop(name, None)
+        self.contents.pop(name, None)
+        if frame is not None:
+            self.notebook.forget(frame)
+            frame.destroy()
+
+    def _show_empty(self):
+        if self._empty_frame is None:
+            self._empty_frame = ttk.Frame(self.notebook)
+            self.notebook.add(self._empty_frame, text="Nenhuma Sondagem")
+            ttk.Label(self._empty_frame, text=self.empty_text, wraplength=self.wraplength).pack(pady=20)
+
+    def selected_name(self):
+        """Nome da aba selecionada, ou None (nenhuma aba ou aba vazia)."""
+        selected = self.notebook.select()
+        for name, frame in self.containers.items():
+            if str(frame) == selected:
+                return name
+        return None
+
+    def select(self, name):
+        """Seleciona a aba de `name` e constrói o seu conteúdo, se necessário."""
+        if name in self.containers:
+            self.notebook.select(self.containers[name])
+            self.materialize(name)
+
+    def materialize(self, name):
+        """Constrói o conteúdo da aba de `name`, se ainda não foi construído."""
+        if name in self.containers and name not in self.contents:
+            self.contents[name] = self.build_tab(self.containers[name], name)
+        return self.contents.get(name)
+
+    def _on_tab_changed(self, event):
+        try:
+            name = self.selected_name()
+        except tk.TclError:
+            return # Notebook destruído
+        if name is not None:
+            self.materialize(name)
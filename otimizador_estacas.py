@@ -0,0 +1,154 @@
+"""Otimizador de estacas por sondagem (Décourt-Quaresma).
+
+Em vez de recalcular a carga admissivel para cada combinacao digitada na
+interface, a grade comprimento x diametro x tipo de estaca e avaliada numa
+unica passada por sondagem com ``calculo_estacas.perfil_capacidade_decourt``,
+cujas somas acumuladas (prefix sums) dos segmentos de 1 m fazem com que cada
+metro a mais de estaca custe O(1). Para cada pilar e escolhida a solucao de
+menor custo cuja carga admissivel atende ao ``N_max``.
+
+A formulacao e a mesma da aba "Décourt-Quaresma (1996)" da interface.
+"""
+
+import math
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from calculo_estacas import perfil_capacidade_decourt
+from coeficientes import TabelaCoeficientesDecourt
+from instrumentacao import instrumentado
+from perfil_sondagem import IndiceProfundidade
+
+
+@instrumentado()
+def varrer_grade(
+    indice: IndiceProfundidade,
+    coeficientes: TabelaCoeficientesDecourt,
+    diametros_por_tipo: Dict[str, Sequence[float]],
+    comprimentos: Sequence[float],
+    cota_arrasamento: float = 0.0,
+    custo_por_m3: Dict[str, float] | None = None,
+    progresso: Callable[[int, int], None] | None = None,
+    discretizacao: float | str | None = None,
+    nspt_ponta_media: bool = False,
+) -> Dict[str, np.ndarray]:
+    """Calcula Pdqm para toda a grade comprimento x diametro x tipo de estaca.
+
+    Parameters
+    ----------
+    indice : indice de profundidade da sondagem.
+    coeficientes : matrizes α/β compiladas.
+    diametros_por_tipo : diametros (cm) a avaliar para cada tipo de estaca.
+    comprimentos : comprimentos de estaca (m) a avaliar.
+    cota_arrasamento : cota de arrasamento (m).
+    custo_por_m3 : opcional, custo relativo do m³ de cada tipo de estaca
+        (padrão 1.0), usado para comparar solucoes de tipos diferentes.
+    progresso : opcional, chamada como ``progresso(tipos_concluidos, total)``
+        apos cada tipo de estaca (pode levantar uma excecao para interromper
+        a varredura, ex: ``TarefaCancelada``).
+    discretizacao : segmentos de integracao da resistencia lateral (ver
+        ``calculo_estacas.bordas_segmentos``; padrão: segmentos de 1 m).
+    nspt_ponta_media : se True, usa o NSPT medio de ponta (ver
+        ``IndiceProfundidade.nspt_ponta_medio``).
+
+    Returns
+    -------
+    Dicionario de arrays alinhados: "tipo_estaca", "diametro_cm",
+    "comprimento", "Pdqm" (kN, NaN se a ponta ficar fora da sondagem) e "custo".
+    """
+    custo_por_m3 = custo_por_m3 or {}
+    comprimentos = np.asarray(comprimentos, dtype=np.float64)
+    prof_pontas = indice.cota_terreno - cota_arrasamento + comprimentos
+
+    resultado = {"tipo_estaca": [], "diametro_cm": [], "comprimento": [], "Pdqm": [], "custo": []}
+    for n_tipo, (tipo_estaca, diametros) in enumerate(diametros_por_tipo.items()):
+        if progresso:
+            progresso(n_tipo, len(diametros_por_tipo))
+        diametros_cm = np.asarray([float(d) for d in diametros], dtype=np.float64)
+        if not diametros_cm.size or not comprimentos.size:
+            continue
+
+        # Curva de capacidade (somas acumuladas) para todos os diametros e comprimentos do tipo
+        perfil = perfil_capacidade_decourt(indice, coeficientes, tipo_estaca, diametros_cm / 100.0,
+                                           cota_arrasamento, prof_pontas, discretizacao, nspt_ponta_media)
+        Pdqm = perfil["Pdqm"]
+        area_ponta = math.pi * (diametros_cm / 200.0) ** 2
+        volume = area_ponta[:, None] * comprimentos[None, :]
+
+        forma = Pdqm.shape
+        resultado["tipo_estaca"].append(np.full(forma, tipo_estaca, dtype=object).ravel())
+        resultado["diametro_cm"].append(np.broadcast_to(diametros_cm[:, None], forma).ravel())
+        resultado["comprimento"].append(np.broadcast_to(comprimentos[None, :], forma).ravel())
+        resultado["Pdqm"].append(Pdqm.ravel())
+        resultado["custo"].append((volume * custo_por_m3.get(tipo_estaca, 1.0)).ravel())
+
+    if progresso:
+        progresso(len(diametros_por_tipo), len(diametros_por_tipo))
+    return {
+        chave: np.concatenate(valores) if valores else np.array([], dtype=object if chave == "tipo_estaca" else np.float64)
+        for chave, valores in resultado.items()
+    }
+
+
+def otimizar_pilares(grade: Dict[str, np.ndarray], pilares: Dict[str, Dict]) -> Dict[str, Dict | None]:
+    """Escolhe, para cada pilar, a solucao mais barata da grade com Pdqm >= N_max.
+
+    As solucoes sao ordenadas por custo uma unica vez; o maximo acumulado de
+    Pdqm nessa ordem e nao decrescente, entao a solucao de cada pilar e
+    encontrada por busca binaria.
+
+    Returns
+    -------
+    Dicionario pilar -> solucao (dict) ou None se nenhuma solucao atende.
+    Pilares com N_max invalido sao ignorados.
+    """
+    validos = ~np.isnan(grade["Pdqm"])
+    ordem = np.flatnonzero(validos)
+    # Desempate: menor custo, depois menor comprimento
+    ordem = ordem[np.lexsort((grade["comprimento"][ordem], grade["custo"][ordem]))]
+    maximo_acumulado = np.maximum.accumulate(grade["Pdqm"][ordem]) if ordem.size else np.array([])
+
+    solucoes: Dict[str, Dict | None] = {}
+    for nome, pilar in pilares.items():
+        try:
+            carga = float(str(pilar.get("N_max", 0)).replace(',', '.'))
+        except ValueError:
+            continue
+        posicao = int(np.searchsorted(maximo_acumulado, carga, side="left"))
+        if posicao >= ordem.size:
+            solucoes[nome] = None
+            continue
+        i = ordem[posicao]
+        solucoes[nome] = {
+            "Pilar": nome,
+            "N_max": carga,
+            "Tipo_Estaca": grade["tipo_estaca"][i],
+            "Diametro_cm": float(grade["diametro_cm"][i]),
+            "Comprimento": float(grade["comprimento"][i]),
+            "Pdqm": float(grade["Pdqm"][i]),
+            "Custo": float(grade["custo"][i]),
+        }
+    return solucoes
+
+
+def comprimentos_da_sondagem(indice: IndiceProfundidade, cota_arrasamento: float) -> range:
+    """Comprimentos inteiros (m) com a ponta ate a ultima profundidade com dados de SPT."""
+    prof_arrasamento = indice.cota_terreno - cota_arrasamento
+    return range(1, math.floor(indice.profundidade_maxima - prof_arrasamento) + 1)
+
+
+def diametros_da_tabela_secao(params: Dict, tipos_estaca: Sequence[str]) -> Dict[str, List[float]]:
+    """Lê os diametros (cm) disponiveis de cada tipo na "Tabela de SEÇÃO" de ``params``."""
+    secoes = params["section_parameters"]["data"]
+    diametros = {}
+    for tipo in tipos_estaca:
+        valores = []
+        for valor in secoes.get(tipo, []):
+            try:
+                valores.append(float(str(valor).replace(',', '.')))
+            except ValueError:
+                continue  # celulas vazias
+        if valores:
+            diametros[tipo] = valores
+    return diametros
@@ -0,0 +1,122 @@
+"""Valores padrão dos parametros de calculo geotecnico.
+
+``PARAMETROS_PADRAO`` contem as tabelas editaveis da aba "Configurações"
+(``GeotechnicalDesignTab.params``). Ficam neste modulo, sem dependencia do
+tkinter, para que os calculos em lote e a linha de comando usem os mesmos
+valores da interface.
+"""
+
+import copy
+from typing import Dict, Tuple
+
+PARAMETROS_PADRAO = {
+    "decourt_quaresma_alpha": {
+        "headers": ["Tipo de Solo", "Cravada a céu aberto", "Escavada a fluido", "Hélice Contínua", "Raiz", "Injetada sob pressão", "Franki"],
+        "data": {
+            "Argilas": ["1.0", "0.6", "0.6", "0.85", "1.0", "0.0"],
+            "Argilas Intermediárias": ["1.0", "0.65", "0.75", "1.0", "1.0", "0.0"],
+            "Areias": ["1.0", "0.5", "0.5", "0.3", "0.5", "1.0"]
+        }
+    },
+    "decourt_quaresma_beta": {
+        "headers": ["Tipo de Solo", "Cravada a céu aberto", "Escavada a fluido", "Hélice Contínua", "Raiz", "Injetada sob pressão", "Franki"],
+        "data": {
+            "Argilas": ["1.0", "0.8", "0.9", "1.0", "1.5", "0.0"],
+            "Argilas Intermediárias": ["1.0", "0.65", "0.75", "1.0", "1.5", "0.0"],
+            "Areias": ["1.0", "0.5", "0.5", "0.3", "0.5", "0.0"]
+        }
+    },
+    "aoki_velloso_k": {
+        "headers": ["Tipo de Solo", "K (KPa)"],
+        "data": {
+            "Argila": ["200.0"],
+            "Argila Arenosa": ["350.0"],
+            "Argila Siltosa": ["220.0"],
+            "Silte Argiloso": ["400.0"],
+            "Silte Arenoso": ["550.0"],
+            "Areia Siltosa": ["800.0"],
+            "Areia Argilosa": ["600.0"],
+            "Areia": ["1000.0"]
+        }
+    },
+    "aoki_velloso_alpha_f1": {
+        "headers": ["", "Pré-moldada", "Metálica", "Escavada a céu aberto", "Escavada a fluido", "Hélice Contínua", "Raiz", "Injetada sob pressão", "Franki"],
+        "data": {
+            "F1": ["1+D/0.8", "1.75", "3.0", "3.0", "2.0", "2.0", "2.0", "2.5"] # Fórmulas em D (diâmetro, m)
+        }
+    },
+    "aoki_velloso_alpha_f2": {
+        "headers": ["", "Pré-moldada", "Metálica", "Escavada a céu aberto", "Escavada a fluido", "Hélice Contínua", "Raiz", "Injetada sob pressão", "Franki"],
+        "data": {
+            "F2": ["2*F1", "3.5", "6.0", "6.0", "4.0", "4.0", "4.0", "5.0"] # Fórmulas em D e F1
+        }
+    },
+    "normative_parameters": {
+         "headers": ["", "5", "6", "8", "9", "10"], # Assumindo que sao cabeçalhos de coluna, talvez Ncpu
+         "data": {
+             "ξ": ["1.42", "1.35", "1.33", "1.31", "1.29", "1.27"],
+             "ζ": ["1.42", "1.27", "1.23", "1.20", "1.15", "1.12"]
+         }
+    },
+    "section_parameters": {
+        "headers": ["", "", "", "", "", "", ""],
+        "data": {
+            "Pré-moldada Redonda": ["", "", "", "", "", "", ""],
+            "Pré-moldada Quadrada": ["", "", "", "", "", "", ""],
+            "Escavada a céu aberto": ["20", "25", "30", "35", "40", "50", "60"],
+            "Escavada a fluido": ["20", "25", "30", "40", "50", "60", "70"],
+            "Hélice Contínua": ["30", "40", "50", "60", "70", "80", "100"],
+            "Raiz": ["12", "18", "20", "25", "30", "40", ""],
+            "Injetada sob pressão": ["20", "30", "40", "50", "60", "70", "80"],
+            "Franki": ["60", "80", "100", "120", "150", "180", "200"]
+        }
+    }
+}
+
+# Aoki e Velloso (1975) - coeficiente α (razão de atrito, adimensional) por tipo de solo
+ALFA_AOKI_VELLOSO = {
+    "Argila": 0.060,
+    "Argila Arenosa": 0.024,
+    "Argila Siltosa": 0.040,
+    "Silte Argiloso": 0.034,
+    "Silte Arenoso": 0.022,
+    "Areia Siltosa": 0.020,
+    "Areia Argilosa": 0.030,
+    "Areia": 0.014,
+}
+
+# Aoki e Velloso (1975) - fatores de escala F1 e F2 por tipo de estaca
+# "Pré-moldada" usa F1 = 1 + D/0,8 e F2 = 2·F1 (ver fatores_aoki_velloso)
+FATORES_AOKI_VELLOSO = {
+    "Franki": (2.5, 5.0),
+    "Metálica": (1.75, 3.5),
+    "Escavada a céu aberto": (3.0, 6.0),
+    "Escavada a fluido": (3.0, 6.0),
+    "Hélice Contínua": (2.0, 4.0),
+    "Raiz": (2.0, 4.0),
+    "Injetada sob pressão": (2.0, 4.0),
+}
+
+
+def parametros_padrao() -> Dict:
+    """Retorna uma copia independente das tabelas de parametros padrão."""
+    return copy.deepcopy(PARAMETROS_PADRAO)
+
+
+def fatores_aoki_velloso(tipo_estaca: str, diametro_m: float) -> Tuple[float, float]:
+    """Fatores (F1, F2) de Aoki e Velloso para o tipo de estaca e diametro."""
+    if "Pré-moldada" in tipo_estaca or tipo_estaca == "Cravada a céu aberto":
+        f1 = 1 + diametro_m / 0.8
+        return f1, 2 * f1
+    return FATORES_AOKI_VELLOSO.get(tipo_estaca, FATORES_AOKI_VELLOSO["Escavada a céu aberto"])
+
+
+def k_aoki_velloso(params: Dict) -> Dict[str, float]:
+    """Coeficiente K (kPa) por tipo de solo, lido da tabela editavel de ``params``."""
+    k = {}
+    for solo, valores in params["aoki_velloso_k"]["data"].items():
+        try:
+            k[solo] = float(str(valores[0]).replace(',', '.'))
+        except (ValueError, IndexError):
+            continue
+    return k
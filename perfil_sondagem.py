@@ -0,0 +1,333 @@
+"""Estruturas de consulta do perfil de uma sondagem.
+
+``IndiceProfundidade`` ordena as camadas de uma sondagem uma unica vez e
+responde "qual camada contem esta profundidade?" por busca binaria, em
+O(log n), tanto para uma profundidade isolada quanto para arrays de
+profundidades. E usado pelo calculo de Décourt-Quaresma, pelo desenho do
+perfil no canvas e pelas funcoes de ``calculo_estacas``.
+
+``PerfilSondagem`` e a representacao compacta de uma sondagem: em vez da
+lista de dicionarios ``camadas``, arrays NumPy (profundidades em float64, NSPT
+em int16 -- ou float64, se houver valores fracionarios -- e tipos de solo
+como codigos categoricos), sempre ordenados pela profundidade. Converte-se
+sem perdas de/para o formato do sondagens.json e pode ser passado
+diretamente as funcoes de ``calculo_estacas``.
+
+``IndiceProfundidade.nspt_ponta_medio`` fornece o NSPT de ponta de Décourt
+(media dos valores a 1 m acima da ponta, na ponta e 1 m abaixo) para um
+array de profundidades, com tres buscas vetorizadas nas proprias camadas.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Distancia (m) acima e abaixo da ponta dos valores de NSPT da media de Décourt
+JANELA_PONTA_PADRAO = 1.0
+
+# Chaves das camadas no formato salvo em sondagens.json (App.dados_sondagens)
+CHAVES_SONDAGEM = ("prof_inicial", "prof_final_camada", "n_spt", "tipo_solo")
+# Chaves das camadas no formato de calculo_estacas
+CHAVES_CALCULO = ("Prof_Inicial", "Prof_Final", "NSPT", "Tipo_Solo")
+
+
+class IndiceProfundidade:
+    """Indice ordenado das camadas de uma sondagem por profundidade.
+
+    As camadas nao devem se sobrepor (o que o dialogo de camadas garante).
+    Uma profundidade exatamente na fronteira entre duas camadas pertence a
+    camada de cima, como na busca linear que este indice substitui.
+    """
+
+    def __init__(self, camadas: Sequence[Dict], cota_terreno: float = 0.0, chaves: Tuple[str, str, str, str] = CHAVES_SONDAGEM):
+        chave_topo, chave_base, chave_nspt, chave_solo = chaves
+        self._camadas: List[Dict] | None = sorted(camadas, key=lambda c: float(c[chave_topo]))
+        self._perfil = None
+        self.cota_terreno = float(cota_terreno)
+
+        self.topos = np.array([float(c[chave_topo]) for c in self.camadas], dtype=np.float64)
+        self.bases = np.array([float(c[chave_base]) for c in self.camadas], dtype=np.float64)
+        self.nspt = np.array([float(c.get(chave_nspt, 0) or 0) for c in self.camadas], dtype=np.float64)
+        self.tipos_solo: List[str] = [c[chave_solo] for c in self.camadas]
+
+        # Codigos categoricos dos tipos de solo (posicao em self.categorias)
+        self.categorias: List[str] = []
+        indice_categoria = {}
+        codigos = []
+        for solo in self.tipos_solo:
+            if solo not in indice_categoria:
+                indice_categoria[solo] = len(self.categorias)
+                self.categorias.append(solo)
+            codigos.append(indice_categoria[solo])
+        self.codigos = np.array(codigos, dtype=np.intp)
+        self._preparar_busca()
+
+    def _preparar_busca(self):
+        # Listas Python para a busca escalar com bisect (mais rapida que NumPy para um unico valor)
+        self._topos_lista = self.topos.tolist()
+        self._bases_lista = self.bases.tolist()
+        self._nspt_lista = self.nspt.tolist()
+
+    @classmethod
+    def da_sondagem(cls, sondagem_data: Dict) -> "IndiceProfundidade":
+        """Cria o indice a partir de um item de ``App.dados_sondagens``."""
+        return cls(sondagem_data.get('camadas', []), sondagem_data.get('Cota_Terreno', 0.0))
+
+    @classmethod
+    def das_camadas_calculo(cls, camadas: Sequence[Dict]) -> "IndiceProfundidade":
+        """Cria o indice a partir de camadas no formato de ``calculo_estacas``."""
+        return cls(camadas, chaves=CHAVES_CALCULO)
+
+    @classmethod
+    def do_perfil(cls, perfil: "PerfilSondagem") -> "IndiceProfundidade":
+        """Cria o indice a partir dos arrays de um ``PerfilSondagem``, sem ordenar nem ler dicionarios."""
+        indice = cls.__new__(cls)
+        indice._camadas = None # Gerado sob demanda (ver a propriedade camadas)
+        indice._perfil = perfil
+        indice.cota_terreno = perfil.cota_terreno
+        indice.topos = perfil.prof_inicial
+        indice.bases = perfil.prof_final
+        indice.nspt = perfil.n_spt.astype(np.float64)
+        indice.codigos = perfil.codigos_solo.astype(np.intp)
+        indice.categorias = list(perfil.categorias)
+        indice.tipos_solo = [indice.categorias[c] for c in indice.codigos.tolist()]
+        indice._preparar_busca()
+        return indice
+
+    @property
+    def camadas(self) -> List[Dict]:
+        """Camadas ordenadas por profundidade, no formato de ``App.dados_sondagens``."""
+        if self._camadas is None:
+            self._camadas = self._perfil.para_sondagem()['camadas']
+        return self._camadas
+
+    def __len__(self):
+        return len(self.tipos_solo)
+
+    @property
+    def profundidade_maxima(self) -> float:
+        return self._bases_lista[-1] if self._bases_lista else 0.0
+
+    @property
+    def cotas_topo(self) -> np.ndarray:
+        return self.cota_terreno - self.topos
+
+    @property
+    def cotas_base(self) -> np.ndarray:
+        return self.cota_terreno - self.bases
+
+    def localizar(self, profundidade: float) -> int | None:
+        """Indice (na ordem de ``self.camadas``) da camada que contem a profundidade."""
+        i = bisect_left(self._bases_lista, profundidade)
+        if i < len(self._bases_lista) and self._topos_lista[i] <= profundidade:
+            return i
+        return None
+
+    def consultar(self, profundidade: float) -> Tuple[float | None, str | None]:
+        """Retorna (NSPT, tipo de solo) na profundidade, ou (None, None)."""
+        i = self.localizar(profundidade)
+        if i is None:
+            return None, None
+        return self._nspt_lista[i], self.tipos_solo[i]
+
+    def consultar_cota(self, cota: float) -> Tuple[float | None, str | None]:
+        """Como ``consultar``, mas recebendo a cota em vez da profundidade."""
+        return self.consultar(self.cota_terreno - cota)
+
+    def localizar_lote(self, profundidades) -> np.ndarray:
+        """Versao vetorizada de ``localizar``; profundidades fora das camadas recebem -1."""
+        profundidades = np.asarray(profundidades, dtype=np.float64)
+        i = np.searchsorted(self.bases, profundidades, side="left")
+        dentro = i < self.bases.size
+        i_valido = np.where(dentro, i, 0)
+        if self.topos.size:
+            dentro &= self.topos[i_valido] <= profundidades
+        return np.where(dentro, i_valido, -1)
+
+    def consultar_lote(self, profundidades) -> Tuple[np.ndarray, np.ndarray]:
+        """Retorna (NSPT, codigo do solo) para cada profundidade.
+
+        Profundidades fora das camadas recebem NSPT NaN e codigo -1. O codigo
+        indexa ``self.categorias``.
+        """
+        i = self.localizar_lote(profundidades)
+        encontrado = i >= 0
+        if not self.topos.size:
+            return np.full(i.shape, np.nan), np.full(i.shape, -1, dtype=np.intp)
+        nspt = np.where(encontrado, self.nspt[np.where(encontrado, i, 0)], np.nan)
+        codigos = np.where(encontrado, self.codigos[np.where(encontrado, i, 0)], -1)
+        return nspt, codigos
+
+    def nspt_ponta_medio(self, profundidades, janela: float = JANELA_PONTA_PADRAO) -> np.ndarray:
+        """NSPT medio de ponta de Décourt em cada profundidade.
+
+        Em cada profundidade z e a media dos NSPT das camadas em z - janela, z e
+        z + janela, lidos exatamente (sem arredondar z), de modo que o valor em
+        z e o da mesma camada de ``consultar_lote``. Valores fora da sondagem
+        sao ignorados na media; se nao houver dado de SPT na propria
+        profundidade, o resultado e NaN.
+        """
+        profundidades = np.asarray(profundidades, dtype=np.float64)
+        nspt = self.consultar_lote(profundidades)[0]
+        janelas = np.stack((self.consultar_lote(profundidades - janela)[0], nspt,
+                            self.consultar_lote(profundidades + janela)[0]))
+        validos = ~np.isnan(janelas)
+        soma = np.where(validos, janelas, 0.0).sum(axis=0)
+        return np.where(np.isnan(nspt), np.nan, soma / np.maximum(validos.sum(axis=0), 1))
+
+    def camadas_no_intervalo(self, prof_topo: float, prof_base: float) -> Tuple[int, int]:
+        """Faixa [inicio, fim) de camadas que intersectam o intervalo de profundidades."""
+        inicio = bisect_right(self._bases_lista, prof_topo)
+        fim = bisect_left(self._topos_lista, prof_base)
+        return inicio, max(inicio, fim)
+
+
+def _array_nspt(valores) -> np.ndarray:
+    """Converte valores de NSPT para int16 ou, se algum perderia informacao, mantem float64.
+
+    NSPT fracionario (ex: media de ensaios) e aceito pelo restante do aplicativo,
+    entao nao pode ser recusado aqui; apenas deixa de usar a forma compacta.
+    """
+    valores = np.array(valores, dtype=np.float64)
+    limites = np.iinfo(np.int16)
+    if valores.size and not (np.all(valores == np.round(valores))
+                             and valores.min() >= limites.min and valores.max() <= limites.max):
+        return valores
+    return valores.astype(np.int16)
+
+
+def _somente_leitura(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+class PerfilSondagem:
+    """Perfil de uma sondagem em arrays NumPy.
+
+    As camadas ficam sempre ordenadas pela profundidade inicial: a ordem e
+    garantida na construcao e os arrays sao somente leitura. Uma alteracao
+    gera um novo perfil (ex: ``PerfilSondagem.da_sondagem`` com os dados editados).
+
+    Attributes
+    ----------
+    prof_inicial, prof_final : profundidades de topo e base das camadas (float64, m).
+    n_spt : NSPT de cada camada (int16; float64 se algum valor nao for inteiro ou nao couber em int16).
+    codigos_solo : codigo do tipo de solo de cada camada (int16), posicao em ``categorias``.
+    categorias : tupla com os tipos de solo.
+    na, cota_terreno : nivel d'agua e cota do terreno (m).
+    """
+
+    __slots__ = ("na", "cota_terreno", "prof_inicial", "prof_final", "n_spt", "codigos_solo", "categorias", "_indice")
+
+    def __init__(self, prof_inicial, prof_final, n_spt, codigos_solo, categorias: Sequence[str],
+                 na: float = 0.0, cota_terreno: float = 0.0):
+        prof_inicial = np.array(prof_inicial, dtype=np.float64)
+        prof_final = np.array(prof_final, dtype=np.float64)
+        n_spt = _array_nspt(n_spt)
+        codigos_solo = np.array(codigos_solo, dtype=np.int16)
+        categorias = tuple(categorias)
+        if not (prof_inicial.shape == prof_final.shape == n_spt.shape == codigos_solo.shape) or prof_inicial.ndim != 1:
+            raise ValueError("Os arrays do perfil devem ser 1D e ter o mesmo tamanho.")
+        if codigos_solo.size and (codigos_solo.min() < 0 or codigos_solo.max() >= len(categorias)):
+            raise ValueError("Código de solo fora das categorias do perfil.")
+
+        # Invariante: camadas ordenadas pela profundidade inicial
+        ordem = np.argsort(prof_inicial, kind="stable")
+        if np.any(ordem != np.arange(ordem.size)):
+            prof_inicial, prof_final, n_spt, codigos_solo = (
+                prof_inicial[ordem], prof_final[ordem], n_spt[ordem], codigos_solo[ordem])
+
+        self.prof_inicial = _somente_leitura(prof_inicial)
+        self.prof_final = _somente_leitura(prof_final)
+        self.n_spt = _somente_leitura(n_spt)
+        self.codigos_solo = _somente_leitura(codigos_solo)
+        self.categorias = categorias
+        self.na = float(na)
+        self.cota_terreno = float(cota_terreno)
+        self._indice = None
+
+    @classmethod
+    def _das_camadas(cls, camadas: Sequence[Dict], chaves: Tuple[str, str, str, str], **kwargs) -> "PerfilSondagem":
+        chave_topo, chave_base, chave_nspt, chave_solo = chaves
+        # Ordena antes de codificar, para que os codigos sigam a ordem de profundidade (como no IndiceProfundidade)
+        camadas = sorted(camadas, key=lambda c: float(c[chave_topo]))
+        categorias: List[str] = []
+        indice_categoria = {}
+        codigos = []
+        for camada in camadas:
+            solo = camada[chave_solo]
+            if solo not in indice_categoria:
+                indice_categoria[solo] = len(categorias)
+                categorias.append(solo)
+            codigos.append(indice_categoria[solo])
+        return cls(
+            [float(c[chave_topo]) for c in camadas],
+            [float(c[chave_base]) for c in camadas],
+            [float(c.get(chave_nspt, 0) or 0) for c in camadas],
+            codigos, categorias, **kwargs,
+        )
+
+    @classmethod
+    def da_sondagem(cls, sondagem_data: Dict) -> "PerfilSondagem":
+        """Cria o perfil a partir de um item de ``App.dados_sondagens`` (formato do sondagens.json)."""
+        return cls._das_camadas(sondagem_data.get('camadas', []), CHAVES_SONDAGEM,
+                                na=sondagem_data.get('NA', 0.0), cota_terreno=sondagem_data.get('Cota_Terreno', 0.0))
+
+    @classmethod
+    def das_camadas_calculo(cls, camadas: Sequence[Dict], cota_terreno: float = 0.0) -> "PerfilSondagem":
+        """Cria o perfil a partir de camadas no formato de ``calculo_estacas``."""
+        return cls._das_camadas(camadas, CHAVES_CALCULO, cota_terreno=cota_terreno)
+
+    def para_sondagem(self) -> Dict:
+        """Converte para o formato de ``App.dados_sondagens`` (inverso de ``da_sondagem``)."""
+        return {
+            'NA': self.na,
+            'Cota_Terreno': self.cota_terreno,
+            'camadas': [
+                {'prof_inicial': topo, 'prof_final_camada': base, 'tipo_solo': self.categorias[codigo], 'n_spt': nspt}
+                for topo, base, codigo, nspt in zip(self.prof_inicial.tolist(), self.prof_final.tolist(),
+                                                    self.codigos_solo.tolist(), self.n_spt.tolist())
+            ],
+        }
+
+    def para_camadas_calculo(self) -> List[Dict]:
+        """Converte para a lista de camadas de ``calculo_estacas`` (inverso de ``das_camadas_calculo``)."""
+        return [
+            {"Prof_Inicial": topo, "Prof_Final": base, "Tipo_Solo": self.categorias[codigo], "NSPT": nspt}
+            for topo, base, codigo, nspt in zip(self.prof_inicial.tolist(), self.prof_final.tolist(),
+                                                self.codigos_solo.tolist(), self.n_spt.tolist())
+        ]
+
+    def colunas(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[str]]:
+        """(prof_topo, prof_base, nspt, codigo_solo, categorias), como ``calculo_estacas.camadas_para_colunas``."""
+        return (self.prof_inicial, self.prof_final, self.n_spt.astype(np.float64),
+                self.codigos_solo.astype(np.intp), list(self.categorias))
+
+    def indice(self) -> IndiceProfundidade:
+        """Indice de profundidade do perfil (construido uma vez e reutilizado)."""
+        if self._indice is None:
+            self._indice = IndiceProfundidade.do_perfil(self)
+        return self._indice
+
+    @property
+    def tipos_solo(self) -> List[str]:
+        return [self.categorias[c] for c in self.codigos_solo.tolist()]
+
+    def __len__(self):
+        return self.prof_inicial.size
+
+    def __repr__(self):
+        return f"PerfilSondagem({len(self)} camadas, cota_terreno={self.cota_terreno}, NA={self.na})"
+
+    # O indice em cache nao e serializado (ex: ao enviar o perfil para outro processo)
+    def __getstate__(self):
+        return (self.na, self.cota_terreno, self.prof_inicial, self.prof_final, self.n_spt,
+                self.codigos_solo, self.categorias)
+
+    def __setstate__(self, estado):
+        (self.na, self.cota_terreno, self.prof_inicial, self.prof_final, self.n_spt,
+         self.codigos_solo, self.categorias) = estado
+        for array in (self.prof_inicial, self.prof_final, self.n_spt, self.codigos_solo):
+            array.flags.writeable = False
+        self._indice = None
@@ -0,0 +1,118 @@
+"""Persistencia incremental das sondagens (sondagens.json + diario de alteracoes).
+
+Em vez de regravar todo o ``sondagens.json`` a cada salvamento, cada edicao
+feita na interface e anexada como uma linha JSON ao diario
+(``sondagens.json.diario``), o que custa apenas a serializacao da alteracao.
+Ao carregar, o diario e reaplicado sobre o ultimo snapshot; de tempos em
+tempos (e ao fechar o aplicativo) o estado completo e gravado no snapshot e o
+diario e esvaziado (compactacao).
+
+Registros do diario:
+    {"op": "sondagem", "sondagem": nome, "dados": {...}}   cria/substitui a sondagem
+    {"op": "campo", "sondagem": nome, "campo": c, "valor": v}   altera um campo (NA, Cota_Terreno, camadas)
+    {"op": "remover", "sondagem": nome}
+"""
+
+import json
+import os
+from typing import Dict
+
+from instrumentacao import instrumentado
+
+# Numero de registros no diario a partir do qual ``precisa_compactar`` retorna True
+LIMITE_REGISTROS_PADRAO = 500
+
+
+class DiarioSondagens:
+    """Snapshot JSON das sondagens mais um diario de alteracoes apenas anexado."""
+
+    def __init__(self, caminho: str = "sondagens.json", limite_registros: int = LIMITE_REGISTROS_PADRAO):
+        self.caminho = caminho
+        self.caminho_diario = caminho + ".diario"
+        self.limite_registros = limite_registros
+        self.registros = 0 # Registros no diario desde a ultima compactacao
+        self.registros_invalidos = 0 # Linhas ignoradas na ultima leitura (ex: gravacao interrompida)
+
+    @instrumentado()
+    def carregar(self) -> Dict[str, Dict]:
+        """Le o snapshot e reaplica o diario.
+
+        Raises
+        ------
+        FileNotFoundError : se nao existir nem o snapshot nem o diario.
+        """
+        if os.path.exists(self.caminho):
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+        elif os.path.exists(self.caminho_diario):
+            dados = {}
+        else:
+            raise FileNotFoundError(self.caminho)
+
+        self.registros = 0
+        self.registros_invalidos = 0
+        if os.path.exists(self.caminho_diario):
+            with open(self.caminho_diario, "r", encoding="utf-8") as f:
+                for linha in f:
+                    if not linha.strip():
+                        continue
+                    try:
+                        aplicar_registro(dados, json.loads(linha))
+                    except (ValueError, KeyError, TypeError):
+                        # Linha truncada por uma falha durante a gravacao, ou registro invalido
+                        self.registros_invalidos += 1
+                        continue
+                    self.registros += 1
+        return dados
+
+    def _anexar(self, registro: Dict):
+        with open(self.caminho_diario, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno()) # A alteracao sobrevive a uma queda do aplicativo
+        self.registros += 1
+
+    def registrar_sondagem(self, nome: str, dados: Dict):
+        """Registra a criacao (ou substituicao completa) de uma sondagem."""
+        self._anexar({"op": "sondagem", "sondagem": nome, "dados": dados})
+
+    def registrar_campo(self, nome: str, campo: str, valor):
+        """Registra a alteracao de um campo da sondagem (ex: "NA", "Cota_Terreno", "camadas")."""
+        self._anexar({"op": "campo", "sondagem": nome, "campo": campo, "valor": valor})
+
+    def registrar_remocao(self, nome: str):
+        """Registra a remocao de uma sondagem."""
+        self._anexar({"op": "remover", "sondagem": nome})
+
+    def precisa_compactar(self) -> bool:
+        return self.registros >= self.limite_registros
+
+    def compactar(self, dados: Dict[str, Dict]):
+        """Grava o estado completo no snapshot e esvazia o diario.
+
+        O snapshot e gravado num arquivo temporario e renomeado, de forma que
+        uma falha no meio da gravacao nunca deixa o ``sondagens.json`` corrompido.
+        """
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(dados, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self.caminho)
+        if os.path.exists(self.caminho_diario):
+            os.remove(self.caminho_diario)
+        self.registros = 0
+
+
+def aplicar_registro(dados: Dict[str, Dict], registro: Dict):
+    """Aplica um registro do diario ao dicionario de sondagens."""
+    op = registro["op"]
+    nome = registro["sondagem"]
+    if op == "sondagem":
+        dados[nome] = registro["dados"]
+    elif op == "campo":
+        dados[nome][registro["campo"]] = registro["valor"]
+    elif op == "remover":
+        dados.pop(nome, None)
+    else:
+        raise ValueError(f"Operação desconhecida no diário: {op}")
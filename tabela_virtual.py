@@ -0,0 +1,166 @@
+"""Tabela virtual sobre ``ttk.Treeview``: apenas as linhas visiveis viram itens.
+
+Preencher um Treeview com centenas de linhas (um ``insert`` por linha) e
+limpa-lo a cada atualizacao com ``delete(*get_children())`` domina o tempo de
+resposta da interface em perfis de resolucao fina. Aqui as linhas ficam numa
+sequencia (o modelo) e o Treeview mostra apenas uma janela dela: cada item do
+Treeview e reaproveitado para a linha que ocupa aquela posicao da janela, e so
+os itens cujo conteudo mudou sao atualizados. A barra de rolagem, a roda do
+mouse e as setas movem a janela sobre o modelo.
+
+O modelo pode ser qualquer sequencia (lista, ou um objeto com ``__len__`` e
+``__getitem__`` que formata as linhas sob demanda a partir de arrays).
+"""
+
+from tkinter import ttk
+from typing import Sequence
+
+# Altura das linhas e do cabecalho (px) usadas ate o Treeview ser exibido
+ALTURA_LINHA_PADRAO = 20
+ALTURA_CABECALHO_PADRAO = 25
+
+
+class TabelaVirtual(ttk.Frame):
+    """Treeview com barra de rolagem que materializa so as linhas visiveis.
+
+    ``tree`` e o Treeview interno (para ``heading``, ``column``,
+    ``tag_configure``, ``bind``...). Os itens do Treeview representam posicoes
+    da janela, nao linhas do modelo: use ``linha_do_item`` e ``mostrar_linha``
+    para converter entre os dois.
+    """
+
+    def __init__(self, parent, columns, **kwargs):
+        super().__init__(parent)
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", **kwargs)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.linhas: Sequence = [] # Modelo: valores de cada linha
+        self.tags_linhas: Sequence = [] # Tags de cada linha (opcional)
+        self.inicio = 0 # Primeira linha do modelo exibida
+        self._n_visiveis = int(kwargs.get("height", 10))
+        self._itens = [] # Itens do Treeview, um por posicao da janela
+        self._exibidos = [] # (valores, tags) exibidos em cada item
+        self._linha_selecionada = None
+
+        self.tree.bind("<Configure>", self._on_configure, add="+")
+        self.tree.bind("<<TreeviewSelect>>", self._on_select, add="+")
+        self.tree.bind("<MouseWheel>", lambda e: self.rolar(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.rolar(-1, "units")) # Roda do mouse no X11
+        self.tree.bind("<Button-5>", lambda e: self.rolar(1, "units"))
+        self.tree.bind("<Up>", lambda e: self._mover_selecao(-1))
+        self.tree.bind("<Down>", lambda e: self._mover_selecao(1))
+
+    def __len__(self):
+        return len(self.linhas)
+
+    def definir_linhas(self, linhas: Sequence, tags: Sequence | None = None):
+        """Substitui o modelo; apenas os itens visiveis que mudaram sao atualizados."""
+        self.linhas = linhas
+        self.tags_linhas = tags if tags is not None else ()
+        if self._linha_selecionada is not None and self._linha_selecionada >= len(linhas):
+            self._linha_selecionada = None
+        self._renderizar()
+
+    def atualizar_linha(self, indice: int, valores):
+        """Altera os valores de uma linha do modelo (que deve ser uma lista)."""
+        self.linhas[indice] = tuple(valores)
+        self._renderizar()
+
+    def linha_do_item(self, item) -> int | None:
+        """Linha do modelo exibida no item do Treeview."""
+        try:
+            return self.inicio + self._itens.index(item)
+        except ValueError:
+            return None
+
+    def mostrar_linha(self, indice: int):
+        """Rola a janela ate a linha e retorna o item do Treeview que a exibe."""
+        if indice < self.inicio:
+            self.inicio = indice
+        elif indice >= self.inicio + self._n_visiveis:
+            self.inicio = indice - self._n_visiveis + 1
+        self._renderizar()
+        return self._itens[indice - self.inicio]
+
+    def rolar(self, quantidade: int, unidade: str = "units"):
+        passo = self._n_visiveis if unidade == "pages" else 1
+        self.inicio += quantidade * passo
+        self._renderizar()
+        return "break" # Impede a rolagem nativa do Treeview
+
+    def _on_scrollbar(self, comando, *args):
+        if comando == "moveto":
+            self.inicio = round(float(args[0]) * len(self.linhas))
+            self._renderizar()
+        elif comando == "scroll":
+            self.rolar(int(args[0]), args[1])
+
+    def _on_configure(self, event=None):
+        """Recalcula quantas linhas cabem no Treeview."""
+        altura_linha = ALTURA_LINHA_PADRAO
+        altura_cabecalho = ALTURA_CABECALHO_PADRAO
+        if self._itens:
+            caixa = self.tree.bbox(self._itens[0])
+            if caixa:
+                altura_cabecalho, altura_linha = caixa[1], caixa[3]
+        n_visiveis = max(1, (self.tree.winfo_height() - altura_cabecalho) // max(1, altura_linha))
+        if n_visiveis != self._n_visiveis:
+            self._n_visiveis = n_visiveis
+            self._renderizar()
+
+    def _on_select(self, event=None):
+        # Selecoes vazias sao ignoradas: o evento tambem e gerado quando a janela rola e
+        # a linha selecionada sai de vista, e a selecao deve voltar quando ela reaparecer
+        selecao = self.tree.selection()
+        if selecao:
+            self._linha_selecionada = self.linha_do_item(selecao[0])
+
+    def _mover_selecao(self, passo: int):
+        """Setas do teclado: move a selecao pelo modelo, rolando a janela quando necessario."""
+        if self._linha_selecionada is None or not len(self.linhas):
+            return None
+        indice = min(max(self._linha_selecionada + passo, 0), len(self.linhas) - 1)
+        item = self.mostrar_linha(indice)
+        self.tree.selection_set(item)
+        self.tree.focus(item)
+        self.tree.see(item)
+        return "break"
+
+    def _renderizar(self):
+        """Exibe a janela atual do modelo reaproveitando os itens existentes."""
+        total = len(self.linhas)
+        self.inicio = max(0, min(self.inicio, total - self._n_visiveis))
+        fim = min(total, self.inicio + self._n_visiveis)
+
+        for posicao, indice in enumerate(range(self.inicio, fim)):
+            valores = tuple(self.linhas[indice])
+            tags = tuple(self.tags_linhas[indice]) if indice < len(self.tags_linhas) else ()
+            if posicao < len(self._itens):
+                if self._exibidos[posicao] != (valores, tags):
+                    self.tree.item(self._itens[posicao], values=valores, tags=tags)
+                    self._exibidos[posicao] = (valores, tags)
+            else:
+                self._itens.append(self.tree.insert("", "end", values=valores, tags=tags))
+                self._exibidos.append((valores, tags))
+
+        n_exibidas = fim - self.inicio
+        if len(self._itens) > n_exibidas:
+            self.tree.delete(*self._itens[n_exibidas:])
+            del self._itens[n_exibidas:]
+            del self._exibidos[n_exibidas:]
+
+        # A selecao acompanha a linha do modelo, nao a posicao na janela
+        selecionada = self._linha_selecionada
+        if selecionada is not None and self.inicio <= selecionada < fim:
+            item = self._itens[selecionada - self.inicio]
+            if tuple(self.tree.selection()) != (item,):
+                self.tree.selection_set(item)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+        if total:
+            self.scrollbar.set(self.inicio / total, fim / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
@@ -0,0 +1,119 @@
+"""Execucao de calculos numa thread de trabalho, sem congelar a interface.
+
+O Tk so pode ser usado pela thread principal. A funcao de calculo roda numa
+thread separada e se comunica apenas por uma fila; a thread principal le a
+fila periodicamente com ``after()`` e chama os callbacks de progresso,
+conclusao, erro ou cancelamento, de onde a interface pode ser atualizada.
+
+Exemplo::
+
+    def calcular(tarefa):
+        for i, item in enumerate(itens):
+            tarefa.verificar_cancelamento()
+            ...
+            tarefa.informar_progresso(i + 1, len(itens))
+        return resultado
+
+    TarefaSegundoPlano(widget, calcular, ao_concluir=mostrar_resultado).iniciar()
+"""
+
+import queue
+import threading
+from typing import Callable
+
+# Intervalo (ms) entre as leituras da fila de mensagens na thread do Tk
+INTERVALO_VERIFICACAO_MS = 50
+
+
+class TarefaCancelada(Exception):
+    """Levantada por ``verificar_cancelamento`` quando a tarefa foi cancelada."""
+
+
+class TarefaSegundoPlano:
+    """Executa ``funcao(tarefa)`` numa thread e entrega os resultados na thread do Tk.
+
+    Parameters
+    ----------
+    widget : qualquer widget Tk, usado para agendar a leitura da fila com ``after()``.
+    funcao : chamada na thread de trabalho com a propria tarefa como argumento;
+        nao pode acessar widgets. Usa ``informar_progresso`` e
+        ``verificar_cancelamento`` para se comunicar.
+    ao_concluir : chamada com o valor retornado por ``funcao``.
+    ao_falhar : chamada com a excecao levantada por ``funcao``.
+    ao_progresso : chamada como ``ao_progresso(feitas, total)``.
+    ao_cancelar : chamada quando a tarefa termina depois de ``cancelar()``.
+    """
+
+    def __init__(self, widget, funcao: Callable, ao_concluir: Callable, ao_falhar: Callable | None = None,
+                 ao_progresso: Callable | None = None, ao_cancelar: Callable | None = None):
+        self.widget = widget
+        self.funcao = funcao
+        self.ao_concluir = ao_concluir
+        self.ao_falhar = ao_falhar
+        self.ao_progresso = ao_progresso
+        self.ao_cancelar = ao_cancelar
+        self._fila = queue.Queue()
+        self._cancelada = threading.Event()
+        self._thread = None
+        self.ativa = False
+
+    def iniciar(self):
+        self.ativa = True
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+        self._thread.start()
+        self.widget.after(INTERVALO_VERIFICACAO_MS, self._verificar_fila)
+
+    def cancelar(self):
+        """Pede o cancelamento; a funcao para no proximo ``verificar_cancelamento``."""
+        self._cancelada.set()
+
+    @property
+    def cancelada(self) -> bool:
+        return self._cancelada.is_set()
+
+    # --- Chamados pela thread de trabalho ---
+
+    def informar_progresso(self, feitas: int, total: int):
+        self._fila.put(("progresso", (feitas, total)))
+
+    def verificar_cancelamento(self):
+        if self._cancelada.is_set():
+            raise TarefaCancelada()
+
+    def _executar(self):
+        try:
+            resultado = self.funcao(self)
+        except TarefaCancelada:
+            self._fila.put(("cancelada", None))
+        except Exception as e:
+            self._fila.put(("erro", e))
+        else:
+            # Um cancelamento pedido depois do ultimo ponto de verificacao ainda descarta o resultado
+            self._fila.put(("cancelada", None) if self._cancelada.is_set() else ("concluida", resultado))
+
+    # --- Thread do Tk ---
+
+    def _verificar_fila(self):
+        if not self.widget.winfo_exists():
+            self.cancelar() # Janela fechada: a thread termina sozinha e o resultado e descartado
+            self.ativa = False
+            return
+        while True:
+            try:
+                tipo, valor = self._fila.get_nowait()
+            except queue.Empty:
+                break
+            if tipo == "progresso":
+                if self.ao_progresso:
+                    self.ao_progresso(*valor)
+                continue
+            self.ativa = False
+            if tipo == "concluida":
+                self.ao_concluir(valor)
+            elif tipo == "erro":
+                if self.ao_falhar:
+                    self.ao_falhar(valor)
+            elif self.ao_cancelar:
+                self.ao_cancelar()
+            return
+        self.widget.after(INTERVALO_VERIFICACAO_MS, self._verificar_fila)
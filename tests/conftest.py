@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os modulos do aplicativo ficam na raiz do repositorio (sem pacote)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,164 @@
+"""Banco SQLite do projeto (``BancoProjeto``) e leitura sob demanda (``SondagensBanco``)."""
+
+import json
+
+import pytest
+
+from banco_projeto import PROJETO_PADRAO, BancoProjeto, main
+
+SONDAGENS = {
+    "SP-01": {"NA": 2.0, "Cota_Terreno": 100.0, "camadas": [
+        {"prof_inicial": 0.0, "prof_final_camada": 1.5, "tipo_solo": "Argila", "n_spt": 4},
+        {"prof_inicial": 1.5, "prof_final_camada": 3.25, "tipo_solo": "Areia Siltosa", "n_spt": 12.5},
+        {"prof_inicial": 3.25, "prof_final_camada": 6.0, "tipo_solo": "Areia", "n_spt": 38},
+    ]},
+    "SP-02": {"NA": 0.8, "Cota_Terreno": 97.35, "camadas": [
+        {"prof_inicial": 0.0, "prof_final_camada": 2.0, "tipo_solo": "Silte Argiloso", "n_spt": 7},
+    ]},
+    "SP-03": {"NA": 1.0, "Cota_Terreno": 99.0, "camadas": []},
+}
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    caminho = str(tmp_path / "projeto.db")
+    banco = BancoProjeto(caminho, "Obra A")
+    banco.importar_sondagens(SONDAGENS)
+    banco.fechar()
+    return caminho
+
+
+@pytest.fixture
+def banco(caminho):
+    banco = BancoProjeto(caminho, "Obra A")
+    yield banco
+    banco.fechar()
+
+
+def _reaberto(caminho):
+    banco = BancoProjeto(caminho, "Obra A")
+    try:
+        return banco.exportar_sondagens()
+    finally:
+        banco.fechar()
+
+
+def test_registrar_grava_no_banco(caminho, banco):
+    camadas = [{"prof_inicial": 0.0, "prof_final_camada": 4.0, "tipo_solo": "Argila Arenosa", "n_spt": 9}]
+    banco.registrar_sondagem("SP-04", {"NA": 1.2, "Cota_Terreno": 98.0, "camadas": camadas})
+    banco.registrar_campo("SP-01", "NA", 2.7)
+    banco.registrar_campo("SP-01", "Cota_Terreno", 100.4)
+    banco.registrar_campo("SP-02", "camadas", camadas)
+    banco.registrar_remocao("SP-03")
+
+    esperado = {
+        "SP-01": {**SONDAGENS["SP-01"], "NA": 2.7, "Cota_Terreno": 100.4},
+        "SP-02": {**SONDAGENS["SP-02"], "camadas": camadas},
+        "SP-04": {"NA": 1.2, "Cota_Terreno": 98.0, "camadas": camadas},
+    }
+    assert _reaberto(caminho) == esperado
+
+
+def test_registrar_campo_invalido(banco):
+    with pytest.raises(KeyError):
+        banco.registrar_campo("SP-99", "NA", 1.0)
+    with pytest.raises(ValueError):
+        banco.registrar_campo("SP-01", "Nome", "SP-10")
+
+
+def test_edicao_pela_interface_e_visivel_ao_reabrir(caminho, banco):
+    # Como o App: altera o dicionario carregado e registra a alteracao
+    dados = banco.carregar()
+    dados["SP-01"]["camadas"].append(
+        {"prof_inicial": 6.0, "prof_final_camada": 7.0, "tipo_solo": "Areia", "n_spt": 45})
+    banco.registrar_campo("SP-01", "camadas", dados["SP-01"]["camadas"])
+    dados["SP-02"]["NA"] = 1.1
+    banco.registrar_campo("SP-02", "NA", 1.1)
+    del dados["SP-03"]
+    banco.registrar_remocao("SP-03")
+
+    assert _reaberto(caminho) == {nome: dados[nome] for nome in dados}
+    assert sorted(_reaberto(caminho)) == ["SP-01", "SP-02"]
+
+
+def test_sondagens_sao_lidas_sob_demanda(banco, monkeypatch):
+    lidas = []
+    ler_sondagem = banco.ler_sondagem
+
+    def contar_leitura(nome):
+        lidas.append(nome)
+        return ler_sondagem(nome)
+
+    monkeypatch.setattr(banco, "ler_sondagem", contar_leitura)
+    dados = banco.carregar()
+    assert list(dados) == ["SP-01", "SP-02", "SP-03"]
+    assert len(dados) == 3 and "SP-02" in dados and "SP-99" not in dados
+    assert lidas == []
+
+    assert dados["SP-02"] == SONDAGENS["SP-02"]
+    assert dados["SP-02"] is dados["SP-02"] # Mantida em memoria
+    assert lidas == ["SP-02"]
+
+    dados.descarregar("SP-02")
+    assert dados["SP-02"] == SONDAGENS["SP-02"]
+    assert lidas == ["SP-02", "SP-02"]
+
+    dados["SP-01"]
+    dados.descarregar()
+    dados["SP-01"]
+    dados["SP-02"]
+    assert lidas == ["SP-02", "SP-02", "SP-01", "SP-01", "SP-02"]
+    with pytest.raises(KeyError):
+        dados["SP-99"]
+
+
+def test_mapeamento_altera_apenas_a_memoria(caminho, banco):
+    dados = banco.carregar()
+    dados["SP-04"] = {"NA": 0.0, "Cota_Terreno": 0.0, "camadas": []}
+    dados["SP-01"]["NA"] = 9.9
+    del dados["SP-02"]
+    with pytest.raises(KeyError):
+        del dados["SP-99"]
+
+    assert list(dados) == ["SP-01", "SP-03", "SP-04"]
+    assert "SP-02" not in dados
+    with pytest.raises(KeyError):
+        dados["SP-02"]
+    # Nada foi gravado sem registrar_*
+    assert _reaberto(caminho) == SONDAGENS
+
+    # Uma sondagem removida da memoria pode ser recriada
+    dados["SP-02"] = SONDAGENS["SP-02"]
+    assert "SP-02" in dados and len(dados) == 4
+
+
+def test_importar_e_exportar_ida_e_volta(tmp_path):
+    entrada = tmp_path / "sondagens.json"
+    saida = tmp_path / "exportadas.json"
+    caminho = str(tmp_path / "projeto.db")
+    entrada.write_text(json.dumps(SONDAGENS, indent=4), encoding="utf-8")
+
+    assert main([caminho, "--importar", str(entrada), "--projeto", "Obra A"]) == 0
+    assert main([caminho, "--exportar", str(saida), "--projeto", "Obra A"]) == 0
+    assert json.loads(saida.read_text(encoding="utf-8")) == SONDAGENS
+    # Os projetos do banco sao independentes
+    assert main([caminho, "--exportar", str(saida)]) == 0
+    assert json.loads(saida.read_text(encoding="utf-8")) == {}
+
+
+def test_projeto_padrao_e_o_unico_do_banco(caminho):
+    banco = BancoProjeto(caminho)
+    assert banco.projeto == "Obra A"
+    assert banco.exportar_sondagens() == SONDAGENS
+    banco.fechar()
+
+    outro = BancoProjeto(caminho, "Obra B")
+    outro.registrar_sondagem("SP-01", SONDAGENS["SP-02"])
+    assert outro.projetos() == ["Obra A", "Obra B"]
+    outro.fechar()
+
+    # Com varios projetos, sem nome: o projeto padrao
+    banco = BancoProjeto(caminho)
+    assert banco.projeto == PROJETO_PADRAO
+    assert banco.nomes_sondagens() == []
+    banco.fechar()
@@ -0,0 +1,119 @@
+"""As funcoes em lote devem reproduzir bit a bit as funcoes escalares."""
+
+import math
+
+import numpy as np
+import pytest
+
+from calculo_estacas import (
+    aoki_velloso,
+    aoki_velloso_lote,
+    camadas_para_colunas,
+    coeficientes_para_array,
+    decourt_quaresma,
+    decourt_quaresma_lote,
+)
+
+K = {"Argila": 200.0, "Areia": 1000.0, "Silte Argiloso": 250.0, "Areia Siltosa": 800.0}
+ALPHA = {"Argila": 0.06, "Areia": 0.014, "Silte Argiloso": 0.03, "Areia Siltosa": 0.02}
+C = {"Argila": 120.0, "Areia": 400.0, "Silte Argiloso": 200.0, "Areia Siltosa": 250.0}
+ALPHA_L = {"Argila": 10.0, "Areia": 10.0, "Silte Argiloso": 10.0, "Areia Siltosa": 10.0}
+
+
+def _camadas_aleatorias(rng):
+    camadas = []
+    topo = 0.0
+    for _ in range(rng.integers(1, 25)):
+        base = round(topo + float(rng.choice([0.1, 0.35, 0.5, 1.0, 2.7])), 2)
+        nspt = int(rng.integers(0, 70)) if rng.random() < 0.8 else round(float(rng.uniform(0, 60)), 1)
+        camadas.append({"Prof_Inicial": topo, "Prof_Final": base, "Tipo_Solo": str(rng.choice(list(K))), "NSPT": nspt})
+        topo = base
+    rng.shuffle(camadas) # camadas_para_colunas ordena
+    return camadas
+
+
+def _estacas_aleatorias(rng, camadas, n_estacas=40):
+    """(topo do fuste, ponta, diametro) com pontas nas fronteiras e topos no meio das camadas."""
+    fronteiras = sorted({c["Prof_Final"] for c in camadas})
+    prof_maxima = fronteiras[-1]
+    estacas = []
+    while len(estacas) < n_estacas:
+        topo = 0.0 if rng.random() < 0.3 else float(rng.uniform(0.0, prof_maxima))
+        ponta = float(rng.choice(fronteiras)) if rng.random() < 0.5 else float(rng.uniform(0.0, prof_maxima))
+        if ponta > topo:
+            estacas.append((topo, ponta, float(rng.choice([0.25, 0.3, 0.4, 0.6]))))
+    return estacas
+
+
+def _camadas_do_fuste(camadas, topo, ponta):
+    """Camadas atravessadas pelo fuste, recortadas, como as funcoes escalares esperam."""
+    ordenadas = sorted(camadas, key=lambda c: c["Prof_Inicial"])
+    return [
+        {**c, "Prof_Inicial": max(c["Prof_Inicial"], topo), "Prof_Final": min(c["Prof_Final"], ponta)}
+        for c in ordenadas
+        if c["Prof_Inicial"] < ponta and c["Prof_Final"] > topo
+    ]
+
+
+@pytest.mark.parametrize("semente", range(30))
+def test_lote_identico_ao_escalar(semente):
+    rng = np.random.default_rng(semente)
+    camadas = _camadas_aleatorias(rng)
+    estacas = _estacas_aleatorias(rng, camadas)
+    prof_topo, prof_base, nspt, codigo_solo, categorias = camadas_para_colunas(camadas)
+
+    topos = np.array([e[0] for e in estacas])
+    pontas = np.array([e[1] for e in estacas])
+    diametros = np.array([e[2] for e in estacas])
+    n_ponta = rng.integers(0, 60, len(estacas)).astype(np.float64)
+    area = math.pi * (diametros / 2) ** 2
+    perimetro = math.pi * diametros
+    f1, f2 = 1 / 2.5, 1 / 5.0
+
+    qult_av = aoki_velloso_lote(
+        prof_topo, prof_base, nspt, codigo_solo, pontas, n_ponta, area, perimetro,
+        coeficientes_para_array(K, categorias), coeficientes_para_array(ALPHA, categorias),
+        f1=f1, f2=f2, prof_topo_estaca=topos,
+    )
+    resultado_dq = decourt_quaresma_lote(
+        prof_topo, prof_base, nspt, codigo_solo, pontas, n_ponta, area, perimetro,
+        coeficientes_para_array(C, categorias), coeficientes_para_array(ALPHA_L, categorias),
+        FSP=4.0, FSL=1.3, alpha_p=0.85, prof_topo_estaca=topos,
+    )
+
+    for i, (topo, ponta, _) in enumerate(estacas):
+        fuste = _camadas_do_fuste(camadas, topo, ponta)
+        esperado_av = aoki_velloso(fuste, n_ponta[i], area[i], perimetro[i], K, ALPHA, f1=f1, f2=f2)
+        esperado_dq = decourt_quaresma(fuste, n_ponta[i], area[i], perimetro[i], C, ALPHA_L,
+                                       FSP=4.0, FSL=1.3, alpha_p=0.85)
+        assert qult_av[i] == esperado_av, (topo, ponta)
+        assert resultado_dq["qult"][i] == esperado_dq["qult"], (topo, ponta)
+        assert resultado_dq["qadm"][i] == esperado_dq["qadm"], (topo, ponta)
+
+
+def test_ponta_na_fronteira_usa_o_solo_de_cima():
+    camadas = [
+        {"Prof_Inicial": 0.0, "Prof_Final": 2.0, "Tipo_Solo": "Argila", "NSPT": 5},
+        {"Prof_Inicial": 2.0, "Prof_Final": 4.0, "Tipo_Solo": "Areia", "NSPT": 30},
+    ]
+    prof_topo, prof_base, nspt, codigo_solo, categorias = camadas_para_colunas(camadas)
+    qult = aoki_velloso_lote(prof_topo, prof_base, nspt, codigo_solo, np.array([2.0]), 10.0, 0.1, 1.0,
+                             coeficientes_para_array(K, categorias), coeficientes_para_array(ALPHA, categorias))
+    assert qult[0] == aoki_velloso(camadas[:1], 10.0, 0.1, 1.0, K, ALPHA)
+    assert qult[0] == aoki_velloso(camadas[:1], 10.0, 0.1, 1.0, K, ALPHA, tipo_solo_ponta="Argila")
+
+
+def test_solo_sem_coeficiente_levanta_keyerror():
+    camadas = [
+        {"Prof_Inicial": 0.0, "Prof_Final": 2.0, "Tipo_Solo": "Turfa", "NSPT": 2},
+        {"Prof_Inicial": 2.0, "Prof_Final": 4.0, "Tipo_Solo": "Areia", "NSPT": 30},
+    ]
+    prof_topo, prof_base, nspt, codigo_solo, categorias = camadas_para_colunas(camadas)
+    with pytest.raises(KeyError):
+        aoki_velloso(camadas, 10.0, 0.1, 1.0, K, ALPHA)
+    with pytest.raises(KeyError):
+        aoki_velloso_lote(prof_topo, prof_base, nspt, codigo_solo, np.array([4.0]), 10.0, 0.1, 1.0,
+                          coeficientes_para_array(K, categorias), coeficientes_para_array(ALPHA, categorias))
+    with pytest.raises(KeyError):
+        decourt_quaresma_lote(prof_topo, prof_base, nspt, codigo_solo, np.array([4.0]), 10.0, 0.1, 1.0,
+                              coeficientes_para_array(C, categorias), coeficientes_para_array(ALPHA_L, categorias))
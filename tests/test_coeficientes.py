@@ -0,0 +1,143 @@
+"""Formulas das celulas F1/F2 (``compilar_expressao``) e ``TabelaFatoresAokiVelloso``."""
+
+import threading
+
+import numpy as np
+import pytest
+
+from coeficientes import TabelaFatoresAokiVelloso, compilar_expressao, validar_expressao
+from parametros import fatores_aoki_velloso, parametros_padrao
+
+
+def _avaliar_sem_travar(funcao, limite_s=5.0, **valores):
+    """Avalia a formula numa thread e falha se ela nao terminar no limite."""
+    resultado = []
+    thread = threading.Thread(target=lambda: resultado.append(funcao(**valores)), daemon=True)
+    thread.start()
+    thread.join(limite_s)
+    assert not thread.is_alive(), "avaliação da fórmula não terminou"
+    return resultado[0]
+
+
+@pytest.mark.parametrize("texto, variaveis, valores, esperado", [
+    ("1+D/0.8", ("D",), {"D": 0.4}, 1.5),
+    ("2*F1", ("D", "F1"), {"D": 0.4, "F1": 1.5}, 3.0),
+    ("2^3", ("D",), {"D": 0.4}, 8.0),
+    ("D**2", ("D",), {"D": 0.5}, 0.25),
+    ("1,75", ("D",), {"D": 0.4}, 1.75),
+    ("1+D/0,8", ("D",), {"D": 0.4}, 1.5),
+    ("-(D - 1)", ("D",), {"D": 0.4}, 0.6),
+    ("  3  ", ("D",), {"D": 0.4}, 3.0),
+])
+def test_gramatica_aceita(texto, variaveis, valores, esperado):
+    assert compilar_expressao(texto, variaveis)(**valores) == pytest.approx(esperado)
+
+
+def test_formula_avalia_arrays_de_diametros():
+    diametros = np.array([0.3, 0.4, 0.8])
+    np.testing.assert_allclose(compilar_expressao("1+D/0.8")(D=diametros), 1 + diametros / 0.8)
+
+
+@pytest.mark.parametrize("texto", [
+    "",
+    "   ",
+    "1+",
+    "abs(D)",
+    "__import__('os')",
+    "D.real",
+    "D.__class__",
+    "X + 1",
+    "F1",  # F1 so e permitido em F2
+    "__builtins__",
+    "[D for D in (1, 2)]",
+    "(x for x in [1])",
+    "{1: 2}",
+    "1 if D else 2",
+    "D < 1",
+    "D and 1",
+    "lambda: 1",
+    "'texto'",
+    "True",
+    "D[0]",
+    "1; 2",
+    "D = 1",
+])
+def test_gramatica_recusa(texto):
+    with pytest.raises(ValueError):
+        compilar_expressao(texto, ("D",))
+    assert validar_expressao(texto, ("D",)) is not None
+
+
+@pytest.mark.parametrize("texto", ["9**9**9", "9^9^9", "1/0", "10^400"])
+def test_overflow_e_divisao_por_zero_resultam_em_inf(texto):
+    resultado = _avaliar_sem_travar(compilar_expressao(texto), D=0.4)
+    assert np.isinf(resultado)
+
+
+def test_zero_sobre_zero_resulta_em_nan():
+    assert np.isnan(_avaliar_sem_travar(compilar_expressao("0/0"), D=0.4))
+
+
+def _params_com(f1=None, f2=None, tipo="Raiz"):
+    params = parametros_padrao()
+    j = params["aoki_velloso_alpha_f1"]["headers"][1:].index(tipo)
+    if f1 is not None:
+        params["aoki_velloso_alpha_f1"]["data"]["F1"][j] = f1
+    if f2 is not None:
+        params["aoki_velloso_alpha_f2"]["data"]["F2"][j] = f2
+    return params
+
+
+def test_tabela_padrao_coincide_com_fatores_fixos():
+    tabela = TabelaFatoresAokiVelloso(parametros_padrao())
+    diametros = np.array([0.25, 0.4, 0.6])
+    for tipo in ("Pré-moldada Redonda", "Raiz", "Hélice Contínua", "Franki"):
+        f1, f2 = tabela.fatores(tipo, diametros)
+        f1_padrao, f2_padrao = fatores_aoki_velloso(tipo, diametros)
+        np.testing.assert_allclose(f1, np.broadcast_to(f1_padrao, diametros.shape))
+        np.testing.assert_allclose(f2, np.broadcast_to(f2_padrao, diametros.shape))
+    assert tabela.erros == {}
+
+
+def test_tabela_usa_formula_da_celula():
+    tabela = TabelaFatoresAokiVelloso(_params_com(f1="1+D", f2="3*F1"))
+    f1, f2 = tabela.fatores("Raiz", np.array([0.2, 0.5]))
+    np.testing.assert_allclose(f1, [1.2, 1.5])
+    np.testing.assert_allclose(f2, [3.6, 4.5])
+
+
+@pytest.mark.parametrize("f1, f2", [
+    ("#VALOR!", None),
+    ("abs(D)", None),
+    ("", None),
+    (None, "F1 if D else 1"),
+])
+def test_celula_invalida_ou_vazia_usa_padrao(f1, f2):
+    tabela = TabelaFatoresAokiVelloso(_params_com(f1=f1, f2=f2))
+    resultado = tabela.fatores("Raiz", 0.4)
+    assert tuple(map(float, resultado)) == fatores_aoki_velloso("Raiz", 0.4)
+    if (f1 or f2 or "").strip():
+        assert any("Raiz" in chave for chave in tabela.erros)
+
+
+@pytest.mark.parametrize("f1, f2", [("0", None), ("-2", None), ("1/0", None), (None, "F1-F1"), (None, "0/0")])
+def test_fator_nao_positivo_ou_infinito_usa_padrao(f1, f2):
+    tabela = TabelaFatoresAokiVelloso(_params_com(f1=f1, f2=f2))
+    f1_padrao, f2_padrao = fatores_aoki_velloso("Raiz", 0.4)
+    resultado_f1, resultado_f2 = tabela.fatores("Raiz", 0.4)
+    if f1 is not None:
+        assert float(resultado_f1) == f1_padrao
+    if f2 is not None:
+        assert float(resultado_f2) == f2_padrao
+    assert tabela.erros == {}
+
+
+def test_invalidar_rele_as_tabelas():
+    params = _params_com(f1="2.0")
+    tabela = TabelaFatoresAokiVelloso(params)
+    assert float(tabela.fatores("Raiz", 0.4)[0]) == 2.0
+    j = params["aoki_velloso_alpha_f1"]["headers"][1:].index("Raiz")
+    params["aoki_velloso_alpha_f1"]["data"]["F1"][j] = "2.5"
+    assert float(tabela.fatores("Raiz", 0.4)[0]) == 2.0
+    tabela.invalidar()
+    assert float(tabela.fatores("Raiz", 0.4)[0]) == 2.5
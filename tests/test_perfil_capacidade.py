@@ -0,0 +1,262 @@
+"""Curvas de capacidade ao longo da sondagem (``perfil_capacidade_*``)."""
+
+import math
+
+import numpy as np
+import pytest
+
+from calculo_estacas import (
+    DISCRETIZACAO_CAMADAS,
+    perfil_capacidade_aoki_velloso,
+    perfil_capacidade_decourt,
+    perfil_capacidade_metodos,
+    profundidades_do_perfil,
+)
+from coeficientes import TabelaCoeficientesDecourt, TabelaFatoresAokiVelloso, classe_solo_decourt
+from parametros import ALFA_AOKI_VELLOSO, k_aoki_velloso, parametros_padrao
+from perfil_sondagem import IndiceProfundidade
+
+PARAMS = parametros_padrao()
+COEFICIENTES = TabelaCoeficientesDecourt(PARAMS)
+FATORES = TabelaFatoresAokiVelloso(PARAMS)
+K = k_aoki_velloso(PARAMS)
+COTA_TERRENO = 100.0
+
+CHAVES_DECOURT = ("prof_segmento", "prof_base_segmento", "nspt_segmento", "alfa_segmento", "beta_segmento",
+                  "ql_segmento", "prof_ponta", "nspt_ponta", "qp", "Pp", "Pl", "Pdqm")
+CHAVES_AOKI_VELLOSO = ("nspt_ponta", "rp", "Pp", "Pl", "qult", "qadm", "f1", "f2")
+
+
+def _sondagem(espessuras, solos, nspt):
+    """Sondagem no formato de ``App.dados_sondagens`` com camadas contiguas a partir de 0 m."""
+    camadas = []
+    topo = 0.0
+    for espessura, solo, n in zip(espessuras, solos, nspt):
+        base = round(topo + espessura, 6)
+        camadas.append({"prof_inicial": topo, "prof_final_camada": base, "tipo_solo": solo, "n_spt": n})
+        topo = base
+    return {"NA": 2.0, "Cota_Terreno": COTA_TERRENO, "camadas": camadas}
+
+
+def _indice(espessuras, solos, nspt):
+    return IndiceProfundidade.da_sondagem(_sondagem(espessuras, solos, nspt))
+
+
+# Fronteiras em multiplos de 0,5 m: a integracao com passo de 0,5 m coincide com a exata
+SOLOS = ["Argila", "Areia Siltosa", "Silte Argiloso", "Areia", "Argila Arenosa", "Areia Argilosa", "Silte Arenoso"]
+CAMADAS_ALINHADAS = ([1.0, 0.5, 1.5, 2.0, 0.5, 1.0, 2.5], SOLOS, [3, 8, 12, 25, 60, 18, 35])
+ALINHADO = _indice(*CAMADAS_ALINHADAS)
+# Camadas finas, fora de qualquer grade
+CAMADAS_FINAS = ([0.35, 0.1, 1.27, 0.6, 0.45, 2.13, 0.9, 1.7], SOLOS + ["Argila"], [2, 4, 9, 14, 7, 41, 22, 55])
+FINO = _indice(*CAMADAS_FINAS)
+DIAMETROS = np.array([0.3, 0.5])
+
+
+@pytest.mark.parametrize("tipo_estaca", ["Hélice Contínua", "Pré-moldada Redonda"])
+@pytest.mark.parametrize("nspt_ponta_media", [False, True])
+@pytest.mark.parametrize("indice, discretizacao, cota_arrasamento", [
+    (ALINHADO, None, 99.0),
+    (ALINHADO, None, 98.7),
+    (ALINHADO, DISCRETIZACAO_CAMADAS, 98.7),
+    (ALINHADO, 0.5, 99.0),
+    (FINO, None, 99.3),
+    (FINO, DISCRETIZACAO_CAMADAS, 99.3),
+])
+def test_metodos_coincide_com_as_funcoes_de_cada_metodo(indice, discretizacao, cota_arrasamento, nspt_ponta_media,
+                                                        tipo_estaca):
+    prof_pontas = np.append(profundidades_do_perfil(indice, cota_arrasamento, discretizacao), [3.77, 7.3])
+    perfil = perfil_capacidade_metodos(indice, COEFICIENTES, K, ALFA_AOKI_VELLOSO, FATORES, tipo_estaca, DIAMETROS,
+                                       cota_arrasamento, prof_pontas=prof_pontas, discretizacao=discretizacao,
+                                       nspt_ponta_media=nspt_ponta_media)
+
+    decourt = perfil_capacidade_decourt(indice, COEFICIENTES, tipo_estaca, DIAMETROS, cota_arrasamento,
+                                        prof_pontas=prof_pontas, discretizacao=discretizacao,
+                                        nspt_ponta_media=nspt_ponta_media)
+    for chave in CHAVES_DECOURT:
+        np.testing.assert_array_equal(perfil[chave], decourt[chave], err_msg=chave)
+
+    aoki_velloso = perfil_capacidade_aoki_velloso(indice, K, ALFA_AOKI_VELLOSO, tipo_estaca, DIAMETROS,
+                                                  cota_arrasamento, prof_pontas=prof_pontas, fatores=FATORES)
+    for chave in CHAVES_AOKI_VELLOSO:
+        if discretizacao is None:
+            # Integral exata: o mesmo calculo
+            np.testing.assert_array_equal(perfil["av_" + chave], aoki_velloso[chave], err_msg=chave)
+        else:
+            # Soma nos segmentos: a mesma integral, em outra ordem de soma
+            np.testing.assert_allclose(perfil["av_" + chave], aoki_velloso[chave], rtol=1e-12, err_msg=chave)
+    assert perfil["av_qult"].shape == (DIAMETROS.size, prof_pontas.size)
+
+
+@pytest.mark.parametrize("discretizacao", [None, DISCRETIZACAO_CAMADAS, 0.5])
+def test_solo_sem_k_alfa_resulta_em_nan_so_no_aoki_velloso(discretizacao):
+    # "Turfa" (3,0 a 4,0 m) nao tem K/α; Décourt-Quaresma usa a linha de zeros
+    indice = _indice([1.0, 2.0, 1.0, 3.0], ["Argila", "Areia", "Turfa", "Areia"], [4, 15, 2, 30])
+    tipo_estaca, diametro_m, cota_arrasamento = "Hélice Contínua", 0.4, 99.0
+    prof_pontas = profundidades_do_perfil(indice, cota_arrasamento, discretizacao)
+    perfil = perfil_capacidade_metodos(indice, COEFICIENTES, K, ALFA_AOKI_VELLOSO, FATORES, tipo_estaca, diametro_m,
+                                       cota_arrasamento, prof_pontas=prof_pontas, discretizacao=discretizacao)
+
+    decourt = perfil_capacidade_decourt(indice, COEFICIENTES, tipo_estaca, diametro_m, cota_arrasamento,
+                                        prof_pontas=prof_pontas, discretizacao=discretizacao)
+    for chave in CHAVES_DECOURT:
+        np.testing.assert_array_equal(perfil[chave], decourt[chave], err_msg=chave)
+    assert np.isfinite(perfil["Pdqm"]).all()
+
+    # Pontas até o topo da turfa não a atravessam; as de baixo valem NaN
+    acima = prof_pontas <= 3.0
+    assert acima.any() and (~acima).any()
+    assert np.isnan(perfil["av_qult"][..., ~acima]).all()
+    aoki_velloso = perfil_capacidade_aoki_velloso(indice, K, ALFA_AOKI_VELLOSO, tipo_estaca, diametro_m,
+                                                  cota_arrasamento, prof_pontas=prof_pontas[acima], fatores=FATORES)
+    np.testing.assert_allclose(perfil["av_qult"][..., acima], aoki_velloso["qult"], rtol=1e-12)
+    with pytest.raises(KeyError):
+        perfil_capacidade_aoki_velloso(indice, K, ALFA_AOKI_VELLOSO, tipo_estaca, diametro_m, cota_arrasamento,
+                                       prof_pontas=prof_pontas, fatores=FATORES)
+
+
+def _decourt_original(sondagem_data, params, cota_arrasamento, cota_ponta, diametro_m, tipo_estaca):
+    """Porte direto do laco de ``_execute_de_court_calculation`` (segmentos de 1 m percorridos um a um).
+
+    Retorna (Pdqm, [(prof_inicial, prof_final, nspt, ql) de cada segmento]) ou None sem SPT na ponta.
+    """
+    cota_terreno = sondagem_data["Cota_Terreno"]
+    if "Pré-moldada" in tipo_estaca or tipo_estaca == "Metálica":
+        cota_ponta_calculo = cota_ponta - (0.05 * diametro_m)
+    else:
+        cota_ponta_calculo = cota_ponta
+
+    def _get_nspt_and_soil(cota_target):
+        profundidade_target = cota_terreno - cota_target
+        for camada in sondagem_data["camadas"]:
+            if camada["prof_inicial"] <= profundidade_target <= camada["prof_final_camada"]:
+                return float(camada["n_spt"]), camada["tipo_solo"]
+        return None, None
+
+    nspt_ponta, tipo_solo_ponta = _get_nspt_and_soil(cota_ponta_calculo)
+    if nspt_ponta is None:
+        return None
+    if "Areia" in tipo_solo_ponta:
+        qp = 250 * nspt_ponta
+    elif "Argila" in tipo_solo_ponta or "Silte" in tipo_solo_ponta:
+        qp = 120 * nspt_ponta
+    else:
+        qp = 250 * nspt_ponta
+    area_ponta = math.pi * (diametro_m / 2) ** 2
+    Pp = qp * area_ponta
+
+    col_idx_map = {"Cravada a céu aberto": 1, "Escavada a fluido": 2, "Hélice Contínua": 3, "Raiz": 4,
+                   "Injetada sob pressão": 5, "Franki": 6, "Pré-moldada Redonda": 1, "Pré-moldada Quadrada": 1}
+    alpha_data = params["decourt_quaresma_alpha"]["data"]
+    beta_data = params["decourt_quaresma_beta"]["data"]
+    Pl = 0.0
+    segmentos = []
+    prof_arrasamento = cota_terreno - cota_arrasamento
+    prof_ponta = cota_terreno - cota_ponta
+    current_prof = math.floor(prof_arrasamento)
+    while current_prof < prof_ponta:
+        prof_inicial_segmento = current_prof
+        prof_final_segmento = min(current_prof + 1, prof_ponta)
+        prof_central_segmento = (prof_inicial_segmento + prof_final_segmento) / 2.0
+        nspt_segmento, tipo_solo_segmento = _get_nspt_and_soil(cota_terreno - prof_central_segmento)
+        alfa_segmento = beta_segmento = 0.0
+        solo_key = classe_solo_decourt(tipo_solo_segmento) if nspt_segmento is not None else None
+        if solo_key in alpha_data and solo_key in beta_data:
+            col = col_idx_map.get(tipo_estaca, 1) - 1
+            alfa_segmento = float(alpha_data[solo_key][col].replace(",", "."))
+            beta_segmento = float(beta_data[solo_key][col].replace(",", "."))
+        # Sem SPT no segmento: ql = 0
+        ql_segmento = alfa_segmento * nspt_segmento + beta_segmento if nspt_segmento is not None else 0.0
+        Pl += ql_segmento * area_ponta
+        segmentos.append((prof_inicial_segmento, prof_final_segmento, nspt_segmento, ql_segmento))
+        current_prof += 1
+    return (Pp + Pl) / 2.0, segmentos
+
+
+@pytest.mark.parametrize("tipo_estaca", ["Hélice Contínua", "Raiz", "Franki", "Pré-moldada Redonda", "Metálica"])
+@pytest.mark.parametrize("camadas, cota_arrasamento", [
+    (CAMADAS_ALINHADAS, 100.0),
+    (CAMADAS_ALINHADAS, 98.7),
+    (CAMADAS_FINAS, 99.3),
+    (CAMADAS_FINAS, 97.55),
+])
+def test_curva_padrao_coincide_com_o_laco_original(camadas, cota_arrasamento, tipo_estaca):
+    sondagem = _sondagem(*camadas)
+    indice = IndiceProfundidade.da_sondagem(sondagem)
+    diametro_m = 0.4
+    prof_arrasamento = COTA_TERRENO - cota_arrasamento
+    # Pontas da curva, nas fronteiras das camadas, logo acima delas (o deslocamento de 5% de D
+    # passa a fronteira) e em profundidades quaisquer; todas com SPT na ponta de calculo
+    bases = indice.bases
+    candidatas = np.concatenate((profundidades_do_perfil(indice, cota_arrasamento), bases, bases - 0.01,
+                                 prof_arrasamento + np.array([0.05, 0.5, 1.37, 2.91, 4.444])))
+    candidatas = np.unique(candidatas[(candidatas > prof_arrasamento)
+                                      & (candidatas + 0.05 * diametro_m <= indice.profundidade_maxima)])
+    # Como na interface: a ponta é informada por cota e convertida em profundidade
+    cotas_ponta = COTA_TERRENO - candidatas
+    prof_pontas = COTA_TERRENO - cotas_ponta
+
+    perfil = perfil_capacidade_decourt(indice, COEFICIENTES, tipo_estaca, diametro_m, cota_arrasamento,
+                                       prof_pontas=prof_pontas)
+    for cota_ponta, pdqm in zip(cotas_ponta, perfil["Pdqm"]):
+        esperado, _ = _decourt_original(sondagem, PARAMS, cota_arrasamento, cota_ponta, diametro_m, tipo_estaca)
+        assert pdqm == pytest.approx(esperado, rel=1e-12), cota_ponta
+
+    # Tabela por segmento: a mesma do laco original para a ponta mais profunda
+    _, segmentos = _decourt_original(sondagem, PARAMS, cota_arrasamento, cotas_ponta[-1], diametro_m, tipo_estaca)
+    completos = [s for s in segmentos if s[1] == s[0] + 1]
+    n = len(completos)
+    np.testing.assert_array_equal(perfil["prof_segmento"][:n], [s[0] for s in completos])
+    np.testing.assert_array_equal(perfil["nspt_segmento"][:n], [s[2] for s in completos])
+    np.testing.assert_array_equal(perfil["ql_segmento"][:n], [s[3] for s in completos])
+
+
+@pytest.mark.parametrize("camadas, cota_arrasamento", [(CAMADAS_ALINHADAS, 98.7), (CAMADAS_FINAS, 99.3)])
+def test_integracao_por_camadas_e_a_integral_exata(camadas, cota_arrasamento):
+    sondagem = _sondagem(*camadas)
+    indice = IndiceProfundidade.da_sondagem(sondagem)
+    tipo_estaca, diametro_m = "Hélice Contínua", 0.4
+    prof_arrasamento = COTA_TERRENO - cota_arrasamento
+    prof_pontas = prof_arrasamento + np.array([0.2, 0.61, 1.0, 2.35, 3.9, 5.0])
+    perfil = perfil_capacidade_decourt(indice, COEFICIENTES, tipo_estaca, diametro_m, cota_arrasamento,
+                                       prof_pontas=prof_pontas, discretizacao=DISCRETIZACAO_CAMADAS)
+
+    # Integral de ql = α·N + β camada a camada, entre o arrasamento e a ponta
+    col = PARAMS["decourt_quaresma_alpha"]["headers"][1:].index(tipo_estaca)
+    area_ponta = math.pi * (diametro_m / 2) ** 2
+    for prof_ponta, pl in zip(prof_pontas, perfil["Pl"]):
+        integral = 0.0
+        for camada in sondagem["camadas"]:
+            classe = classe_solo_decourt(camada["tipo_solo"])
+            alfa = float(PARAMS["decourt_quaresma_alpha"]["data"][classe][col])
+            beta = float(PARAMS["decourt_quaresma_beta"]["data"][classe][col])
+            espessura = min(camada["prof_final_camada"], prof_ponta) - max(camada["prof_inicial"], prof_arrasamento)
+            integral += (alfa * camada["n_spt"] + beta) * max(espessura, 0.0)
+        assert pl == pytest.approx(integral * area_ponta, rel=1e-12), prof_ponta
+
+
+# NSPT 4 (0 a 1 m), 10 (1 a 2 m), sem ensaio de 2 a 3 m, 30 (3 a 5 m)
+INDICE_COM_LACUNA = IndiceProfundidade.da_sondagem({"Cota_Terreno": COTA_TERRENO, "camadas": [
+    {"prof_inicial": 0.0, "prof_final_camada": 1.0, "tipo_solo": "Argila", "n_spt": 4},
+    {"prof_inicial": 1.0, "prof_final_camada": 2.0, "tipo_solo": "Argila", "n_spt": 10},
+    {"prof_inicial": 3.0, "prof_final_camada": 5.0, "tipo_solo": "Areia", "n_spt": 30},
+]})
+
+
+@pytest.mark.parametrize("prof_ponta, esperado", [
+    (0.5, (4 + 10) / 2),         # z - 1 acima do terreno: fora da media
+    (0.99, (4 + 10) / 2),
+    (1.0, (4 + 4 + 10) / 3),     # z e z - 1 = 0 nas fronteiras: camada de cima, como em consultar_lote
+    (1.01, (4 + 10) / 2),        # z + 1 na lacuna: fora da media
+    (1.4, (4 + 10) / 2),
+    (2.0, (4 + 10 + 30) / 3),    # z + 1 = 3,0 e o topo da camada abaixo da lacuna
+    (2.5, math.nan),             # ponta na lacuna: sem NSPT na propria ponta
+    (3.0, (10 + 30 + 30) / 3),
+    (3.5, 30.0),                 # z - 1 na lacuna
+    (4.2, 30.0),                 # z + 1 abaixo da sondagem
+])
+def test_nspt_ponta_medio_calculado_a_mao(prof_ponta, esperado):
+    resultado = INDICE_COM_LACUNA.nspt_ponta_medio(np.array([prof_ponta]))[0]
+    if math.isnan(esperado):
+        assert math.isnan(resultado)
+    else:
+        assert resultado == pytest.approx(esperado)
@@ -0,0 +1,150 @@
+"""Snapshot ``sondagens.json`` mais o diario de alteracoes (``DiarioSondagens``)."""
+
+import json
+import os
+
+import pytest
+
+import persistencia
+from persistencia import DiarioSondagens
+
+CAMADAS = [{"prof_inicial": 0.0, "prof_final_camada": 1.0, "tipo_solo": "Argila", "n_spt": 4}]
+SNAPSHOT = {
+    "SP-01": {"NA": 2.0, "Cota_Terreno": 100.0, "camadas": CAMADAS},
+    "SP-02": {"NA": 1.5, "Cota_Terreno": 98.0, "camadas": []},
+}
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    caminho = str(tmp_path / "sondagens.json")
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(SNAPSHOT, f)
+    return caminho
+
+
+def _registrar_alteracoes(diario):
+    diario.registrar_sondagem("SP-03", {"NA": 3.0, "Cota_Terreno": 101.0, "camadas": CAMADAS})
+    diario.registrar_campo("SP-01", "NA", 2.7)
+    diario.registrar_remocao("SP-02")
+
+
+ESPERADO = {
+    "SP-01": {"NA": 2.7, "Cota_Terreno": 100.0, "camadas": CAMADAS},
+    "SP-03": {"NA": 3.0, "Cota_Terreno": 101.0, "camadas": CAMADAS},
+}
+
+
+def test_diario_e_reaplicado_sobre_o_snapshot(caminho):
+    _registrar_alteracoes(DiarioSondagens(caminho))
+    diario = DiarioSondagens(caminho)
+    assert diario.carregar() == ESPERADO
+    assert (diario.registros, diario.registros_invalidos) == (3, 0)
+    # O snapshot nao e alterado pelos registros
+    with open(caminho, encoding="utf-8") as f:
+        assert json.load(f) == SNAPSHOT
+
+
+def test_sem_snapshot_o_diario_parte_de_um_projeto_vazio(tmp_path):
+    caminho = str(tmp_path / "sondagens.json")
+    _registrar_alteracoes(DiarioSondagens(caminho))
+    assert DiarioSondagens(caminho).carregar() == {"SP-03": ESPERADO["SP-03"]}
+
+
+def test_sem_snapshot_nem_diario_levanta_filenotfounderror(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        DiarioSondagens(str(tmp_path / "sondagens.json")).carregar()
+
+
+def test_ultima_linha_truncada_e_ignorada(caminho):
+    diario = DiarioSondagens(caminho)
+    _registrar_alteracoes(diario)
+    # Gravacao interrompida no meio do ultimo registro
+    registro = json.dumps({"op": "campo", "sondagem": "SP-01", "campo": "NA", "valor": 9.9})
+    with open(diario.caminho_diario, "a", encoding="utf-8") as f:
+        f.write(registro[:len(registro) // 2])
+
+    diario = DiarioSondagens(caminho)
+    assert diario.carregar() == ESPERADO
+    assert (diario.registros, diario.registros_invalidos) == (3, 1)
+
+
+@pytest.mark.parametrize("linha", [
+    "{nao e json",
+    json.dumps({"op": "renomear", "sondagem": "SP-01"}),               # operacao desconhecida
+    json.dumps({"op": "campo", "sondagem": "SP-99", "campo": "NA", "valor": 1.0}),  # sondagem inexistente
+    json.dumps({"op": "sondagem", "sondagem": "SP-04"}),              # sem "dados"
+    json.dumps({"sondagem": "SP-01"}),                                 # sem "op"
+    json.dumps([1, 2]),
+    json.dumps("texto"),
+])
+def test_linha_invalida_no_meio_do_diario_e_contada_e_ignorada(caminho, linha):
+    diario = DiarioSondagens(caminho)
+    diario.registrar_sondagem("SP-03", ESPERADO["SP-03"])
+    with open(diario.caminho_diario, "a", encoding="utf-8") as f:
+        f.write(linha + "\n\n") # Linhas em branco nao contam
+    diario.registrar_campo("SP-01", "NA", 2.7)
+    diario.registrar_remocao("SP-02")
+
+    diario = DiarioSondagens(caminho)
+    assert diario.carregar() == ESPERADO
+    assert (diario.registros, diario.registros_invalidos) == (3, 1)
+
+
+def test_compactar_grava_o_snapshot_e_remove_o_diario(caminho, monkeypatch):
+    diario = DiarioSondagens(caminho)
+    _registrar_alteracoes(diario)
+    dados = DiarioSondagens(caminho).carregar()
+
+    substituicoes = []
+    os_replace = os.replace
+
+    def replace(origem, destino):
+        substituicoes.append((origem, destino))
+        os_replace(origem, destino)
+
+    monkeypatch.setattr(persistencia.os, "replace", replace)
+    diario.compactar(dados)
+
+    # Gravado num temporario e renomeado sobre o snapshot
+    assert substituicoes == [(caminho + ".tmp", caminho)]
+    assert not os.path.exists(caminho + ".tmp")
+    assert not os.path.exists(diario.caminho_diario)
+    assert diario.registros == 0
+    with open(caminho, encoding="utf-8") as f:
+        assert json.load(f) == ESPERADO
+    releitura = DiarioSondagens(caminho)
+    assert releitura.carregar() == ESPERADO
+    assert releitura.registros == 0
+
+
+def test_falha_ao_renomear_preserva_snapshot_e_diario(caminho, monkeypatch):
+    diario = DiarioSondagens(caminho)
+    _registrar_alteracoes(diario)
+
+    def replace(origem, destino):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(persistencia.os, "replace", replace)
+    with pytest.raises(OSError):
+        diario.compactar(ESPERADO)
+    with open(caminho, encoding="utf-8") as f:
+        assert json.load(f) == SNAPSHOT
+    assert DiarioSondagens(caminho).carregar() == ESPERADO
+
+
+def test_precisa_compactar_pelo_numero_de_registros(caminho):
+    diario = DiarioSondagens(caminho, limite_registros=3)
+    diario.registrar_campo("SP-01", "NA", 2.1)
+    diario.registrar_campo("SP-01", "NA", 2.2)
+    assert not diario.precisa_compactar()
+    diario.registrar_campo("SP-01", "NA", 2.3)
+    assert diario.precisa_compactar()
+
+    # Os registros da sessao anterior contam ao carregar
+    releitura = DiarioSondagens(caminho, limite_registros=3)
+    dados = releitura.carregar()
+    assert releitura.precisa_compactar()
+    releitura.compactar(dados)
+    assert not releitura.precisa_compactar()
+    assert releitura.carregar()["SP-01"]["NA"] == 2.3